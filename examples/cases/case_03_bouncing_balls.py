@@ -4,7 +4,7 @@ Animated bouncing balls — performance test
 
 Demonstrates:
 - Particle physics with wall bounces
-- Real-time timing for smooth animation
+- Real-time timing for smooth animation (built-in frame pacing: set_target_fps / wait_next_frame)
 - Monitoring of render FPS and generation FPS
 - Scalability with a large number of objects
 """
@@ -55,24 +55,6 @@ class Ball:
             self.vy = -abs(self.vy)
 
 
-class PreciseTimer:
-    def __init__(self, target_fps):
-        self.target_frame_time = 1.0 / target_fps
-        self.next_frame_time = time.perf_counter()
-
-    def wait_next_frame(self):
-        current_time = time.perf_counter()
-
-        # Ждем до запланированного времени следующего кадра
-        sleep_time = self.next_frame_time - current_time
-
-        if sleep_time > 0.001:
-            time.sleep(sleep_time * 0.9)
-
-        # Планируем следующий кадра
-        self.next_frame_time += self.target_frame_time
-
-
 def main():
     # Settings (tweak for performance testing)
     target_fps = 60  # Try 100, 200, 1000!
@@ -80,6 +62,7 @@ def main():
     duration = 10     # Total run time in seconds
     # overlay = transparent_overlay.Overlay(0, 0, 1000, 500)
     overlay = transparent_overlay.Overlay()
+    overlay.set_target_fps(target_fps)  # Render and logic share the same frame slots
     overlay.start_layer()
     screen_width = overlay.width
     screen_height = overlay.height
@@ -89,7 +72,6 @@ def main():
     fps_update_time = time.time()
     start_time = time.time()
     last_update_time = time.perf_counter()  # Для точного real_dt
-    timer = PreciseTimer(target_fps)  # Create frame timer
     print("Starting balls simulation...")
     print(f"Balls: {ball_count}, Target FPS: {target_fps}")
     print("Try changing target_fps and ball_count in code!")
@@ -123,7 +105,7 @@ def main():
             overlay.signal_render()
 
             # Wait until next planned frame time
-            timer.wait_next_frame()
+            overlay.wait_next_frame()
 
             frame_count += 1
             current_time_fps = time.time()
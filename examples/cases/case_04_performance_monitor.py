@@ -5,7 +5,7 @@ Real-time system performance monitor
 Demonstrates:
 - Tracking CPU and RAM via psutil
 - History graphs with fixed 0–100% scale
-- Circular gauges with dense fill
+- Circular gauges with dense fill (anti-aliased lines drawn without sprites)
 - Render statistics with highlighted background
 """
 
@@ -83,8 +83,8 @@ class SystemMonitor:
             points.append((x_pos, y_pos))
 
         for i in range(len(points) - 1):
-            self.overlay.draw_line(int(points[i][0]), int(points[i][1]),
-                                   int(points[i + 1][0]), int(points[i + 1][1]), color, 2)
+            self.overlay.draw_line_aa(points[i][0], points[i][1],
+                                      points[i + 1][0], points[i + 1][1], color, 2)
 
     def draw_gauge(self, x, y, size, value, color, label):
         """Draw a circular gauge with dense fill"""
@@ -101,11 +101,12 @@ class SystemMonitor:
                 angle = math.radians(i * degrees_per_segment - 90)  # Start from top
                 end_x = x + (size - 3) * math.cos(angle)
                 end_y = y + (size - 3) * math.sin(angle)
-                self.overlay.draw_line(x, y, int(round(end_x)), int(round(end_y)), color, 2)
+                # Rasterized in place: no sprite per angle
+                self.overlay.draw_line_aa(x, y, end_x, end_y, color, 2)
 
         # Text below the gauge
-        self.overlay.draw_text(x, y + size + 10, f"{value:.1f}%",
-                               color=color, font_size=14, align="center", anchor="mm")
+        self.overlay.draw_glyph_text(x, y + size + 10, f"{value:.1f}%",
+                                     color=color, font_size=14, anchor="mm")
         self.overlay.draw_text(x, y + size + 25, label,
                                color=color, font_size=12, align="center", anchor="mm")
 
@@ -124,17 +125,17 @@ class SystemMonitor:
 
         # CPU info
         cpu_color = (255, 100, 100, 255) if cpu_usage > 80 else (100, 255, 100, 255)
-        self.overlay.draw_text(panel_x + 20, panel_y + 45, f"CPU: {cpu_usage:.1f}%",
-                               color=cpu_color, font_size=14)
+        self.overlay.draw_glyph_text(panel_x + 20, panel_y + 45, f"CPU: {cpu_usage:.1f}%",
+                                     color=cpu_color, font_size=14)
 
         # RAM info
         ram_color = (255, 100, 100, 255) if ram_usage > 80 else (100, 200, 255, 255)
-        self.overlay.draw_text(panel_x + 20, panel_y + 70, f"RAM: {ram_usage:.1f}%",
-                               color=ram_color, font_size=14)
+        self.overlay.draw_glyph_text(panel_x + 20, panel_y + 70, f"RAM: {ram_usage:.1f}%",
+                                     color=ram_color, font_size=14)
 
-        # Uptime
-        self.overlay.draw_text(panel_x + 20, panel_y + 95, f"Uptime: {elapsed_time:.0f}s",
-                               color=(200, 200, 200, 255), font_size=14)
+        # Uptime (values that change every frame: composed from cached glyphs instead of one sprite per value)
+        self.overlay.draw_glyph_text(panel_x + 20, panel_y + 95, f"Uptime: {elapsed_time:.0f}s",
+                                     color=(200, 200, 200, 255), font_size=14)
 
         # FPS info
         render_fps = self.overlay.get_render_fps()
@@ -143,8 +144,8 @@ class SystemMonitor:
         fps_color = (100, 255, 100, 255) if render_fps > 30 else (255, 100, 100, 255)
         self.overlay.draw_text(panel_x + 20, panel_y + 120, f"Screen FPS: {self.screen_refresh_rate}",
                                color=fps_color, font_size=14)
-        self.overlay.draw_text(panel_x + 20, panel_y + 145, f"Objects: {object_count}",
-                               color=(200, 200, 255, 255), font_size=14)
+        self.overlay.draw_glyph_text(panel_x + 20, panel_y + 145, f"Objects: {object_count}",
+                                     color=(200, 200, 255, 255), font_size=14)
 
     def run(self):
         """Main monitoring loop"""
@@ -123,9 +123,10 @@ class Cannon:
 
         # Barrel length and rendering at angle
         barrel_length = 40
-        end_x = self.x + int(math.cos(clamped_rad) * barrel_length)
-        end_y = self.y - int(math.sin(clamped_rad) * barrel_length)
-        overlay.draw_line(self.x, self.y, end_x, end_y, (90, 90, 90, 255), 12)
+        end_x = self.x + math.cos(clamped_rad) * barrel_length
+        end_y = self.y - math.sin(clamped_rad) * barrel_length
+        # Anti-aliased line drawn directly into the frame (the angle changes every frame)
+        overlay.draw_line_aa(self.x, self.y, end_x, end_y, (90, 90, 90, 255), 12)
 
 
 class BorderHeatingSystem:
@@ -311,16 +312,17 @@ def main():
             # Info panel
             overlay.draw_rect(10, border_thickness + 10, 150, 100, (0, 0, 0, 180))
 
-            overlay.draw_text(20, border_thickness + 15, f"Bullets: {active_bullets}/{max_bullets}",
-                            color=(255, 255, 255, 255), font_size=14)
-            overlay.draw_text(20, border_thickness + 35, f"Shots: {shots_fired}",
-                            color=(255, 255, 255, 255), font_size=14)
-            overlay.draw_text(20, border_thickness + 55, f"Gen FPS: {gen_fps}",
-                            color=(100, 255, 100, 255), font_size=14)
+            # Counters change every frame: compose them from cached glyphs instead of one sprite per value
+            overlay.draw_glyph_text(20, border_thickness + 15, f"Bullets: {active_bullets}/{max_bullets}",
+                                    color=(255, 255, 255, 255), font_size=14)
+            overlay.draw_glyph_text(20, border_thickness + 35, f"Shots: {shots_fired}",
+                                    color=(255, 255, 255, 255), font_size=14)
+            overlay.draw_glyph_text(20, border_thickness + 55, f"Gen FPS: {gen_fps}",
+                                    color=(100, 255, 100, 255), font_size=14)
 
             render_fps = overlay.get_render_fps()
-            overlay.draw_text(20, border_thickness + 75, f"Rend FPS: {render_fps}",
-                            color=(200, 200, 255, 255), font_size=14)
+            overlay.draw_glyph_text(20, border_thickness + 75, f"Rend FPS: {render_fps}",
+                                    color=(200, 200, 255, 255), font_size=14)
 
             overlay.signal_render()
 
@@ -60,22 +60,6 @@ class Ball:
             self.vy = -abs(self.vy)
 
 
-class PreciseTimer:
-    def __init__(self, target_fps):
-        self.target_frame_time = 1.0 / target_fps
-        self.next_frame_time = time.perf_counter()
-
-    def wait_next_frame(self):
-        current_time = time.perf_counter()
-
-        sleep_time = self.next_frame_time - current_time
-
-        if sleep_time > 0.001:
-            time.sleep(sleep_time * 0.9)
-
-        self.next_frame_time += self.target_frame_time
-
-
 def main():
     # Test settings (minimal set of parameters)
     def _get_float(name, default):
@@ -90,7 +74,7 @@ def main():
         except Exception:
             return default
 
-    target_fps = _get_float('TARGET_FPS', 60)       # Target FPS for timer
+    target_fps = _get_float('TARGET_FPS', 60)       # Target FPS for frame pacing
     critical_fps = _get_float('CRITICAL_FPS', 10)   # Critical FPS to stop
     initial_ball_count = _get_int('INITIAL_BALLS', 10)  # Initial balls
     max_duration = _get_float('MAX_DURATION', 60)   # Max test time
@@ -108,6 +92,7 @@ def main():
 
     # Initialization
     overlay = transparent_overlay.Overlay()
+    overlay.set_target_fps(target_fps)
     overlay.start_layer()
     screen_width = overlay.width
     screen_height = overlay.height
@@ -154,7 +139,10 @@ def main():
     vx = np.array([b.vx for b in ball_pool], dtype=np.float64)
     vy = np.array([b.vy for b in ball_pool], dtype=np.float64)
     r = np.array([b.radius for b in ball_pool], dtype=np.int32)
-    sprite_key_list = [b._sprite_key for b in ball_pool]
+    # Distinct sprites plus one index per ball, for the bulk add_sprite_instances() call
+    sprite_palette = list(dict.fromkeys(b._sprite_key for b in ball_pool))
+    palette_index = {key: i for i, key in enumerate(sprite_palette)}
+    sprite_ids = np.array([palette_index[b._sprite_key] for b in ball_pool], dtype=np.int32)
 
     # Stats
     frame_count = 0
@@ -167,8 +155,6 @@ def main():
     accumulated_balls = 0.0
     balls_per_second = ball_increment / increment_interval
 
-    timer = PreciseTimer(target_fps)
-
     # Stats to output
     max_ball_count = ball_count
     gen_fps_history = []
@@ -182,12 +168,13 @@ def main():
     last_stat_time = time.time()
     stat_interval = 1.0
 
-    # Dropped frames counters
+    # Dropped frames counters (frames coalesced by the overlay's submission policy)
     dropped_frames = 0
     total_frames = 0
     # Measurement-only counters (start after warmup)
     measurement_dropped_frames = 0
     measurement_total_frames = 0
+    coalesced_at_warmup = 0
     dt_accum = 0.0
 
     print("Starting FPS test with balls...")
@@ -263,9 +250,7 @@ def main():
                 # Form instances
                 tx = (x[idx] - r[idx]).astype(np.int32)
                 ty = (y[idx] - r[idx]).astype(np.int32)
-                with overlay.instances_lock:
-                    bi = overlay.back_instances
-                    bi.extend([(sprite_key_list[i], tx[i], ty[i]) for i in range(ball_count)])
+                overlay.add_sprite_instances(sprite_palette, tx, ty, ids=sprite_ids[idx])
 
             # Fetch render FPS
             render_fps = overlay.get_render_fps()
@@ -275,13 +260,14 @@ def main():
             # Check warmup completion (2-stage: warmup -> running)
             if not warmup_complete and time.time() - warmup_start_time >= warmup_time:
                 warmup_complete = True
+                coalesced_at_warmup = overlay.get_submission_stats()['coalesced']
                 # Reset FPS counters/timers so measurement starts clean
                 frame_count = 0
                 fps_update_time = time.time()
                 last_stat_time = fps_update_time
                 print(f"Warmup complete. Starting to add balls and collect stats...")
 
-            # Render HUD (simplified using draw_text like case_03)
+            # Render HUD; its numbers change every frame, so lines are composed from cached glyphs
             if not disable_hud:
                 # Panel background and border
                 panel_w, panel_h = 300, 230
@@ -290,32 +276,29 @@ def main():
 
                 # Text lines
                 y_text = 20
-                overlay.draw_text(20, y_text, f"Stage: {'RUNNING' if warmup_complete else f'WARMUP {max(0.0, warmup_time - (time.time() - warmup_start_time)):.1f}s'}",
-                                  color=(230, 230, 255, 255), font_size=20); y_text += 28
-                overlay.draw_text(20, y_text, f"Balls: {ball_count}", color=(255, 255, 255, 255), font_size=20); y_text += 28
-                overlay.draw_text(20, y_text, f"Gen FPS: {gen_fps}", color=(100, 255, 100, 255), font_size=20); y_text += 28
-                overlay.draw_text(20, y_text, f"Rend FPS: {render_fps}", color=(200, 200, 255, 255), font_size=20); y_text += 28
-                overlay.draw_text(20, y_text, f"Objects: {object_count}", color=(255, 200, 100, 255), font_size=20); y_text += 28
-                overlay.draw_text(20, y_text, f"Time: {elapsed:.1f}s", color=(200, 255, 200, 255), font_size=18); y_text += 26
-                overlay.draw_text(20, y_text, f"Speed: {balls_per_second:.1f}/sec", color=(255, 220, 180, 255), font_size=18); y_text += 26
+                overlay.draw_glyph_text(20, y_text, f"Stage: {'RUNNING' if warmup_complete else f'WARMUP {max(0.0, warmup_time - (time.time() - warmup_start_time)):.1f}s'}",
+                                        color=(230, 230, 255, 255), font_size=20); y_text += 28
+                overlay.draw_glyph_text(20, y_text, f"Balls: {ball_count}", color=(255, 255, 255, 255), font_size=20); y_text += 28
+                overlay.draw_glyph_text(20, y_text, f"Gen FPS: {gen_fps}", color=(100, 255, 100, 255), font_size=20); y_text += 28
+                overlay.draw_glyph_text(20, y_text, f"Rend FPS: {render_fps}", color=(200, 200, 255, 255), font_size=20); y_text += 28
+                overlay.draw_glyph_text(20, y_text, f"Objects: {object_count}", color=(255, 200, 100, 255), font_size=20); y_text += 28
+                overlay.draw_glyph_text(20, y_text, f"Time: {elapsed:.1f}s", color=(200, 255, 200, 255), font_size=18); y_text += 26
+                overlay.draw_glyph_text(20, y_text, f"Speed: {balls_per_second:.1f}/sec", color=(255, 220, 180, 255), font_size=18); y_text += 26
                 if warmup_complete:
                     drop_rate = measurement_dropped_frames / max(measurement_total_frames, 1) * 100
                     drop_line = f"Dropped: {measurement_dropped_frames}/{measurement_total_frames} ({drop_rate:.1f}%)"
                 else:
                     drop_line = "Dropped: —/— (—%)"
-                overlay.draw_text(20, y_text, drop_line, color=(255, 180, 180, 255), font_size=18)
-
-            # Signal render
-            render_busy = getattr(overlay, 'render_event', None)
-            if render_busy is not None and render_busy.is_set():
-                dropped_frames += 1
-                if warmup_complete:
-                    measurement_dropped_frames += 1
+                overlay.draw_glyph_text(20, y_text, drop_line, color=(255, 180, 180, 255), font_size=18)
 
+            # Signal render; a frame replaced before the render thread took it counts as dropped
             overlay.signal_render()
+            dropped_frames = overlay.get_submission_stats()['coalesced']
+            if warmup_complete:
+                measurement_dropped_frames = dropped_frames - coalesced_at_warmup
 
             # Wait next frame
-            timer.wait_next_frame()
+            overlay.wait_next_frame()
 
             # Accumulate and add balls
             if warmup_complete:
@@ -4,6 +4,7 @@ Brightness & Night Light controller — simple screen dimmer
 
 Demonstrates:
 - Using a transparent overlay to dim and tint the screen
+- Solid-color fills (fill_screen) that allocate no sprites
 - Live UI controls with Tkinter (enable, brightness, warmth)
 - Update-on-change rendering with ~30 FPS polling
 - Clean overlay shutdown on exit
@@ -136,10 +137,11 @@ class BrightnessControllerApp:
             a_dim = int(255 * (brightness / 100.0))
             a_warm = int(255 * (warmth / 100.0))
 
+            # Solid fills are written straight into the frame: no full-screen sprite per slider position
             if a_dim > 0:
-                self.overlay.draw_rect(0, 0, self.overlay.width, self.overlay.height, (0, 0, 0, a_dim))
+                self.overlay.fill_screen((0, 0, 0, a_dim))
             if a_warm > 0:
-                self.overlay.draw_rect(0, 0, self.overlay.width, self.overlay.height, (255, 120, 0, a_warm))
+                self.overlay.fill_screen((255, 120, 0, a_warm))
 
         # Present
         self.overlay.signal_render()
@@ -45,7 +45,9 @@ def main():
 
             # Dynamic text and font size
             stats_text, _ = overlay.get_render_statistics()
-            stats_text += f'\nTotal Sprites: {len(overlay.sprite_cache)}'
+            cache_stats = overlay.get_cache_stats()
+            stats_text += f'\nTotal Sprites: {cache_stats["entries"]} ({cache_stats["bytes"] // 1024} KB)'
+            stats_text += f'\nText rasterized: {cache_stats["by_type"]["text"]["creations"]}'
             dynamic_font_size = 30 + int(10 * math.sin(frame * 0.05))
 
             # Remove previous sprite to avoid cache growth
@@ -251,6 +251,8 @@ class SpriteManager:
 
 def main():
     overlay = transparent_overlay.Overlay()
+    # Screenshots are full-screen sprites: cap the cache so bursts of them cannot pile up before TTL cleanup
+    overlay.set_sprite_cache_budget(128 * 1024 * 1024)
     overlay.start_layer()
 
     sprite_manager = SpriteManager(overlay)
@@ -414,6 +416,8 @@ def main():
         print("FINAL CACHE STATISTICS")
         print("=" * 60)
         print(f"Cache size: {final_cache_size} sprites")
+        print(f"Cache memory: {overlay.sprite_cache.bytes_used / 1e6:.1f} MB, "
+              f"evictions: {overlay.sprite_cache.evictions}")
         print(f"Demo sprites created: {len(sprite_manager.created_sprites)}")
         print("\nRender statistics:")
         print(stats_text)
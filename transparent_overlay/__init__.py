@@ -1,7 +1,13 @@
 from .core import Overlay
+from .presenters import Presenter, HeadlessPresenter
+from .scene import InstanceHandle
+from .pacing import FramePacer
+from .context import DrawContext
+from .sprites import SpriteHandle
 
 __version__ = "2.8.0"
 __author__ = "Ilya Yakovenko"
 __email__ = "ilya.a.yakovenko@gmail.com"
 
-__all__ = ['Overlay']
\ No newline at end of file
+__all__ = ['Overlay', 'Presenter', 'HeadlessPresenter', 'InstanceHandle', 'FramePacer', 'DrawContext',
+           'SpriteHandle']
@@ -0,0 +1,230 @@
+"""
+Texture atlas for small sprites.
+
+Small sprites (circles, glyph-sized labels, icons) would otherwise each be a separate small ndarray scattered
+across the heap, each with its own allocation and object overhead. A SpriteAtlas packs them into a few large
+contiguous BGRA pages instead: each page is cut into horizontal shelves of a fixed height class, and a sprite
+goes at the end of the first shelf of its class with room left. The cache keeps a view of the sprite's rectangle,
+so code reading sprites sees an ordinary (h, w, 4) array.
+
+Freed rectangles are not reused at once: another thread may still be copying a sprite it looked up just before
+the sprite was removed. free() only retires an allocation; reclaim() returns the retired space to the shelves once
+the caller knows nobody reads those views any more (Overlay calls it when the renderer starts packing a frame,
+after it finished with the sprites of the previous one). Space inside a shelf is reused once the whole shelf is
+empty. A page whose holes outgrow its live sprites is repacked at the same point: its sprites are copied to other
+pages and the page is dropped (views of the old rectangles keep their pixels). reclaim() returns the moved owners
+so that the cache can replace their views.
+
+Not thread-safe on its own: SpriteCache calls it under Overlay.sprite_lock.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SHELF_QUANTUM = 8  # shelf heights are multiples of this many rows
+
+
+class _Shelf:
+    __slots__ = ('y', 'height', 'end', 'live', 'freed', 'listed')
+
+    def __init__(self, y: int, height: int):
+        self.y = y
+        self.height = height
+        self.end = 0  # first free column
+        self.live = 0  # sprites stored in the shelf
+        self.freed = 0  # pixels of sprites removed while others remain (not reusable until the shelf empties)
+        self.listed = False  # in SpriteAtlas._open
+
+
+class _Page:
+    __slots__ = ('pixels', 'shelves', 'top', 'live_area', 'holes', 'allocs', 'closed')
+
+    def __init__(self, size: int):
+        self.pixels = np.zeros((size, size, 4), dtype=np.uint8)
+        self.shelves: List[_Shelf] = []
+        self.top = 0  # first row not taken by a shelf
+        self.live_area = 0  # pixels of stored sprites
+        self.holes = 0  # sum of the shelves' freed pixels
+        self.allocs: Dict[int, None] = {}  # allocation ids on this page
+        self.closed = False  # being repacked: takes no new sprites
+
+
+class SpriteAtlas:
+    """
+    Shelf-packed BGRA pages holding sprites up to max_side pixels on each side.
+
+    Attributes:
+        page_size: Side of a (square) page in pixels
+        max_side: Larger sprites are not stored in the atlas (0 stores none; stored sprites stay)
+        repack_ratio: A page is repacked once its holes exceed this multiple of its live area and a quarter
+            of the page
+        repacks: Pages repacked so far
+        page_bytes: Memory of the current pages
+    """
+
+    def __init__(self, page_size: int = 512, max_side: int = 64):
+        if page_size < 1 or not 0 <= max_side <= page_size:
+            raise ValueError("page_size must be >= 1 and max_side in 0..page_size")
+        self.page_size = int(page_size)
+        self.max_side = int(max_side)
+        self.repack_ratio = 1.0
+        self.repacks = 0
+        self.page_bytes = 0
+        self._pages: List[Optional[_Page]] = []
+        self._free_pages: List[int] = []
+        # allocation id -> (page index, shelf, x, w, h, owner)
+        self._allocs: Dict[int, Tuple[int, _Shelf, int, int, int, Any]] = {}
+        self._next_id = 0
+        self._retired: List[int] = []  # freed allocations waiting for reclaim()
+        self._fragmented: List[int] = []  # pages to repack in reclaim()
+        # height class -> shelves that may have room, as (page index, page, shelf); checked lazily in _place
+        self._open: Dict[int, List[Tuple[int, _Page, _Shelf]]] = {}
+
+    def fits(self, sprite) -> bool:
+        """True if the sprite is an (h, w, 4) uint8 array small enough for the atlas."""
+        shape = getattr(sprite, 'shape', ())
+        return (len(shape) == 3 and shape[2] == 4 and getattr(sprite, 'dtype', None) == np.uint8
+                and 0 < shape[0] <= self.max_side and 0 < shape[1] <= self.max_side)
+
+    def store(self, sprite, owner: Any) -> Tuple[int, Any]:
+        """Copy a sprite (fits() must be True) into a page. Returns (allocation id, view of its rectangle)."""
+        h, w = sprite.shape[:2]
+        index, shelf, x = self._place(-(-h // SHELF_QUANTUM) * SHELF_QUANTUM, w)
+        page = self._pages[index]
+        view = page.pixels[shelf.y:shelf.y + h, x:x + w]
+        view[...] = sprite
+        alloc = self._next_id
+        self._next_id += 1
+        self._allocs[alloc] = (index, shelf, x, w, h, owner)
+        page.allocs[alloc] = None
+        page.live_area += w * h
+        return alloc, view
+
+    def free(self, alloc: int) -> None:
+        """Retire an allocation; its rectangle keeps its pixels until the next reclaim()."""
+        self._retired.append(alloc)
+
+    def reclaim(self) -> List[Tuple[Any, int, Any]]:
+        """
+        Make the space of retired allocations reusable and repack pages left mostly empty.
+
+        Returns:
+            [(owner, new allocation id, new view), ...] for every sprite moved by a repack
+        """
+        retired, self._retired = self._retired, []
+        for alloc in retired:
+            self._release(alloc)
+        return self._repack() if self._fragmented else []
+
+    def _release(self, alloc: int) -> None:
+        index, shelf, _, w, h, _ = self._allocs.pop(alloc)
+        page = self._pages[index]
+        del page.allocs[alloc]
+        page.live_area -= w * h
+        shelf.live -= 1
+        if shelf.live:
+            shelf.freed += w * h
+            page.holes += w * h
+        else:
+            page.holes -= shelf.freed
+            shelf.freed = shelf.end = 0
+            while page.shelves and not page.shelves[-1].live:  # trailing empty shelves go back to the page
+                trailing = page.shelves.pop()
+                trailing.end = self.page_size  # never matches again while still listed
+                page.top = trailing.y
+            if shelf.end == 0 and not shelf.listed:
+                shelf.listed = True
+                self._open.setdefault(shelf.height, []).append((index, page, shelf))
+        if page.closed:
+            return
+        if not page.allocs:
+            if sum(p is not None for p in self._pages) > 1:  # keep one empty page for the next sprites
+                self._drop_page(index)
+        elif (page.holes * 4 >= self.page_size * self.page_size and page.holes > self.repack_ratio * page.live_area
+              and index not in self._fragmented):
+            self._fragmented.append(index)
+
+    def _repack(self) -> List[Tuple[Any, int, Any]]:
+        """Move the sprites of fragmented pages into other pages and drop those pages."""
+        moved = []
+        while self._fragmented:
+            index = self._fragmented.pop()
+            page = self._pages[index]
+            if page is None or not page.allocs:
+                continue
+            page.closed = True
+            for alloc in list(page.allocs):
+                _, shelf, x, w, h, owner = self._allocs.pop(alloc)
+                new_alloc, view = self.store(page.pixels[shelf.y:shelf.y + h, x:x + w], owner)
+                moved.append((owner, new_alloc, view))
+            self._drop_page(index)
+            self.repacks += 1
+        return moved
+
+    def clear(self) -> None:
+        self.page_bytes = 0
+        self._pages = []
+        self._free_pages = []
+        self._allocs = {}
+        self._retired = []
+        self._fragmented = []
+        self._open = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """pages, bytes (page memory), sprites, live_bytes (sprite pixels), repacks; retired allocations still count."""
+        pages = [page for page in self._pages if page is not None]
+        return {
+            'pages': len(pages),
+            'bytes': self.page_bytes,
+            'sprites': len(self._allocs) - len(self._retired),
+            'live_bytes': 4 * sum(page.live_area for page in pages),
+            'repacks': self.repacks,
+        }
+
+    def __repr__(self) -> str:
+        return f"SpriteAtlas(page_size={self.page_size}, max_side={self.max_side}, sprites={len(self._allocs)})"
+
+    # ---- internals ----
+    def _place(self, height: int, w: int) -> Tuple[int, _Shelf, int]:
+        """Find room for a sprite of width w in a shelf of the given height class, adding a shelf or page if needed."""
+        size = self.page_size
+        height = min(height, size)
+        shelves = self._open.setdefault(height, [])
+        while shelves:
+            index, page, shelf = shelves[-1]
+            if self._pages[index] is page and not page.closed and shelf.end + w <= size:
+                break
+            shelves.pop()  # full (for this width), moved out or on a dropped page
+            shelf.listed = False
+        else:
+            index, page = self._page_with_room(height)
+            shelf = _Shelf(page.top, height)
+            page.shelves.append(shelf)
+            page.top += height
+            shelf.listed = True
+            shelves.append((index, page, shelf))
+        x = shelf.end
+        shelf.end += w
+        shelf.live += 1
+        return index, shelf, x
+
+    def _page_with_room(self, height: int) -> Tuple[int, _Page]:
+        for index, page in enumerate(self._pages):
+            if page is not None and not page.closed and page.top + height <= self.page_size:
+                return index, page
+        if self._free_pages:
+            index = self._free_pages.pop()
+        else:
+            index = len(self._pages)
+            self._pages.append(None)
+        page = self._pages[index] = _Page(self.page_size)
+        self.page_bytes += page.pixels.nbytes
+        return index, page
+
+    def _drop_page(self, index: int) -> None:
+        self.page_bytes -= self._pages[index].pixels.nbytes
+        self._pages[index] = None
+        self._free_pages.append(index)
+        if index in self._fragmented:
+            self._fragmented.remove(index)
@@ -0,0 +1,97 @@
+"""
+Per-producer draw contexts for Overlay.
+
+A DrawContext collects the instances of one producer thread (a CV worker, a UI thread) without taking the
+overlay's instances_lock. The producer stages a complete frame and publishes it with commit(); the renderer
+draws the last committed frame of every context after the overlay's own instances, ordered by
+(order, creation). Producers running at different rates therefore never contend per draw call and never
+show half-drawn frames.
+"""
+
+import threading
+from threading import Lock
+from typing import Any, List, Optional
+
+from .instances import InstanceQueue
+
+
+class DrawContext:
+    """
+    Instance staging area of one producer thread, created with Overlay.draw_context().
+
+    Inside a `with` block, the overlay's draw_* / add_sprite_instance() calls made by the same thread go
+    to the context; leaving the block commits the staged frame (an exception discards it instead).
+    The context can also be filled and committed explicitly.
+
+    Attributes:
+        name: Context name
+        order: Contexts are drawn in ascending order (equal order keeps creation order)
+        commits: Number of committed frames
+
+    Example:
+        with overlay.draw_context('detections', order=1):
+            for box in boxes:
+                overlay.draw_rect(*box, color=(0, 255, 0, 255), thickness=2)
+        # the UI thread keeps calling signal_render(); the detections stay until the next commit
+    """
+
+    def __init__(self, name: str, order: int, index: int, binding: threading.local):
+        self.name = name
+        self.order = int(order)
+        self.index = index
+        self._binding = binding  # Overlay's thread-local routing of add_sprite_instance()
+        self._lock = Lock()  # taken on commit and when the renderer reads the frame, never per instance
+        self._staging = InstanceQueue()
+        self._published = InstanceQueue()
+        self._previous: List[Optional["DrawContext"]] = []
+        self.commits = 0
+
+    def add_sprite_instance(self, sprite_key: Any, x: int, y: int) -> None:
+        """Stage an instance for the next commit (no locking; call from the owning thread)."""
+        self._staging.append(sprite_key, int(x), int(y))
+
+    def add_sprite_instances(self, sprite_keys: Any, xs: Any, ys: Any, ids: Any = None) -> None:
+        """Stage instances from arrays (see Overlay.add_sprite_instances)."""
+        self._staging.extend(sprite_keys, xs, ys, ids)
+
+    def clear(self) -> None:
+        """Drop the staged (uncommitted) instances."""
+        self._staging.clear()
+
+    def commit(self) -> None:
+        """Publish the staged instances as this context's frame and start a new empty one."""
+        self._staging.flush()  # published queues are only read
+        with self._lock:
+            self._published = self._staging
+            self.commits += 1
+        self._staging = InstanceQueue()  # the published queue is read by the renderer, never reused
+
+    def discard(self) -> None:
+        """Remove the published frame (the context draws nothing until the next commit)."""
+        with self._lock:
+            self._published = InstanceQueue()
+
+    def published(self) -> InstanceQueue:
+        """The last committed frame (do not modify)."""
+        with self._lock:
+            return self._published
+
+    def __enter__(self) -> "DrawContext":
+        self._previous.append(getattr(self._binding, 'context', None))
+        self._binding.context = self
+        self._staging.clear()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._binding.context = self._previous.pop()
+        if exc_type is None:
+            self.commit()
+        else:
+            self.clear()
+        return False
+
+    def __len__(self) -> int:
+        return len(self.published())
+
+    def __repr__(self) -> str:
+        return f"DrawContext(name={self.name!r}, order={self.order}, instances={len(self)}, commits={self.commits})"
@@ -1,36 +1,49 @@
-import sys
+import os
+import math
+import threading
 import time
-from threading import Thread, Event, Lock
-from ctypes import *
-from ctypes.wintypes import POINT, SIZE, BYTE
+from threading import Thread, Event, Lock, Condition
 import logging
-from typing import Any, Dict, List, Optional, Tuple, DefaultDict, Literal, Sequence
-from collections import defaultdict
-
-# OS compatibility check
-if sys.platform != 'win32':
-    raise ImportError("This library works only on Windows")
+from typing import Any, Callable, Dict, List, Optional, Tuple, Literal, Sequence
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from operator import itemgetter
 
 try:
-    from win32api import GetModuleHandle, GetSystemMetrics
-    import win32con
-    import win32gui
     import numpy as np
-    from PIL import Image, ImageDraw, ImageFont
+    import PIL
+    from PIL import Image, ImageDraw
 except ImportError as e:
     raise ImportError(f"Required dependencies not found: {e}")
 
+from .presenters import Presenter, HeadlessPresenter, WIN32_AVAILABLE
+from .scene import InstanceHandle, RetainedScene, Layer
+from .pacing import FramePacer
+from .context import DrawContext
+from .instances import InstanceQueue
+from .atlas import SpriteAtlas
+from .fonts import FontCache
+from .glyphs import GlyphCache
+from .sprites import SpriteCache, SpriteHandle, TypeStats
+from .store import SpriteStore, spec_digest
+
+if WIN32_AVAILABLE:
+    from .presenters import Win32Presenter
+
 # Module logger
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
 # Optional Numba import with availability flag and fallback
 try:
-    from numba import jit  # type: ignore
+    from numba import jit, prange  # type: ignore
+    import numba
 
     NUMBA_AVAILABLE = True
 except Exception:
     NUMBA_AVAILABLE = False
+    prange = range
 
 
     def jit(*a, **kw):  # type: ignore
@@ -41,19 +54,40 @@ except Exception:
         return wrapper
 
 
-class BLENDFUNCTION(Structure):
-    _fields_ = [
-        ("BlendOp", BYTE),
-        ("BlendFlags", BYTE),
-        ("SourceConstantAlpha", BYTE),
-        ("AlphaFormat", BYTE)
-    ]
+def _blend_reference(dst, src):
+    """
+    Reference premultiplied source-over for BGRA uint8 arrays of equal shape (returns a new array).
+
+        out = src + round(dst * (255 - src_a) / 255)
+
+    computed per channel as (dst * inv + 127) // 255. Since 255 is odd, x / 255 is never exactly halfway
+    between two integers, so this is round-to-nearest. For premultiplied sources (every channel <= src_a)
+    the result never exceeds 255 and needs no clamping. All compositing kernels here are bit-exact with it.
+    """
+    src_u = src.astype(np.uint32)
+    inv = 255 - src_u[..., 3:4]
+    return (src_u + (dst.astype(np.uint32) * inv + 127) // 255).astype(np.uint8)
 
 
 if NUMBA_AVAILABLE:
-    @jit(nopython=True, fastmath=True, cache=True)
+    @jit(nopython=True, fastmath=True, cache=True, nogil=True)
+    def _blend_packed(d, s):
+        """
+        Source-over of packed premultiplied BGRA pixels (uint32, B in the low byte), bit-exact with
+        _blend_reference. B|R and G|A are processed as two 16-bit lanes per multiply, and the
+        exact division by 255 uses (x + 128 + ((x + 128) >> 8)) >> 8 in each lane.
+        """
+        inv = 255 - (s >> 24)
+        rb = (d & 0x00FF00FF) * inv + 0x00800080
+        rb = ((rb + ((rb >> 8) & 0x00FF00FF)) >> 8) & 0x00FF00FF
+        ga = ((d >> 8) & 0x00FF00FF) * inv + 0x00800080
+        ga = (ga + ((ga >> 8) & 0x00FF00FF)) & 0xFF00FF00
+        return s + rb + ga
+
+
+    @jit(nopython=True, fastmath=True, cache=True, nogil=True)
     def _blit_sprite_into_buf(buf, sprite, x, y):
-        """Optimized blit with Numba"""
+        """Optimized blit with Numba (bit-exact with _blend_reference)"""
         sh, sw = sprite.shape[:2]
         bh, bw = buf.shape[:2]
 
@@ -77,47 +111,12 @@ if NUMBA_AVAILABLE:
             for j in range(sx1, sx2):
                 buf_x = x1 + (j - sx1)
 
-                # Read pixels as int to avoid overflow in fallback without Numba
-                src_r = int(sprite[i, j, 0])
-                src_g = int(sprite[i, j, 1])
-                src_b = int(sprite[i, j, 2])
-                src_a = int(sprite[i, j, 3])
-
-                dst_r = int(buf[buf_y, buf_x, 0])
-                dst_g = int(buf[buf_y, buf_x, 1])
-                dst_b = int(buf[buf_y, buf_x, 2])
-                dst_a = int(buf[buf_y, buf_x, 3])
-
-                # Premultiplied alpha blending: out = src + dst * (1 - src_a)
-                inv_alpha = 255 - src_a
-
-                out_r = src_r + (dst_r * inv_alpha) // 255
-                out_g = src_g + (dst_g * inv_alpha) // 255
-                out_b = src_b + (dst_b * inv_alpha) // 255
-                out_a = src_a + (dst_a * inv_alpha) // 255
-
-                # Clamp and write
-                if out_r < 0:
-                    out_r = 0
-                elif out_r > 255:
-                    out_r = 255
-                if out_g < 0:
-                    out_g = 0
-                elif out_g > 255:
-                    out_g = 255
-                if out_b < 0:
-                    out_b = 0
-                elif out_b > 255:
-                    out_b = 255
-                if out_a < 0:
-                    out_a = 0
-                elif out_a > 255:
-                    out_a = 255
-
-                buf[buf_y, buf_x, 0] = out_r
-                buf[buf_y, buf_x, 1] = out_g
-                buf[buf_y, buf_x, 2] = out_b
-                buf[buf_y, buf_x, 3] = out_a
+                # Premultiplied alpha blending: out = src + round(dst * (255 - src_a) / 255), at most
+                # src_a + (255 - src_a) since every channel of a premultiplied sprite is <= its alpha
+                inv_alpha = 255 - int(sprite[i, j, 3])
+                for c in range(4):
+                    v = int(buf[buf_y, buf_x, c]) * inv_alpha + 128
+                    buf[buf_y, buf_x, c] = int(sprite[i, j, c]) + ((v + (v >> 8)) >> 8)
 else:
     def _blit_sprite_into_buf(buf, sprite, x, y):
         """
@@ -154,6 +153,804 @@ else:
         dst[..., 3] = out_a.astype(np.uint8)
 
 
+
+# ---------------- Batched compositing ----------------
+# A frame is packed into contiguous arrays: a flat pool of packed BGRA pixels holding every sprite the frame
+# references, per-slot offsets/sizes into that pool, and per-instance slot ids and positions. One kernel
+# call then composites all instances clipped to a region, without per-instance interpreter work.
+#
+# Every pooled sprite also carries its opacity spans: per row, a list of runs (x0, x1, kind) with
+# kind SPAN_OPAQUE (plain copy) or SPAN_MIXED (blend). Fully transparent pixels have no run and are skipped.
+# The pool tuple passed to the kernels is (pixels, offs, ws, hs, rowbase, rowoffs, runs, colors, params):
+# rows of slot s are rowoffs[rowbase[s] + r] .. rowoffs[rowbase[s] + r + 1] in runs.
+#
+# Draw ops (fill_rect, draw_circle_aa, draw_line_aa) have no pixels: their slot has a negative kind in offs[s],
+# a packed premultiplied color colors[s] and geometry params[s] relative to the slot origin, in continuous
+# coordinates where pixel (i, j) has its center at (j + 0.5, i + 0.5). The kernels rasterize them in place.
+SPAN_OPAQUE = 1
+SPAN_MIXED = 2
+_OP_FILL = -1  # constant color over the whole slot
+_OP_CIRCLE = -2  # params: cx, cy, outer radius, inner radius (0 = filled disc)
+_OP_LINE = -3  # params: ax, ay, bx, by, half width (round caps)
+# Opaque runs and transparent gaps shorter than this are folded into the surrounding mixed run
+_SPAN_MIN_RUN = 8
+# Occlusion culling tests each instance against at most this many of the frame's largest opaque cores
+_OCCLUDER_LIMIT = 32
+# Cell edge (px) of the per-buffer map of touched areas used to limit clears
+_CLEAR_CELL = 64
+
+if NUMBA_AVAILABLE:
+    @jit(nopython=True, cache=True, nogil=True)
+    def _classify_spans(alpha, min_run):
+        """Return (rowoffs (h+1,), runs (n, 3)) opacity spans of an alpha plane."""
+        h, w = alpha.shape
+        rowoffs = np.empty(h + 1, dtype=np.int64)
+        runs = np.empty((max(16, 2 * h), 3), dtype=np.int32)
+        n = 0
+        for i in range(h):
+            rowoffs[i] = n
+            j = 0
+            while j < w:
+                if alpha[i, j] == 0:
+                    j += 1
+                    continue
+                # Non-transparent segment [start, end) without transparent gaps of min_run or more
+                start = j
+                end = j + 1
+                k = j + 1
+                while k < w:
+                    if alpha[i, k] != 0:
+                        k += 1
+                        end = k
+                        continue
+                    g = k
+                    while g < w and alpha[i, g] == 0:
+                        g += 1
+                    if g - k >= min_run or g == w:
+                        break
+                    k = g
+                # Split the segment into long opaque runs and mixed runs
+                mixed_start = start
+                q = start
+                while q < end:
+                    if alpha[i, q] != 255:
+                        q += 1
+                        continue
+                    r = q
+                    while r < end and alpha[i, r] == 255:
+                        r += 1
+                    if r - q >= min_run:
+                        for x0, x1, kind in ((mixed_start, q, SPAN_MIXED), (q, r, SPAN_OPAQUE)):
+                            if x0 < x1:
+                                if n == runs.shape[0]:
+                                    grown = np.empty((2 * n, 3), dtype=np.int32)
+                                    grown[:n] = runs
+                                    runs = grown
+                                runs[n, 0] = x0
+                                runs[n, 1] = x1
+                                runs[n, 2] = kind
+                                n += 1
+                        mixed_start = r
+                    q = r
+                if mixed_start < end:
+                    if n == runs.shape[0]:
+                        grown = np.empty((2 * n, 3), dtype=np.int32)
+                        grown[:n] = runs
+                        runs = grown
+                    runs[n, 0] = mixed_start
+                    runs[n, 1] = end
+                    runs[n, 2] = SPAN_MIXED
+                    n += 1
+                j = end
+        rowoffs[h] = n
+        return rowoffs, runs[:n].copy()
+
+
+    @jit(nopython=True, cache=True, nogil=True)
+    def _op_coverage(kind, p, px, py):
+        """Analytic coverage (0..1) of a circle/line draw op at pixel center (px, py); same math as _op_coverage_np."""
+        if kind == _OP_CIRCLE:
+            d = math.sqrt((px - p[0]) * (px - p[0]) + (py - p[1]) * (py - p[1]))
+            cov = min(1.0, max(0.0, p[2] - d + 0.5))
+            if p[3] > 0.0:
+                cov -= min(1.0, max(0.0, p[3] - d + 0.5))
+            return cov
+        ex = p[2] - p[0]
+        ey = p[3] - p[1]
+        ll = ex * ex + ey * ey
+        t = 0.0
+        if ll > 0.0:
+            t = min(1.0, max(0.0, ((px - p[0]) * ex + (py - p[1]) * ey) / ll))
+        dx = px - (p[0] + t * ex)
+        dy = py - (p[1] + t * ey)
+        return min(1.0, max(0.0, p[4] - math.sqrt(dx * dx + dy * dy) + 0.5))
+
+
+    @jit(nopython=True, cache=True, nogil=True)
+    def _op_row_bounds(kind, p, py, w):
+        """Conservative [a, b) column range (slot-relative) of a row where the op can have nonzero coverage."""
+        if kind == _OP_CIRCLE:
+            e = p[2] + 0.5
+            dy = py - p[1]
+            if dy * dy >= e * e:
+                return 0, 0
+            half = math.sqrt(e * e - dy * dy)
+            return max(0, int(math.floor(p[0] - half)) - 1), min(w, int(math.ceil(p[0] + half)) + 1)
+        ex = p[2] - p[0]
+        ey = p[3] - p[1]
+        if abs(ey) < 1e-6:
+            return 0, w
+        # Band around the infinite line: |cross(P - A, E)| / |E| < half width + 0.5
+        reach = (p[4] + 0.5) * math.sqrt(ex * ex + ey * ey)
+        u = p[0] + ((py - p[1]) * ex - reach) / ey
+        v = p[0] + ((py - p[1]) * ex + reach) / ey
+        return max(0, int(math.floor(min(u, v))) - 1), min(w, int(math.ceil(max(u, v))) + 1)
+
+
+    @jit(nopython=True, cache=True, nogil=True)
+    def _scale_packed(c, k):
+        """Packed premultiplied color scaled by k/255 per channel, rounded like _blend_reference."""
+        rb = (c & 0x00FF00FF) * k + 0x00800080
+        rb = ((rb + ((rb >> 8) & 0x00FF00FF)) >> 8) & 0x00FF00FF
+        ga = ((c >> 8) & 0x00FF00FF) * k + 0x00800080
+        ga = (ga + ((ga >> 8) & 0x00FF00FF)) & 0xFF00FF00
+        return rb | ga
+
+
+    @jit(nopython=True, fastmath=True, cache=True, nogil=True)
+    def _draw_op_region(buf, kind, c, p, x, y, x1, y1, x2, y2):
+        """Rasterize a draw op with origin (x, y) into packed buf, clipped to [x1, x2) x [y1, y2)."""
+        if kind == _OP_FILL:
+            if (c >> 24) == 255:
+                buf[y1:y2, x1:x2] = c
+            elif c != 0:
+                for by in range(y1, y2):
+                    for bx in range(x1, x2):
+                        buf[by, bx] = _blend_packed(buf[by, bx], c)
+            return
+        if c == 0:
+            return
+        opaque = (c >> 24) == 255
+        for by in range(y1, y2):
+            py = by - y + 0.5
+            a, b = _op_row_bounds(kind, p, py, x2 - x)
+            for bx in range(max(x1, x + a), min(x2, x + b)):
+                k = int(_op_coverage(kind, p, bx - x + 0.5, py) * 255.0 + 0.5)
+                if k == 0:
+                    continue
+                if k == 255 and opaque:
+                    buf[by, bx] = c
+                else:
+                    buf[by, bx] = _blend_packed(buf[by, bx], c if k == 255 else _scale_packed(c, k))
+
+
+    @jit(nopython=True, fastmath=True, cache=True, nogil=True)
+    def _blit_instance(buf, pool, s, x, y, rx1, ry1, rx2, ry2):
+        """Composite pool slot s at (x, y) into packed buf (h, w) uint32, limited to [rx1, rx2) x [ry1, ry2)."""
+        pixels, offs, ws, hs, rowbase, rowoffs, runs, colors, params = pool
+        sw = ws[s]
+        sh = hs[s]
+        x1, y1 = max(rx1, x), max(ry1, y)
+        x2, y2 = min(rx2, x + sw), min(ry2, y + sh)
+        if x1 >= x2 or y1 >= y2:
+            return
+        if offs[s] < 0:
+            _draw_op_region(buf, offs[s], colors[s], params[s], x, y, x1, y1, x2, y2)
+            return
+        for by in range(y1, y2):
+            r = by - y
+            row = offs[s] + r * sw - x
+            rb = rowbase[s] + r
+            for k in range(rowoffs[rb], rowoffs[rb + 1]):
+                a = max(x1, runs[k, 0] + x)
+                b = min(x2, runs[k, 1] + x)
+                if a >= b:
+                    continue
+                if runs[k, 2] == SPAN_OPAQUE:
+                    buf[by, a:b] = pixels[row + a:row + b]
+                    continue
+                for bx in range(a, b):
+                    buf[by, bx] = _blend_packed(buf[by, bx], pixels[row + bx])
+
+
+    @jit(nopython=True, fastmath=True, cache=True, nogil=True)
+    def _blit_batch_region(buf, pool, sids, xs, ys, rx1, ry1, rx2, ry2):
+        """Composite all instances, in order, into packed buf (h, w) uint32 limited to [rx1, rx2) x [ry1, ry2)."""
+        for n in range(sids.shape[0]):
+            _blit_instance(buf, pool, sids[n], xs[n], ys[n], rx1, ry1, rx2, ry2)
+
+
+    @jit(nopython=True, fastmath=True, cache=True, nogil=True)
+    def _blit_batch_indexed(buf, pool, sids, xs, ys, idx, rx1, ry1, rx2, ry2):
+        """Like _blit_batch_region for the instances idx only (indices into sids/xs/ys, in draw order)."""
+        for i in range(idx.shape[0]):
+            n = idx[i]
+            _blit_instance(buf, pool, sids[n], xs[n], ys[n], rx1, ry1, rx2, ry2)
+
+
+    @jit(nopython=True, fastmath=True, cache=True, nogil=True, parallel=True)
+    def _blit_batch_cells(buf, pool, sids, xs, ys, pieces, cell_start, cell_items, clear, clear_value):
+        """
+        Composite every piece (x1, y1, x2, y2, cell) of packed buf in parallel; a piece only visits the
+        instances binned into its grid cell (see _SpatialGrid). Pieces must not overlap.
+        """
+        for t in prange(pieces.shape[0]):
+            x1, y1, x2, y2, c = pieces[t, 0], pieces[t, 1], pieces[t, 2], pieces[t, 3], pieces[t, 4]
+            if clear:
+                buf[y1:y2, x1:x2] = clear_value
+            _blit_batch_indexed(buf, pool, sids, xs, ys, cell_items[cell_start[c]:cell_start[c + 1]], x1, y1, x2, y2)
+
+
+    @jit(nopython=True, fastmath=True, cache=True, nogil=True)
+    def _blit_batch_cells_serial(buf, pool, sids, xs, ys, pieces, cell_start, cell_items, clear, clear_value):
+        """Single-threaded _blit_batch_cells."""
+        for t in range(pieces.shape[0]):
+            x1, y1, x2, y2, c = pieces[t, 0], pieces[t, 1], pieces[t, 2], pieces[t, 3], pieces[t, 4]
+            if clear:
+                buf[y1:y2, x1:x2] = clear_value
+            _blit_batch_indexed(buf, pool, sids, xs, ys, cell_items[cell_start[c]:cell_start[c + 1]], x1, y1, x2, y2)
+
+
+    @jit(nopython=True, cache=True, nogil=True)
+    def _bin_instances(xs, ys, ws, hs, cell, gw, gh):
+        """Bin instance bounds into a gw x gh grid: (cell_start (gw*gh + 1,), cell_items) in draw order per cell."""
+        n = xs.shape[0]
+        start = np.zeros(gw * gh + 1, dtype=np.int64)
+        for i in range(n):
+            cx1, cx2 = min(max(xs[i] // cell, 0), gw - 1), min(max((xs[i] + ws[i] - 1) // cell, 0), gw - 1)
+            cy1, cy2 = min(max(ys[i] // cell, 0), gh - 1), min(max((ys[i] + hs[i] - 1) // cell, 0), gh - 1)
+            for cy in range(cy1, cy2 + 1):
+                for cx in range(cx1, cx2 + 1):
+                    start[cy * gw + cx + 1] += 1
+        for c in range(gw * gh):
+            start[c + 1] += start[c]
+        fill = start[:-1].copy()
+        items = np.empty(start[gw * gh], dtype=np.int64)
+        for i in range(n):
+            cx1, cx2 = min(max(xs[i] // cell, 0), gw - 1), min(max((xs[i] + ws[i] - 1) // cell, 0), gw - 1)
+            cy1, cy2 = min(max(ys[i] // cell, 0), gh - 1), min(max((ys[i] + hs[i] - 1) // cell, 0), gh - 1)
+            for cy in range(cy1, cy2 + 1):
+                for cx in range(cx1, cx2 + 1):
+                    c = cy * gw + cx
+                    items[fill[c]] = i
+                    fill[c] += 1
+        return start, items
+
+
+    @jit(nopython=True, cache=True, nogil=True)
+    def _opaque_core(rowoffs, runs, w):
+        """Largest rectangle (x1, y1, x2, y2) covered by SPAN_OPAQUE runs; (0, 0, 0, 0) if there is none."""
+        h = rowoffs.shape[0] - 1
+        heights = np.zeros(w + 1, dtype=np.int64)  # heights[w] stays 0 and flushes the stack
+        stack = np.empty(w + 1, dtype=np.int64)
+        best = 0
+        bx1, by1, bx2, by2 = 0, 0, 0, 0
+        for i in range(h):
+            k = rowoffs[i]
+            for j in range(w):
+                while k < rowoffs[i + 1] and runs[k, 1] <= j:
+                    k += 1
+                opaque = k < rowoffs[i + 1] and runs[k, 0] <= j and runs[k, 2] == SPAN_OPAQUE
+                heights[j] = heights[j] + 1 if opaque else 0
+            top = 0
+            for j in range(w + 1):
+                while top > 0 and heights[stack[top - 1]] >= heights[j]:
+                    hgt = heights[stack[top - 1]]
+                    top -= 1
+                    left = stack[top - 1] + 1 if top > 0 else 0
+                    if hgt * (j - left) > best:
+                        best = hgt * (j - left)
+                        bx1, by1, bx2, by2 = left, i + 1 - hgt, j, i + 1
+                stack[top] = j
+                top += 1
+        return bx1, by1, bx2, by2
+
+
+    @jit(nopython=True, cache=True, nogil=True)
+    def _occluded_mask(bx1, by1, bx2, by2, occluders, ox1, oy1, ox2, oy2):
+        """
+        True for instances whose on-screen bounds lie inside the opaque core of a later occluder.
+        occluders are instance indices; o* their cores in screen coordinates.
+        """
+        hidden = np.zeros(bx1.shape[0], dtype=np.bool_)
+        for t in range(occluders.shape[0]):
+            for i in range(occluders[t]):
+                if (not hidden[i] and ox1[t] <= bx1[i] and oy1[t] <= by1[i]
+                        and bx2[i] <= ox2[t] and by2[i] <= oy2[t]):
+                    hidden[i] = True
+        return hidden
+else:
+    def _classify_spans(alpha, min_run):
+        """NumPy fallback: one mixed run per row over its non-transparent extent, opaque for solid rows."""
+        h, w = alpha.shape
+        nonzero = alpha != 0
+        has_any = nonzero.any(axis=1)
+        first = np.argmax(nonzero, axis=1)
+        last = w - np.argmax(nonzero[:, ::-1], axis=1)
+        solid = (alpha == 255).all(axis=1)
+        rows = np.flatnonzero(has_any)
+        runs = np.empty((rows.size, 3), dtype=np.int32)
+        runs[:, 0] = first[rows]
+        runs[:, 1] = last[rows]
+        runs[:, 2] = np.where(solid[rows], SPAN_OPAQUE, SPAN_MIXED)
+        rowoffs = np.zeros(h + 1, dtype=np.int64)
+        rowoffs[1:] = np.cumsum(has_any)
+        return rowoffs, runs
+
+
+    def _blit_batch_region(buf, pool, sids, xs, ys, rx1, ry1, rx2, ry2):
+        """NumPy fallback: composite all instances, in order, into the region."""
+        _blit_batch_indexed(buf, pool, sids, xs, ys, range(sids.shape[0]), rx1, ry1, rx2, ry2)
+
+
+    def _blit_batch_indexed(buf, pool, sids, xs, ys, idx, rx1, ry1, rx2, ry2):
+        """NumPy fallback: per-instance blit of pool slices into the region view."""
+        pixels, offs, ws, hs = pool[:4]
+        colors, params = pool[7:]
+        view = _bgra_view(buf[ry1:ry2, rx1:rx2])
+        for n in idx:
+            s = sids[n]
+            off, sw, sh = int(offs[s]), int(ws[s]), int(hs[s])
+            x, y = int(xs[n]), int(ys[n])
+            if x >= rx2 or y >= ry2 or x + sw <= rx1 or y + sh <= ry1:
+                continue
+            if off < 0:
+                x1, y1 = max(rx1, x), max(ry1, y)
+                x2, y2 = min(rx2, x + sw), min(ry2, y + sh)
+                c = colors[s]
+                if c == 0:
+                    continue
+                if off == _OP_FILL and c >> 24 == 255:
+                    buf[y1:y2, x1:x2] = c
+                    continue
+                src = _bgra_view(colors[s:s + 1])
+                dst = _bgra_view(buf[y1:y2, x1:x2])
+                if off != _OP_FILL:
+                    py, px = np.mgrid[y1 - y:y2 - y, x1 - x:x2 - x] + 0.5
+                    k = (_op_coverage_np(off, params[s], px, py) * 255.0 + 0.5).astype(np.uint32)
+                    src = ((src.astype(np.uint32) * k[..., None] + 127) // 255).astype(np.uint8)
+                dst[...] = _blend_reference(dst, src)
+                continue
+            sprite = _bgra_view(pixels[off:off + sw * sh].reshape(sh, sw))
+            _blit_sprite_into_buf(view, sprite, x - rx1, y - ry1)
+
+
+    def _blit_batch_cells_serial(buf, pool, sids, xs, ys, pieces, cell_start, cell_items, clear, clear_value):
+        for x1, y1, x2, y2, c in pieces.tolist():
+            if clear:
+                buf[y1:y2, x1:x2] = clear_value
+            _blit_batch_indexed(buf, pool, sids, xs, ys, cell_items[cell_start[c]:cell_start[c + 1]], x1, y1, x2, y2)
+
+
+    _blit_batch_cells = _blit_batch_cells_serial
+
+
+    def _bin_instances(xs, ys, ws, hs, cell, gw, gh):
+        """NumPy fallback: vectorized binning, stable-sorted by cell so each cell keeps draw order."""
+        cx1 = np.clip(xs // cell, 0, gw - 1)
+        cx2 = np.clip((xs + ws - 1) // cell, 0, gw - 1)
+        cy1 = np.clip(ys // cell, 0, gh - 1)
+        cy2 = np.clip((ys + hs - 1) // cell, 0, gh - 1)
+        nx = cx2 - cx1 + 1
+        counts = nx * (cy2 - cy1 + 1)
+        inst = np.repeat(np.arange(xs.shape[0], dtype=np.int64), counts)
+        k = np.arange(inst.shape[0], dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (cy1[inst] + k // nx[inst]) * gw + cx1[inst] + k % nx[inst]
+        order = np.argsort(cells, kind='stable')
+        start = np.zeros(gw * gh + 1, dtype=np.int64)
+        start[1:] = np.cumsum(np.bincount(cells, minlength=gw * gh))
+        return start, inst[order]
+
+
+    def _opaque_core(rowoffs, runs, w):
+        """NumPy fallback: the longest band of fully opaque rows (the fallback classifier only marks whole rows)."""
+        h = rowoffs.shape[0] - 1
+        solid = np.zeros(h, dtype=bool)
+        single = np.flatnonzero(np.diff(rowoffs) == 1)
+        first = runs[rowoffs[single]]
+        solid[single] = (first[:, 0] == 0) & (first[:, 1] == w) & (first[:, 2] == SPAN_OPAQUE)
+        if not solid.any():
+            return 0, 0, 0, 0
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], solid.view(np.int8), [0]))))
+        starts, ends = edges[::2], edges[1::2]
+        b = int(np.argmax(ends - starts))
+        return 0, int(starts[b]), w, int(ends[b])
+
+
+    def _occluded_mask(bx1, by1, bx2, by2, occluders, ox1, oy1, ox2, oy2):
+        """NumPy fallback: one vectorized containment test per occluder."""
+        hidden = np.zeros(bx1.shape[0], dtype=bool)
+        for t, j in enumerate(occluders.tolist()):
+            hidden[:j] |= ((ox1[t] <= bx1[:j]) & (oy1[t] <= by1[:j]) & (bx2[:j] <= ox2[t]) & (by2[:j] <= oy2[t]))
+        return hidden
+
+
+def _packed_view(buf):
+    """(h, w, 4) uint8 BGRA -> (h, w) uint32 view of the same memory (last axis must be contiguous)."""
+    return buf.view(np.uint32)[..., 0]
+
+
+def _bgra_view(buf32):
+    """(h, w) uint32 -> (h, w, 4) uint8 BGRA view of the same memory."""
+    return buf32[..., None].view(np.uint8)
+
+
+def _op_coverage_np(kind, p, px, py):
+    """Vectorized analytic coverage of a circle/line draw op at pixel centers (px, py) arrays."""
+    if kind == _OP_CIRCLE:
+        d = np.sqrt((px - p[0]) * (px - p[0]) + (py - p[1]) * (py - p[1]))
+        cov = np.minimum(1.0, np.maximum(0.0, p[2] - d + 0.5))
+        if p[3] > 0.0:
+            cov -= np.minimum(1.0, np.maximum(0.0, p[3] - d + 0.5))
+        return cov
+    ex = p[2] - p[0]
+    ey = p[3] - p[1]
+    ll = ex * ex + ey * ey
+    t = 0.0
+    if ll > 0.0:
+        t = np.minimum(1.0, np.maximum(0.0, ((px - p[0]) * ex + (py - p[1]) * ey) / ll))
+    dx = px - (p[0] + t * ex)
+    dy = py - (p[1] + t * ey)
+    return np.minimum(1.0, np.maximum(0.0, p[4] - np.sqrt(dx * dx + dy * dy) + 0.5))
+
+
+def _sprite_spans(sprite):
+    """Classify a premultiplied BGRA sprite into per-row opacity spans (see _classify_spans)."""
+    return _classify_spans(np.ascontiguousarray(sprite[:, :, 3]), _SPAN_MIN_RUN)
+
+
+# Persisted sprites (set_sprite_store) are reused only by the same raster version: bump the number when
+# create_* output or the span format changes; Pillow upgrades may change antialiasing and text layout, and the
+# NumPy fallback of _classify_spans produces coarser spans than the jitted one
+_RASTER_VERSION = f"1/{'jit' if NUMBA_AVAILABLE else 'np'}-{_SPAN_MIN_RUN}/Pillow-{PIL.__version__}"
+
+
+# draw_text/draw_glyph_text anchors: fractions of the text block's width and height left/above the anchor point
+_TEXT_ANCHORS = {
+    'lt': (0.0, 0.0), 'mt': (0.5, 0.0), 'rt': (1.0, 0.0),
+    'lm': (0.0, 0.5), 'mm': (0.5, 0.5), 'rm': (1.0, 0.5),
+    'lb': (0.0, 1.0), 'mb': (0.5, 1.0), 'rb': (1.0, 1.0),
+}
+
+
+def _font_identity(font_path: Optional[str]) -> Any:
+    """Identity of a text sprite's font file for persisted sprites: (path, size, mtime) or the name as given."""
+    if not font_path:
+        return None
+    try:
+        st = os.stat(font_path)
+    except OSError:
+        return (font_path, None)
+    return (os.path.abspath(font_path), st.st_size, st.st_mtime_ns)
+
+
+def _pack_color(color) -> int:
+    """RGBA tuple -> packed premultiplied BGRA uint32 (same rounding as Overlay._premultiply_arr)."""
+    arr = Overlay._premultiply_arr(np.array([[color]], dtype=np.uint8))
+    return int(_packed_view(arr)[0, 0])
+
+
+class _PrivateKey(tuple):
+    """
+    Instance key produced by the library itself rather than a sprite cache key. Compares unequal to plain
+    tuples (and to other private key types) so it cannot collide with a user sprite key.
+    """
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(other) is type(self) and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = tuple.__hash__
+
+
+class _LayerKey(_PrivateKey):
+    """('layer', name) — the cached surface of a static layer."""
+    __slots__ = ()
+
+    def __new__(cls, name: str):
+        return tuple.__new__(cls, ('layer', name))
+
+
+class _DrawOp(_PrivateKey):
+    """
+    Instance key of a shape the kernels rasterize directly: (name, width, height, packed_color, *params).
+    Never stored in the sprite cache.
+    """
+    __slots__ = ()
+    KIND = 0
+
+
+class _SolidFill(_DrawOp):
+    """('fill', width, height, packed_color)"""
+    __slots__ = ()
+    KIND = _OP_FILL
+
+    def __new__(cls, width: int, height: int, packed_color: int):
+        return tuple.__new__(cls, ('fill', int(width), int(height), int(packed_color)))
+
+
+# Op geometry is quantized so that equal shapes at different positions share one key (and pool slot)
+_OP_SUBPIXEL = 64.0
+
+
+def _op_origin(lo: float, extent: float) -> int:
+    return int(math.floor(lo - extent)) - 1
+
+
+class _AACircle(_DrawOp):
+    """('aa_circle', width, height, packed_color, cx, cy, outer_radius, inner_radius)"""
+    __slots__ = ()
+    KIND = _OP_CIRCLE
+
+    @classmethod
+    def at(cls, cx: float, cy: float, radius: float, thickness: float, packed_color: int):
+        """Return (key, x, y) for a circle centered at continuous (cx, cy)."""
+        x, y = _op_origin(cx, radius), _op_origin(cy, radius)
+        size = int(math.ceil(2 * radius)) + 4
+        q = _OP_SUBPIXEL
+        inner = max(0.0, radius - thickness) if thickness > 0 else 0.0
+        key = tuple.__new__(cls, ('aa_circle', size, size, int(packed_color),
+                                  round((cx - x) * q) / q, round((cy - y) * q) / q,
+                                  round(radius * q) / q, round(inner * q) / q))
+        return key, x, y
+
+
+class _AALine(_DrawOp):
+    """('aa_line', width, height, packed_color, ax, ay, bx, by, half_width)"""
+    __slots__ = ()
+    KIND = _OP_LINE
+
+    @classmethod
+    def at(cls, ax: float, ay: float, bx: float, by: float, thickness: float, packed_color: int):
+        """Return (key, x, y) for a segment between continuous points A and B."""
+        reach = thickness / 2.0 + 0.5
+        x, y = _op_origin(min(ax, bx), reach), _op_origin(min(ay, by), reach)
+        w = int(math.ceil(max(ax, bx) + reach)) + 2 - x
+        h = int(math.ceil(max(ay, by) + reach)) + 2 - y
+        q = _OP_SUBPIXEL
+        key = tuple.__new__(cls, ('aa_line', w, h, int(packed_color),
+                                  round((ax - x) * q) / q, round((ay - y) * q) / q,
+                                  round((bx - x) * q) / q, round((by - y) * q) / q,
+                                  round(thickness / 2.0 * q) / q))
+        return key, x, y
+
+
+def _grow(arr, size: int):
+    """Return arr enlarged along axis 0 to at least size rows (contents preserved)."""
+    if size <= arr.shape[0]:
+        return arr
+    grown = np.zeros((max(size, 2 * arr.shape[0]),) + arr.shape[1:], dtype=arr.dtype)
+    grown[:arr.shape[0]] = arr
+    return grown
+
+
+class _SpritePool:
+    """
+    Flat pixel pool with the sprites referenced by recent frames (render thread only).
+    Sprites are copied in once per version (unique across the sprite cache) and reused across frames;
+    the pool is rebuilt from the current frame's sprites when dead space outgrows live data.
+    """
+
+    def __init__(self):
+        self.pixels = np.zeros(4096, dtype=np.uint32)
+        self.used = 0
+        self.slots: Dict[Any, int] = {}  # sprite version or draw op key -> slot
+        self.offs = np.zeros(64, dtype=np.int64)
+        self.ws = np.zeros(64, dtype=np.int64)
+        self.hs = np.zeros(64, dtype=np.int64)
+        self.rowbase = np.zeros(64, dtype=np.int64)
+        self.rowoffs = np.zeros(1024, dtype=np.int64)
+        self.rows_used = 0
+        self.runs = np.zeros((1024, 3), dtype=np.int32)
+        self.runs_used = 0
+        self.colors = np.zeros(64, dtype=np.uint32)
+        self.params = np.zeros((64, 5), dtype=np.float64)
+        self.cores = np.zeros((64, 4), dtype=np.int64)  # opaque core rect (x1, y1, x2, y2) per slot, for culling
+
+    def reset(self) -> None:
+        self.used = 0
+        self.rows_used = 0
+        self.runs_used = 0
+        self.slots.clear()
+
+    def arrays(self):
+        """Pool tuple for the batched kernels."""
+        return self.pixels, self.offs, self.ws, self.hs, self.rowbase, self.rowoffs, self.runs, self.colors, self.params
+
+    def slot(self, version: int, sprite, spans) -> int:
+        """Return the slot of a sprite version, copying the sprite and its spans into the pool on first use."""
+        slot = self.slots.get(version)
+        if slot is not None:
+            return slot
+        sh, sw = sprite.shape[:2]
+        npix = sh * sw
+        self.pixels = _grow(self.pixels, self.used + npix)
+        # Written through a byte view: atlas sprites are strided views into their page
+        _bgra_view(self.pixels[self.used:self.used + npix].reshape(sh, sw))[...] = sprite
+
+        rowoffs, runs = spans
+        self.rowoffs = _grow(self.rowoffs, self.rows_used + sh + 1)
+        self.rowoffs[self.rows_used:self.rows_used + sh + 1] = rowoffs + self.runs_used
+        self.runs = _grow(self.runs, self.runs_used + runs.shape[0])
+        self.runs[self.runs_used:self.runs_used + runs.shape[0]] = runs
+
+        slot = self._new_slot()
+        self.offs[slot] = self.used
+        self.ws[slot] = sw
+        self.hs[slot] = sh
+        self.rowbase[slot] = self.rows_used
+        self.cores[slot] = _opaque_core(rowoffs, runs, sw)
+        self.used += npix
+        self.rows_used += sh + 1
+        self.runs_used += runs.shape[0]
+        self.slots[version] = slot
+        return slot
+
+    def op_slot(self, key: "_DrawOp") -> int:
+        """Return the slot of a draw op (no pixels: kind, size, color and geometry params)."""
+        slot = self.slots.get(key)
+        if slot is not None:
+            return slot
+        slot = self._new_slot()
+        self.offs[slot] = key.KIND
+        self.ws[slot] = key[1]
+        self.hs[slot] = key[2]
+        self.colors[slot] = key[3]
+        self.params[slot, :len(key) - 4] = key[4:]
+        self.cores[slot] = (0, 0, key[1], key[2]) if key.KIND == _OP_FILL and key[3] >> 24 == 255 else 0
+        self.slots[key] = slot
+        return slot
+
+    def _new_slot(self) -> int:
+        slot = len(self.slots)
+        if slot >= self.offs.shape[0]:
+            self.offs = _grow(self.offs, slot + 1)
+            self.ws = _grow(self.ws, slot + 1)
+            self.hs = _grow(self.hs, slot + 1)
+            self.rowbase = _grow(self.rowbase, slot + 1)
+            self.colors = _grow(self.colors, slot + 1)
+            self.params = _grow(self.params, slot + 1)
+            self.cores = _grow(self.cores, slot + 1)
+        return slot
+
+    def needs_compaction(self, live_pixels: int, live_slots: int) -> bool:
+        return self.used > 2 * live_pixels + (1 << 18) or len(self.slots) > 2 * live_slots + 4096
+
+
+class _StaticSurface:
+    """Cached composite of a static layer (render thread only)."""
+    __slots__ = ('version', 'gens', 'sprite', 'x', 'y', 'gen', 'spans')
+
+    def __init__(self, version, gens, sprite=None, x: int = 0, y: int = 0, gen: int = 0, spans=None):
+        self.version = version  # Layer.version the surface was built from
+        self.gens = gens  # sprite key -> generation (None if missing) at build time
+        self.sprite = sprite  # premultiplied BGRA (h, w, 4) or None for an empty layer
+        self.x = x
+        self.y = y
+        self.gen = gen
+        self.spans = spans
+
+
+class _SpatialGrid:
+    """
+    Uniform grid over a frame's instance bounds. Each cell lists the instances touching it in draw order
+    (CSR: items[start[c]:start[c + 1]]), so a region split along cell lines visits only nearby instances.
+    """
+
+    def __init__(self, xs, ys, ws, hs, cell: int, width: int, height: int):
+        self.cell = cell
+        self.gw = -(-width // cell)
+        self.gh = -(-height // cell)
+        self.start, self.items = _bin_instances(xs, ys, ws, hs, cell, self.gw, self.gh)
+
+    def pieces(self, regions):
+        """Split regions (x1, y1, x2, y2) along cell lines: (n, 5) int64 array of (x1, y1, x2, y2, cell)."""
+        c = self.cell
+        out = []
+        for rx1, ry1, rx2, ry2 in regions:
+            for cy in range(ry1 // c, (ry2 - 1) // c + 1):
+                y1, y2 = max(ry1, cy * c), min(ry2, (cy + 1) * c)
+                for cx in range(rx1 // c, (rx2 - 1) // c + 1):
+                    out.append((max(rx1, cx * c), y1, min(rx2, (cx + 1) * c), y2, cy * self.gw + cx))
+        return np.array(out, dtype=np.int64).reshape(-1, 5)
+
+
+def _touched_cells(xs, ys, ws, hs, width: int, height: int):
+    """
+    Boolean (gh, gw) map of _CLEAR_CELL cells overlapped by the instance bounds (already culled to the frame).
+    Built with a 2D difference array, so the cost does not depend on instance sizes.
+    """
+    c = _CLEAR_CELL
+    gw, gh = -(-width // c), -(-height // c)
+    cx1 = np.clip(xs // c, 0, gw - 1)
+    cy1 = np.clip(ys // c, 0, gh - 1)
+    cx2 = np.clip((xs + ws - 1) // c, 0, gw - 1) + 1
+    cy2 = np.clip((ys + hs - 1) // c, 0, gh - 1) + 1
+    stride, size = gw + 1, (gh + 1) * (gw + 1)
+    diff = (np.bincount(cy1 * stride + cx1, minlength=size) - np.bincount(cy1 * stride + cx2, minlength=size)
+            - np.bincount(cy2 * stride + cx1, minlength=size) + np.bincount(cy2 * stride + cx2, minlength=size))
+    return diff.reshape(gh + 1, gw + 1).cumsum(axis=0).cumsum(axis=1)[:gh, :gw] > 0
+
+
+def _clear_cells(buf, cells, value) -> int:
+    """
+    Fill the cells marked in a _touched_cells map (None = whole buffer) of packed buf with value,
+    one horizontal run of cells at a time. Returns the number of pixels written.
+    """
+    h, w = buf.shape
+    if cells is None or cells.all():
+        buf[...] = value
+        return w * h
+    c = _CLEAR_CELL
+    cleared = 0
+    for cy in np.flatnonzero(cells.any(axis=1)).tolist():
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], cells[cy].astype(np.int8), [0])))).tolist()
+        y1, y2 = cy * c, min(h, (cy + 1) * c)
+        for a, b in zip(edges[::2], edges[1::2]):
+            x1, x2 = a * c, min(w, b * c)
+            buf[y1:y2, x1:x2] = value
+            cleared += (x2 - x1) * (y2 - y1)
+    return cleared
+
+
+def _merge_rects(rects, max_count: int):
+    """
+    Merge overlapping or touching rects (x1, y1, x2, y2) into their bounding boxes.
+    Returns None when more than max_count rects remain (caller should redraw everything).
+    """
+    merged: List[Tuple[int, int, int, int]] = []
+    for r in rects:
+        x1, y1, x2, y2 = r
+        changed = True
+        while changed:
+            changed = False
+            for i in range(len(merged) - 1, -1, -1):
+                mx1, my1, mx2, my2 = merged[i]
+                if x1 <= mx2 and mx1 <= x2 and y1 <= my2 and my1 <= y2:
+                    x1, y1, x2, y2 = min(x1, mx1), min(y1, my1), max(x2, mx2), max(y2, my2)
+                    merged.pop(i)
+                    changed = True
+        merged.append((x1, y1, x2, y2))
+        if len(merged) > max_count * 4:
+            return None
+    return merged if len(merged) <= max_count else None
+
+
+def _diff_instance_rects(old, new) -> List[Tuple[int, int, int, int]]:
+    """
+    Return bboxes of instances that differ between two composited frames.
+    Items are signatures (key, generation, x, y, w, h); order matters, so instances that
+    only changed their stacking position are reported as well.
+    """
+    if old == new:
+        return []
+    old_c = Counter(old)
+    new_c = Counter(new)
+    changed = (old_c - new_c) + (new_c - old_c)
+    rects = [(x, y, x + w, y + h) for (_k, _g, x, y, w, h) in changed]
+
+    # Instances present in both frames but composited in a different order
+    common = old_c & new_c
+    if common:
+        def _filtered(seq):
+            left = Counter(common)
+            out = []
+            for item in seq:
+                if left[item] > 0:
+                    left[item] -= 1
+                    out.append(item)
+            return out
+
+        for a, b in zip(_filtered(old), _filtered(new)):
+            if a != b:
+                rects.append((a[2], a[3], a[2] + a[4], a[3] + a[5]))
+                rects.append((b[2], b[3], b[2] + b[4], b[3] + b[5]))
+    return rects
+
+
 class Overlay:
     """
     High-performance transparent overlay for Windows.
@@ -163,51 +960,98 @@ class Overlay:
         y (int, optional): Y position of overlay. Defaults to 0 (full screen).
         width (int, optional): Overlay width. Defaults to screen width.
         height (int, optional): Overlay height. Defaults to screen height.
+        presenter (Presenter, optional): Presentation backend. Defaults to a layered Win32 window on Windows
+            and to HeadlessPresenter elsewhere (width and height are then required).
     """
 
     # ---------------- Initialization and window management ----------------
     def __init__(self, x: Optional[int] = None, y: Optional[int] = None, width: Optional[int] = None,
-                 height: Optional[int] = None):
+                 height: Optional[int] = None, presenter: Optional[Presenter] = None):
         """Initialize overlay: screen sizes, buffers, events and locks."""
-        self.hInstance = GetModuleHandle()
-        self.className = 'TransparentGraphicsWindow'
-        self.hWindow = None
+        if presenter is None:
+            if WIN32_AVAILABLE:
+                presenter = Win32Presenter()
+            else:
+                logger.info("Win32 is not available; using HeadlessPresenter")
+                presenter = HeadlessPresenter()
+        self.presenter: Presenter = presenter
+        self._presenter_open = False
 
         self.stop_event = Event()
         self.lock = Lock()
 
-        screen_width = GetSystemMetrics(win32con.SM_CXSCREEN)
-        screen_height = GetSystemMetrics(win32con.SM_CYSCREEN)
+        screen_size = presenter.screen_size()
+        if screen_size is None and (width is None or height is None):
+            raise ValueError("width and height are required when the presenter has no screen")
         self.x = x if x is not None else 0
         self.y = y if y is not None else 0
-        self.width = width if width is not None else screen_width
-        self.height = height if height is not None else screen_height
+        self.width = width if width is not None else screen_size[0]
+        self.height = height if height is not None else screen_size[1]
         if self.width <= 0 or self.height <= 0:
             raise ValueError("Overlay area must have positive dimensions")
 
-        self.hdc_mem = None
-        self.bitmap_front = None
-        self.bitmap_back = None
-        self.old_bmp = None
-        self.ppvBits_front = None
-        self.ppvBits_back = None
         self.front_buf = None
         self.back_buf = None
         self.buf_lock = Lock()
         self.clear_back_buffer = False
         self.clear_front_buffer = False
-
-        # Sprite cache: key -> np.ndarray (BGRA premultiplied)
-        # Track last-used timestamps separately
-        self.sprite_cache: Dict[Any, Any] = {}
-        self.sprite_last_used: DefaultDict[Any, float] = defaultdict(float)
+        # Cleared buffers are filled with this color (see set_clear_color); packed premultiplied BGRA
+        self.clear_color: Tuple[int, int, int, int] = (0, 0, 0, 0)
+        self._clear_value = 0
+        self._applied_clear_value = 0
+
+        # Sprite cache: key or SpriteHandle -> np.ndarray (BGRA premultiplied), with per-sprite last-used time,
+        # version (bumped on every insert so the renderer can tell a re-created sprite from the cached one)
+        # and per-row opacity spans computed at insert time (see _classify_spans)
+        self.sprite_cache = SpriteCache()
         self.sprite_lock = Lock()  # Dedicated lock for thread-safe cache access
-        self.front_instances = []  # list of (sprite_key, x, y)
-        self.back_instances = []  # list of (sprite_key, x, y)
+        # Optional on-disk store of rasterized sprites shared across runs (set_sprite_store)
+        self.sprite_store: Optional[SpriteStore] = None
+        # Loaded fonts by (path, size), with missing font files remembered (see fonts.FontCache)
+        self.font_cache = FontCache()
+        # Glyph masks and metrics per (font path, size) for draw_glyph_text (see glyphs.GlyphCache)
+        self.glyph_cache = GlyphCache(self.font_cache.get)
+        self.front_instances = InstanceQueue()  # (sprite_key, x, y) instances of the rendered frame
+        self.back_instances = InstanceQueue()  # instances of the next frame
         self.instances_lock = Lock()
 
+        # --- Frame submission (signal_render) ---
+        # 'latest' — a new frame replaces one the render thread has not started yet (dropped frames are coalesced)
+        # 'queue' — up to submit_queue_size frames wait in order; the oldest is coalesced when the queue is full
+        # 'block' — signal_render() waits while submit_queue_size frames are pending (backpressure)
+        self.submit_policy: Literal['latest', 'queue', 'block'] = 'latest'
+        self.submit_queue_size: int = 2
+        self._frame_cond = Condition(self.instances_lock)  # pending frames changed / a frame was presented
+        self._pending_frames: deque = deque()  # (seq, InstanceQueue) submitted but not yet taken by the renderer
+        self._front_lent = False  # front_instances was handed out again as back_instances (see _submit_frame)
+        self._submit_seq = 0
+        self._rendered_seq = 0
+        self._frames_submitted = 0
+        self._frames_rendered = 0
+        self._frames_coalesced = 0
+
+        # Per-producer draw contexts (draw_context): staged without instances_lock, drawn after the own instances
+        self.draw_contexts: Dict[str, DrawContext] = {}
+        self._contexts_lock = Lock()
+        self._contexts_ordered: List[DrawContext] = []
+        self._context_counter = 0
+        self._thread_binding = threading.local()  # .context: DrawContext receiving this thread's instances
+        # Retained instances (add_sprite_instance(..., retained=True)), drawn below immediate ones every frame
+        self.scene = RetainedScene()
+        # Named layers (create_layer); static ones are cached as pre-composited surfaces by the renderer
+        self.layers: Dict[str, Layer] = {}
+        self._layers_lock = Lock()
+        self._layer_counter = 0
+        self._static_surfaces: Dict[str, _StaticSurface] = {}
+        self._buf_has_retained: Dict[int, bool] = {}  # per buffer (by id): retained content was drawn into it
+        # Per buffer (by id): _touched_cells map of areas that may differ from the clear color; missing = unknown.
+        # Clears only reset these areas, so their cost follows the content rather than the resolution.
+        self._buf_touched: Dict[int, Any] = {}
+
         self.render_event = Event()  # Event to synchronize rendering
         self.thread = None
+        # Frame pacing (set_target_fps): at most one rendered frame per slot; None renders on every signal
+        self.pacer: Optional[FramePacer] = None
 
         self.render_frame_count = 0
         self.render_fps = 0
@@ -217,6 +1061,34 @@ class Overlay:
         self.object_count = 0
         self.object_count_lock = Lock()
 
+        # --- Dirty-rectangle compositing (opt-in, can be changed after creation) ---
+        # When a frame starts from a cleared buffer, only recomposite regions that changed since that buffer
+        # was last drawn, and present only regions that changed since the previous frame.
+        self.enable_dirty_rects: bool = False
+        # More merged dirty rects than this (or dirty area above the fraction) falls back to a full redraw
+        self.dirty_rect_max_count: int = 32
+        self.dirty_rect_max_area_fraction: float = 0.5
+        # Per buffer (by id): signatures composited into it since its last clear; None = unknown content
+        self._buf_history: Dict[int, Optional[list]] = {}
+        self._pending_clear: set = set()
+        self._presented_signature: Optional[list] = None
+        self.last_dirty_rects: Optional[List[Tuple[int, int, int, int]]] = None
+        self.frame_stats: Dict[str, Any] = {}
+        self.frame_stats_lock = Lock()
+
+        # --- Compositing mode (can be changed after creation) ---
+        # 'serial' — one instance at a time on the render thread
+        # 'tiled' — the buffer is split into tile_size tiles composited concurrently by composite_workers threads
+        self.composite_mode: Literal['serial', 'tiled'] = 'serial'
+        self.tile_size: int = 128
+        self.composite_workers: int = os.cpu_count() or 1
+        self._tile_pool: Optional[ThreadPoolExecutor] = None
+        self._tile_pool_workers = 0
+        self._sprite_pool = _SpritePool()
+        # Skip instances fully hidden behind the opaque core of a later one (opaque sprites and fills);
+        # the frame is identical either way, get_frame_stats() reports what was skipped
+        self.enable_occlusion_culling: bool = True
+
         # --- Cache cleanup settings (can be changed after creation) ---
         # Time (sec) to keep unused sprites before auto-removal
         self.sprite_ttl_seconds: float = 5.0
@@ -224,200 +1096,522 @@ class Overlay:
         self.ttl_cleanup_period_seconds: float = 3.0
         # Enable/disable auto TTL cleanup in render loop
         self.enable_auto_ttl_cleanup: bool = True
+        # Max expiry-queue entries one frame may process; a longer cleanup pass continues over the next frames
+        self.ttl_cleanup_slice: int = 256
+        self._last_ttl_cleanup: float = time.monotonic()
+        self._ttl_pass_pending = False
 
         # Warn-once registry and throttling timers
         self._warned_once = set()
         self._warn_lock = Lock()
         self._last_signal_warn_time: float = 0.0
 
-        self._register_window_class()
-
-    def _register_window_class(self) -> None:
-        """Register window class for the transparent overlay."""
-        wndClass = win32gui.WNDCLASS()
-        wndClass.style = win32con.CS_HREDRAW | win32con.CS_VREDRAW
-        wndClass.lpfnWndProc = self._wnd_proc
-        wndClass.hInstance = self.hInstance
-        wndClass.hCursor = win32gui.LoadCursor(None, win32con.IDC_ARROW)
-        wndClass.hbrBackground = win32gui.GetStockObject(win32con.BLACK_BRUSH)
-        wndClass.lpszClassName = self.className
-        try:
-            win32gui.RegisterClass(wndClass)
-        except win32gui.error:
-            pass
+    def _open_presenter(self) -> None:
+        """Open the presenter and take its buffers (no-op if already open)."""
+        if self._presenter_open:
+            return
+        front_buf, back_buf = self.presenter.open(self.x, self.y, self.width, self.height)
+        expected = (self.height, self.width, 4)
+        if front_buf.shape != expected or back_buf.shape != expected:
+            self.presenter.close()
+            raise RuntimeError(f"Presenter returned buffers of shape {front_buf.shape}, expected {expected}")
+        with self.buf_lock:
+            self.front_buf, self.back_buf = front_buf, back_buf
+            self._buf_history = {}
+            self._pending_clear = set()
+            self._presented_signature = None
+            self._buf_has_retained = {}
+            self._buf_touched = {}
+        self._presenter_open = True
+
+    def _close_presenter(self) -> None:
+        """Close the presenter and drop references to its buffers."""
+        if not self._presenter_open:
+            return
+        self._presenter_open = False
+        with self.buf_lock:
+            self.front_buf = None
+            self.back_buf = None
+        self.presenter.close()
+
+    def _render_frame(self) -> None:
+        """Composite front_instances into back_buf, swap buffers and present. Runs on the rendering thread."""
+        screen_w: int = self.width
+        screen_h: int = self.height
+        dirty_enabled = self.enable_dirty_rects
+
+        cleared_pixels = 0
+        with self.buf_lock:
+            back_buf, front_buf = self.back_buf, self.front_buf
+            clear_back = self.clear_back_buffer
+            self.clear_back_buffer = False
+            clear_value = self._clear_value
+            if clear_value != self._applied_clear_value:
+                # Buffer contents no longer match what a clear would produce
+                self._applied_clear_value = clear_value
+                self._buf_history = {}
+                self._presented_signature = None
+                self._buf_touched = {}
+            if self.clear_front_buffer:
+                self.clear_front_buffer = False
+                if dirty_enabled and self._buf_history.get(id(front_buf)) is not None:
+                    # Deferred: the front buffer is cleared by the next frame that draws into it
+                    self._pending_clear.add(id(front_buf))
+                else:
+                    cleared_pixels = _clear_cells(_packed_view(front_buf), self._buf_touched.get(id(front_buf)),
+                                                  clear_value)
+                    self._buf_touched[id(front_buf)] = np.zeros((-(-screen_h // _CLEAR_CELL),
+                                                                 -(-screen_w // _CLEAR_CELL)), dtype=bool)
+                    self._buf_history[id(front_buf)] = []
+                    self._pending_clear.discard(id(front_buf))
+        if id(back_buf) in self._pending_clear:
+            self._pending_clear.discard(id(back_buf))
+            clear_back = True
+
+        # Render FPS tracking
+        current_time = time.time()
+        with self.render_fps_lock:
+            self.render_frame_count += 1
+            if current_time - self.render_fps_update_time >= 1.0:
+                self.render_fps = self.render_frame_count
+                self.render_frame_count = 0
+                self.render_fps_update_time = current_time
+
+        # TTL cleanup (optional) — remove unused sprites on schedule, at most ttl_cleanup_slice queue entries
+        # per frame so that a large cache does not cause a frame-time spike
+        if self.enable_auto_ttl_cleanup:
+            now = time.monotonic()
+            if self._ttl_pass_pending or now - self._last_ttl_cleanup >= self.ttl_cleanup_period_seconds:
+                with self.sprite_lock:
+                    removed, done = self.sprite_cache.expire(now - self.sprite_ttl_seconds,
+                                                             max(1, int(self.ttl_cleanup_slice)))
+                self._ttl_pass_pending = not done
+                if done:
+                    self._last_ttl_cleanup = now
+                if removed > 0:
+                    logger.info("Sprite TTL cleanup removed %d entries", removed)
+
+        below, above, extra, static_rebuilds = self._collect_layers()
+        retained = self.scene.snapshot()
+        has_retained = bool(retained or below or above or self._contexts_ordered)
+        if has_retained or self._buf_has_retained.get(id(back_buf), False):
+            # Retained content is redrawn every frame (or just disappeared from this buffer): start clean
+            clear_back = True
+        self._buf_has_retained[id(back_buf)] = has_retained
+        contexts = self._context_instances()
+        with self.instances_lock:
+            seq = self._take_pending_frame()
+            front = self.front_instances.copy()  # may be lent out as back_instances while we draw
 
-    def _wnd_proc(self, hWnd: int, msg: int, wParam: int, lParam: int) -> int:
-        """Window message procedure."""
-        if msg == win32con.WM_DESTROY:
-            win32gui.PostQuitMessage(0)
-            return 0
-        return win32gui.DefWindowProc(hWnd, msg, wParam, lParam)
+        batch, signature, total_objects, occluded = self._pack_frame([below + retained, front, *contexts, above],
+                                                                     dirty_enabled, extra=extra)
 
-    def _init_buffers(self) -> None:
-        """Initialize buffers for rendering."""
-        if self.front_buf is not None:
-            return  # Already initialized
+        with self.object_count_lock:
+            self.object_count = total_objects
+
+        # Regions to recomposite: None means the whole buffer
+        regions = None
+        history = self._buf_history.get(id(back_buf))
+        if dirty_enabled and clear_back and history is not None:
+            regions = self._dirty_regions(history, signature)
+
+        sids, xs, ys = batch
+        cells = _touched_cells(xs, ys, self._sprite_pool.ws[sids], self._sprite_pool.hs[sids], screen_w, screen_h)
+        if regions is None:
+            if clear_back:
+                cleared_pixels += _clear_cells(_packed_view(back_buf), self._buf_touched.get(id(back_buf)),
+                                              clear_value)
+            self._composite(back_buf, batch, [(0, 0, screen_w, screen_h)], False)
+            dirty_pixels = screen_w * screen_h
+        else:
+            self._composite(back_buf, batch, regions, True, clear_value)
+            dirty_pixels = sum((rx2 - rx1) * (ry2 - ry1) for rx1, ry1, rx2, ry2 in regions)
+            cleared_pixels += dirty_pixels
+        # After a clear the buffer holds exactly this frame; otherwise the frame adds to what was there
+        touched = self._buf_touched.get(id(back_buf))
+        self._buf_touched[id(back_buf)] = cells if clear_back else (None if touched is None else touched | cells)
+
+        # Content of back_buf is exactly `signature` only if the frame started from a clean buffer
+        self._buf_history[id(back_buf)] = signature if clear_back else None
+
+        # Presentation dirty set: what changed relative to the previously presented frame
+        present_rects = None
+        if dirty_enabled and clear_back and self._presented_signature is not None:
+            present_rects = self._dirty_regions(self._presented_signature, signature)
+        self._presented_signature = signature if clear_back else None
+        self.last_dirty_rects = present_rects
+
+        with self.frame_stats_lock:
+            self.frame_stats = {
+                'mode': 'full' if regions is None else 'dirty',
+                'dirty_rects': None if regions is None else len(regions),
+                'dirty_pixels': dirty_pixels,
+                'cleared_pixels': cleared_pixels,
+                'instances': len(batch[0]),
+                'occluded_instances': occluded[0],
+                'occluded_pixels': occluded[1],
+                'static_rebuilds': static_rebuilds,
+            }
+
+        # Swap buffers
+        with self.buf_lock:
+            self.front_buf, self.back_buf = back_buf, front_buf
+
+        self.presenter.present(back_buf, present_rects)
+        if seq is not None:
+            with self._frame_cond:
+                self._rendered_seq = seq
+                self._frames_rendered += 1
+                self._frame_cond.notify_all()
+
+    def _take_pending_frame(self) -> Optional[int]:
+        """
+        Make the oldest submitted frame the front instance list (instances_lock held).
+        Returns its sequence number, or None when nothing new was submitted (the last frame is drawn again).
+        """
+        if not self._pending_frames:
+            return None
+        seq, frame = self._pending_frames.popleft()
+        self.front_instances = frame
+        self._front_lent = False
+        if self._pending_frames:
+            self.render_event.set()  # queued frames: render the next one right after this
+        self._frame_cond.notify_all()
+        return seq
+
+    def _pack_frame(self, parts, with_signature: bool, extra: Optional[Dict[Any, tuple]] = None):
+        """
+        Resolve a frame's instances into contiguous arrays for the batched kernels.
 
-        if not self.hdc_mem:
-            raise RuntimeError("Memory DC is not initialized. Call after CreateCompatibleDC.")
+        parts are lists of (sprite_key, x, y) tuples or InstanceQueues, drawn in order. Takes sprite_lock once
+        for the whole frame, copies new sprites into the sprite pool and drops missing/off-screen instances
+        (with a one-time warning per key) and, with enable_occlusion_culling, instances hidden behind a later
+        opaque one. Keys found in extra resolve to its (sprite, generation, spans) entries instead of the
+        sprite cache (static layer surfaces).
 
-        # Creation of BITMAPINFO and CreateDIBSection (extracted from _render_loop)
+        Returns:
+            ((sids, xs, ys), signature, total_objects, (occluded_instances, occluded_pixels)) — signature is
+            the list of (key, generation, x, y, w, h) used by dirty tracking, or None if not requested
+        """
         screen_w, screen_h = self.width, self.height
+        pool = self._sprite_pool
+
+        # Instances as indices into the frame's table of distinct keys; queues only map their own key tables
+        table: Dict[Any, int] = {}
+        kidx_parts, x_parts, y_parts = [], [], []
+        for part in parts:
+            if not len(part):
+                continue
+            if isinstance(part, InstanceQueue):
+                rows = part.rows()
+                remap = np.fromiter((table.setdefault(key, len(table)) for key in part.keys),
+                                    dtype=np.int64, count=len(part.keys))
+                kidx_parts.append(remap[rows['key']])
+                x_parts.append(rows['x'])
+                y_parts.append(rows['y'])
+            else:
+                n = len(part)
+                kidx_parts.append(np.fromiter((table.setdefault(item[0], len(table)) for item in part),
+                                              dtype=np.int64, count=n))
+                x_parts.append(np.fromiter(map(itemgetter(1), part), dtype=np.int64, count=n))
+                y_parts.append(np.fromiter(map(itemgetter(2), part), dtype=np.int64, count=n))
+        if kidx_parts:
+            kidx = np.concatenate(kidx_parts)
+            xs = np.concatenate(x_parts).astype(np.int64, copy=False)
+            ys = np.concatenate(y_parts).astype(np.int64, copy=False)
+        else:
+            kidx = xs = ys = np.zeros(0, dtype=np.int64)
+        keys = list(table)
 
-        class BITMAPINFOHEADER(Structure):
-            _fields_ = [
-                ("biSize", c_uint), ("biWidth", c_int), ("biHeight", c_int),
-                ("biPlanes", c_ushort), ("biBitCount", c_ushort),
-                ("biCompression", c_uint), ("biSizeImage", c_uint),
-                ("biXPelsPerMeter", c_int), ("biYPelsPerMeter", c_int),
-                ("biClrUsed", c_uint), ("biClrImportant", c_uint)
-            ]
-
-        class BITMAPINFO(Structure):
-            _fields_ = [("bmiHeader", BITMAPINFOHEADER), ("bmiColors", c_uint * 3)]
-
-        bmi = BITMAPINFO()
-        bmi.bmiHeader.biSize = sizeof(BITMAPINFOHEADER)
-        bmi.bmiHeader.biWidth = screen_w
-        bmi.bmiHeader.biHeight = -screen_h
-        bmi.bmiHeader.biPlanes = 1
-        bmi.bmiHeader.biBitCount = 32
-        bmi.bmiHeader.biCompression = win32con.BI_RGB
-
-        # Create buffers...
-        self.ppvBits_front = c_void_p()
-        self.bitmap_front = windll.gdi32.CreateDIBSection(
-            self.hdc_mem, byref(bmi), win32con.DIB_RGB_COLORS, byref(self.ppvBits_front), None, 0
-        )
-        if not self.bitmap_front or not self.ppvBits_front.value:
-            raise RuntimeError("Failed to create front DIB section")
-
-        self.front_buf = np.ctypeslib.as_array(
-            (c_ubyte * (screen_w * screen_h * 4)).from_address(self.ppvBits_front.value))
-        self.front_buf = self.front_buf.reshape((screen_h, screen_w, 4))
+        # One locked pass over the distinct keys of the frame
+        now = time.monotonic()
+        resolved = {}
+        cache = self.sprite_cache
+        with self.sprite_lock:
+            # The previous frame's sprites were copied; atlas space freed since can be reused now
+            cache.reclaim()
+            lookup = []
+            for key in keys:
+                if isinstance(key, _DrawOp):
+                    resolved[key] = (None, 0, None)
+                elif extra and key in extra:
+                    resolved[key] = extra[key]
+                else:
+                    lookup.append(key)
+            # Handles index the cache's slots directly; only raw keys are hashed
+            for key, entry in zip(lookup, cache.resolve_many(lookup, now)):
+                if entry is not None:
+                    resolved[key] = entry
+
+        key_sids = np.full(len(keys), -1, dtype=np.int64)
+        for key in keys:
+            if key not in resolved:
+                self._warn_once(("missing_sprite", key),
+                                "Sprite key=%r not found in cache during render; skipping", key)
+
+        live_pixels = sum(arr.shape[0] * arr.shape[1] for arr, _, _ in resolved.values() if arr is not None)
+        if pool.needs_compaction(live_pixels, len(resolved)):
+            pool.reset()
+        for key, (arr, gen, spans) in resolved.items():
+            if arr is None:
+                key_sids[table[key]] = pool.op_slot(key)
+                continue
+            if spans is None:
+                spans = _sprite_spans(arr)  # sprite placed in sprite_cache directly
+            key_sids[table[key]] = pool.slot(gen, arr, spans)
+
+        sids = key_sids[kidx]
+        found = sids >= 0
+        total_objects = int(np.count_nonzero(found))
+        ws = pool.ws[np.where(found, sids, 0)]
+        hs = pool.hs[np.where(found, sids, 0)]
+        offscreen = found & ((xs >= screen_w) | (ys >= screen_h) | (xs + ws <= 0) | (ys + hs <= 0))
+        if offscreen.any():
+            for k in np.unique(kidx[offscreen]).tolist():
+                self._warn_once(("sprite_offscreen", keys[k]),
+                                "Sprite key=%r fully outside the screen; skipping", keys[k])
+        keep = found & ~offscreen
+        if not keep.all():
+            idx = np.flatnonzero(keep)
+            sids, xs, ys, ws, hs, kidx = sids[idx], xs[idx], ys[idx], ws[idx], hs[idx], kidx[idx]
+
+        occluded = (0, 0)
+        hidden = self._find_occluded(sids, xs, ys, ws, hs) if self.enable_occlusion_culling else None
+        if hidden is not None:
+            bw = np.minimum(xs + ws, screen_w) - np.maximum(xs, 0)
+            bh = np.minimum(ys + hs, screen_h) - np.maximum(ys, 0)
+            occluded = (int(np.count_nonzero(hidden)), int((bw * bh)[hidden].sum()))
+            idx = np.flatnonzero(~hidden)
+            sids, xs, ys, ws, hs, kidx = sids[idx], xs[idx], ys[idx], ws[idx], hs[idx], kidx[idx]
+
+        signature = None
+        if with_signature:
+            tagged = [(key, resolved[key][1]) if key in resolved else (key, 0) for key in keys]
+            signature = [tagged[k] + (x, y, w, h) for k, x, y, w, h in
+                         zip(kidx.tolist(), xs.tolist(), ys.tolist(), ws.tolist(), hs.tolist())]
+        return (sids, xs, ys), signature, total_objects, occluded
+
+    def _find_occluded(self, sids, xs, ys, ws, hs):
+        """
+        Mask of on-screen instances whose visible bounds lie entirely inside the opaque core of a later instance
+        (they cannot affect the frame), or None if nothing is hidden. Only the frame's _OCCLUDER_LIMIT largest
+        cores are tested; partially covered instances are kept.
+        """
+        if sids.shape[0] < 2:
+            return None
+        screen_w, screen_h = self.width, self.height
+        cores = self._sprite_pool.cores[sids]
+        ox1, oy1 = np.maximum(xs + cores[:, 0], 0), np.maximum(ys + cores[:, 1], 0)
+        ox2, oy2 = np.minimum(xs + cores[:, 2], screen_w), np.minimum(ys + cores[:, 3], screen_h)
+        area = np.maximum(ox2 - ox1, 0) * np.maximum(oy2 - oy1, 0)
+        occluders = np.flatnonzero(area[1:]) + 1  # the first instance has nothing below it
+        if occluders.shape[0] == 0:
+            return None
+        if occluders.shape[0] > _OCCLUDER_LIMIT:
+            occluders = np.sort(occluders[np.argpartition(area[occluders], -_OCCLUDER_LIMIT)[-_OCCLUDER_LIMIT:]])
+        hidden = _occluded_mask(np.maximum(xs, 0), np.maximum(ys, 0),
+                                np.minimum(xs + ws, screen_w), np.minimum(ys + hs, screen_h), occluders,
+                                ox1[occluders], oy1[occluders], ox2[occluders], oy2[occluders])
+        return hidden if hidden.any() else None
+
+    def _collect_layers(self):
+        """
+        Gather the instances of named layers for a frame.
 
-        self.ppvBits_back = c_void_p()
-        self.bitmap_back = windll.gdi32.CreateDIBSection(
-            self.hdc_mem, byref(bmi), win32con.DIB_RGB_COLORS, byref(self.ppvBits_back), None, 0
-        )
-        if not self.bitmap_back or not self.ppvBits_back.value:
-            raise RuntimeError("Failed to create back DIB section")
+        Returns:
+            (below, above, extra, static_rebuilds) — instances drawn before/after the overlay's own,
+            the static layer surfaces for _pack_frame(extra=...) and how many surfaces were rebuilt
+        """
+        with self._layers_lock:
+            layers = sorted(self.layers.values(), key=lambda layer: (layer.z, layer.order))
+        below, above, extra = [], [], {}
+        rebuilds = 0
+        static_names = set()
+        for layer in layers:
+            if layer.static:
+                static_names.add(layer.name)
+            if not layer.visible:
+                continue
+            if layer.static:
+                items, rebuilt = self._static_layer_items(layer, extra)
+                rebuilds += rebuilt
+            else:
+                items = layer.scene.snapshot()
+            (below if layer.z < 0 else above).extend(items)
+        for name in [n for n in self._static_surfaces if n not in static_names]:
+            del self._static_surfaces[name]
+        return below, above, extra, rebuilds
+
+    def _static_layer_items(self, layer: Layer, extra: Dict[Any, tuple]):
+        """Return ([(layer_key, x, y)] or [], rebuilt) for a static layer, rebuilding its surface if stale."""
+        version = layer.version
+        items = layer.scene.snapshot()
+        keys = [key for key in dict.fromkeys(map(itemgetter(0), items)) if not isinstance(key, _PrivateKey)]
+        # Keep the layer's sprites alive (TTL) and detect re-created ones
+        now = time.monotonic()
+        with self.sprite_lock:
+            gens = {}
+            for key in keys:
+                entry = self.sprite_cache.resolve(key, now)
+                gens[key] = None if entry is None else entry[1]
+
+        cached = self._static_surfaces.get(layer.name)
+        rebuilt = 0
+        if cached is None or cached.version != version or cached.gens != gens:
+            cached = self._build_static_surface(items, version, gens)
+            self._static_surfaces[layer.name] = cached
+            rebuilt = 1
+        if cached.sprite is None:
+            return [], rebuilt
+        key = _LayerKey(layer.name)
+        extra[key] = (cached.sprite, cached.gen, cached.spans)
+        return [(key, cached.x, cached.y)], rebuilt
+
+    def _build_static_surface(self, items, version, gens) -> _StaticSurface:
+        """Composite a layer's instances over transparency into a surface cropped to their on-screen bounds."""
+        (sids, xs, ys), _, _, _ = self._pack_frame([items], with_signature=False)
+        if sids.shape[0] == 0:
+            return _StaticSurface(version, gens)
+        pool = self._sprite_pool
+        x1, y1 = max(0, int(xs.min())), max(0, int(ys.min()))
+        x2 = min(self.width, int((xs + pool.ws[sids]).max()))
+        y2 = min(self.height, int((ys + pool.hs[sids]).max()))
+        surface = np.zeros((y2 - y1, x2 - x1), dtype=np.uint32)
+        _blit_batch_region(surface, pool.arrays(), sids, xs - x1, ys - y1, 0, 0, x2 - x1, y2 - y1)
+        sprite = _bgra_view(surface)
+        with self.sprite_lock:
+            gen = self.sprite_cache.next_version()
+        return _StaticSurface(version, gens, sprite, x1, y1, gen, _sprite_spans(sprite))
 
-        self.back_buf = np.ctypeslib.as_array(
-            (c_ubyte * (screen_w * screen_h * 4)).from_address(self.ppvBits_back.value))
-        self.back_buf = self.back_buf.reshape((screen_h, screen_w, 4))
+    def _composite(self, buf, batch, regions, clear: bool, clear_value: int = 0) -> None:
+        """
+        Composite the packed batch into buf, limited to regions (x1, y1, x2, y2), in instance order.
+        With clear=True each region is first filled with clear_value (packed BGRA).
 
-    def _render_loop(self) -> None:
-        """Main render loop with double buffering."""
-        screen_x: int = self.x
-        screen_y: int = self.y
-        screen_w: int = self.width
-        screen_h: int = self.height
+        A full-screen serial frame walks the instance list once. Otherwise the instances are binned into a
+        uniform grid of tile_size cells (_SpatialGrid) and the regions are split along cell lines, so each
+        piece (dirty rect part or tile) only visits the instances of its cell.
+        """
+        buf = _packed_view(buf)
+        pool = self._sprite_pool.arrays()
+        sids, xs, ys = batch
+        tiled = self.composite_mode == 'tiled' and self.composite_workers > 1
+        if not tiled and regions == [(0, 0, self.width, self.height)]:
+            if clear:
+                buf[...] = clear_value
+            _blit_batch_region(buf, pool, sids, xs, ys, 0, 0, self.width, self.height)
+            return
 
-        self.hWindow: int = win32gui.CreateWindowEx(
-            win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT |
-            win32con.WS_EX_TOPMOST | win32con.WS_EX_NOACTIVATE,
-            self.className,
-            "",
-            win32con.WS_POPUP,
-            screen_x, screen_y, screen_w, screen_h,
-            None, None, self.hInstance, None
-        )
-        win32gui.ShowWindow(self.hWindow, win32con.SW_SHOW)
+        grid = _SpatialGrid(xs, ys, pool[2][sids], pool[3][sids], max(16, int(self.tile_size)),
+                            self.width, self.height)
+        pieces = grid.pieces(regions)
+        if tiled:
+            self._composite_tiled(buf, batch, grid, pieces, clear, clear_value)
+            return
+        _blit_batch_cells_serial(buf, pool, sids, xs, ys, pieces, grid.start, grid.items, clear,
+                                 np.uint32(clear_value))
 
-        hdc_screen = win32gui.GetDC(0)
-        self.hdc_mem = win32gui.CreateCompatibleDC(hdc_screen)
-        if not self.hdc_mem:
-            raise RuntimeError("Failed to create memory DC")
+    def _composite_tiled(self, buf, batch, grid, pieces, clear: bool, clear_value: int = 0) -> None:
+        """
+        Composite grid pieces (one per tile) concurrently.
+        Each piece sees its cell's instances in order, so output equals the serial path. With Numba the
+        pieces run in one parallel kernel; the NumPy fallback uses a thread pool.
+        """
+        pool = self._sprite_pool.arrays()
+        sids, xs, ys = batch
+        args = (pool, sids, xs, ys)
 
-        self._init_buffers()
+        if NUMBA_AVAILABLE:
+            numba.set_num_threads(max(1, min(int(self.composite_workers), numba.config.NUMBA_NUM_THREADS)))
+            _blit_batch_cells(buf, *args, pieces, grid.start, grid.items, clear, np.uint32(clear_value))
+            return
 
-        self.old_bmp = win32gui.SelectObject(self.hdc_mem, self.bitmap_front)
+        def _run(piece):
+            x1, y1, x2, y2, c = piece
+            if clear:
+                buf[y1:y2, x1:x2] = clear_value
+            _blit_batch_indexed(buf, *args, grid.items[grid.start[c]:grid.start[c + 1]], x1, y1, x2, y2)
+
+        executor = self._get_tile_pool()
+        for f in [executor.submit(_run, piece) for piece in pieces.tolist()]:
+            f.result()
+
+    def _get_tile_pool(self) -> ThreadPoolExecutor:
+        """Lazily create (or resize) the worker pool used by tiled compositing."""
+        workers = max(1, int(self.composite_workers))
+        if self._tile_pool is None or self._tile_pool_workers != workers:
+            if self._tile_pool is not None:
+                self._tile_pool.shutdown(wait=False)
+            self._tile_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="overlay-tile")
+            self._tile_pool_workers = workers
+        return self._tile_pool
+
+    def _dirty_regions(self, old_signature: list, new_signature: list) -> Optional[List[Tuple[int, int, int, int]]]:
+        """Merged, screen-clipped rects that differ between two signatures; None if a full redraw is cheaper."""
+        screen_w, screen_h = self.width, self.height
+        rects = []
+        for x1, y1, x2, y2 in _diff_instance_rects(old_signature, new_signature):
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(screen_w, x2), min(screen_h, y2)
+            if x1 < x2 and y1 < y2:
+                rects.append((x1, y1, x2, y2))
+        merged = _merge_rects(rects, self.dirty_rect_max_count)
+        if merged is None:
+            return None
+        area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in merged)
+        if area > self.dirty_rect_max_area_fraction * screen_w * screen_h:
+            return None
+        return merged
 
+    def _render_loop(self) -> None:
+        """Main render loop with double buffering."""
+        self._open_presenter()
         try:
-            last_cleanup = time.time()
             while not self.stop_event.is_set():
                 if not self.render_event.wait():
                     continue
-                self.render_event.clear()
-
-                with self.buf_lock:
-                    if self.clear_back_buffer:
-                        self.back_buf[:, :, :] = 0
-                        self.clear_back_buffer = False
-                    if self.clear_front_buffer:
-                        self.front_buf[:, :, :] = 0
-                        self.clear_front_buffer = False
-
-                # Render FPS tracking
-                current_time = time.time()
-                with self.render_fps_lock:
-                    self.render_frame_count += 1
-                    if current_time - self.render_fps_update_time >= 1.0:
-                        self.render_fps = self.render_frame_count
-                        self.render_frame_count = 0
-                        self.render_fps_update_time = current_time
-
-                # TTL cleanup (optional) — remove unused sprites on schedule
-                if self.enable_auto_ttl_cleanup:
-                    now = current_time
-                    if now - last_cleanup >= self.ttl_cleanup_period_seconds:
-                        removed = self.sprite_clear_expired(max_age=self.sprite_ttl_seconds)
-                        if removed > 0:
-                            logger.info("Sprite TTL cleanup removed %d entries", removed)
-                        last_cleanup = now
-
                 with self.instances_lock:
-                    local_instances = list(self.front_instances)
-
-                total_objects = 0
-
-                for sprite_key, x, y in local_instances:
-                    sprite = self._cache_get(sprite_key, update_ts=True)
-                    if sprite is None:
-                        self._warn_once(("missing_sprite", sprite_key),
-                                        "Sprite key=%r not found in cache during render; skipping", sprite_key)
-                        continue
-                    total_objects += 1
-
-                    # Skip and warn if sprite is fully outside the screen (no intersection)
-                    sh, sw = sprite.shape[:2]
-                    if x >= screen_w or y >= screen_h or (x + sw) <= 0 or (y + sh) <= 0:
-                        self._warn_once(("sprite_offscreen", sprite_key),
-                                        "Sprite key=%r fully outside the screen; skipping", sprite_key)
-                        continue
-
-                    _blit_sprite_into_buf(self.back_buf, sprite, x, y)
+                    idle = not self._pending_frames  # woken without a new frame (stop_layer, coalesced signals)
+                    if idle:
+                        self.render_event.clear()
+                if idle:
+                    continue
+                pacer = self.pacer
+                if pacer is None:
+                    self.render_event.clear()
+                    self._render_frame()
+                    continue
+                # Signals that arrive before the slot starts coalesce into this frame
+                if not pacer.begin_frame(self.stop_event):
+                    break
+                self.render_event.clear()
+                start = time.perf_counter()
+                self._render_frame()
+                pacer.end_frame(time.perf_counter() - start)
+        finally:
+            self._close_presenter()
 
-                with self.object_count_lock:
-                    self.object_count = total_objects
+    def render_frame_sync(self, copy: bool = True) -> Any:
+        """Render one frame on the calling thread and return the composited BGRA buffer.
 
-                # Swap buffers
-                with self.buf_lock:
-                    self.front_buf, self.back_buf = self.back_buf, self.front_buf
-                    self.ppvBits_front, self.ppvBits_back = self.ppvBits_back, self.ppvBits_front
-                    self.bitmap_front, self.bitmap_back = self.bitmap_back, self.bitmap_front
-                    win32gui.SelectObject(self.hdc_mem, self.bitmap_front)
+        Works like signal_render() followed by one pass of the render loop, so the same compositing
+        path can be driven from tests and benchmarks. Not available while the render thread is running.
 
-                pt_src, pt_dst, size = POINT(0, 0), POINT(screen_x, screen_y), SIZE(screen_w, screen_h)
-                blend = BLENDFUNCTION(0x00, 0, 255, 0x01)
-                windll.user32.UpdateLayeredWindow(
-                    self.hWindow, hdc_screen, byref(pt_dst), byref(size),
-                    self.hdc_mem, byref(pt_src), 0, byref(blend), 0x02
-                )
-                windll.gdi32.GdiFlush()
+        Args:
+            copy: Return a copy (default). With copy=False the returned array is the live front buffer,
+                which is overwritten two frames later.
 
-        finally:
-            try:
-                win32gui.SelectObject(self.hdc_mem, self.old_bmp)
-                win32gui.DeleteDC(self.hdc_mem)
-                windll.gdi32.DeleteObject(self.bitmap_front)
-                windll.gdi32.DeleteObject(self.bitmap_back)
-                win32gui.ReleaseDC(0, hdc_screen)
-                win32gui.DestroyWindow(self.hWindow)
-                logger.info("Overlay window destroyed and resources released")
-            except Exception:
-                pass
+        Returns:
+            np.ndarray of shape (height, width, 4), dtype uint8, premultiplied BGRA
+        """
+        if self.thread and self.thread.is_alive():
+            raise RuntimeError("render_frame_sync() cannot be used while the render thread is running")
+        self._open_presenter()
+        self._submit_frame(signal=False)
+        self._render_frame()
+        with self.buf_lock:
+            front_buf = self.front_buf
+        return front_buf.copy() if copy else front_buf
 
     def start_layer(self) -> None:
         """Start the render thread."""
@@ -432,18 +1626,22 @@ class Overlay:
     def stop_layer(self) -> None:
         """Stop the overlay and render thread."""
         self.stop_event.set()
-        self.signal_render()
-        if self.hWindow:
-            try:
-                win32gui.PostMessage(self.hWindow, win32con.WM_DESTROY, 0, 0)
-            except Exception:
-                pass
+        self.render_event.set()
+        with self._frame_cond:
+            self._frame_cond.notify_all()  # release producers blocked in signal_render()
+        self.presenter.request_close()
         if self.thread:
             self.thread.join(timeout=3)
             if self.thread.is_alive():
                 logger.warning("Render thread did not terminate cleanly")
             else:
                 logger.info("stop_layer(): render thread stopped")
+        if not (self.thread and self.thread.is_alive()):
+            # Release buffers opened by render_frame_sync()
+            self._close_presenter()
+        if self._tile_pool is not None:
+            self._tile_pool.shutdown(wait=False)
+            self._tile_pool = None
 
     # ----- Safe shutdown and context manager -----
     def close(self) -> None:
@@ -453,6 +1651,10 @@ class Overlay:
         except Exception:
             # During interpreter finalization, win32gui/windll/Event may already be destroyed
             pass
+        store = getattr(self, 'sprite_store', None)
+        if store is not None:
+            self.sprite_store = None
+            store.close()
 
     def __enter__(self) -> "Overlay":
         self.start_layer()
@@ -470,10 +1672,38 @@ class Overlay:
             pass
 
     # ---------------- Render and buffer management ----------------
-    def _swap_instances(self) -> None:
-        """Swap front and back instance lists for render synchronization."""
-        with self.instances_lock:
-            self.front_instances, self.back_instances = self.back_instances, self.front_instances
+    def _submit_frame(self, signal: bool) -> int:
+        """
+        Queue back_instances as a new frame according to submit_policy. With signal=True (signal_render) the
+        'block' policy may wait and the render loop is woken. Returns the frame's sequence number.
+        """
+        policy = self.submit_policy
+        if policy not in ('latest', 'queue', 'block'):
+            raise ValueError(f"Unknown submit_policy {policy!r}")
+        limit = 1 if policy == 'latest' else max(1, int(self.submit_queue_size))
+        with self._frame_cond:
+            if policy == 'block' and signal:
+                while (len(self._pending_frames) >= limit and not self.stop_event.is_set()
+                       and self.thread is not None and self.thread.is_alive()):
+                    self._frame_cond.wait(0.1)
+            dropped = None
+            while len(self._pending_frames) >= limit:
+                _, dropped = self._pending_frames.popleft()
+                self._frames_coalesced += 1
+            self._submit_seq += 1
+            seq = self._submit_seq
+            self._pending_frames.append((seq, self.back_instances))
+            self._frames_submitted += 1
+            # As with the former front/back swap, the queue continues in the list of the last rendered frame.
+            # The renderer only draws submitted frames, so that list is free until it takes the next one.
+            if not self._front_lent:
+                self.back_instances = self.front_instances
+                self._front_lent = True
+            else:
+                self.back_instances = dropped if dropped is not None else InstanceQueue()
+            if signal:
+                self.render_event.set()
+        return seq
 
     def _warn_once(self, tag: Any, message: str, *args) -> None:
         """Log a warning only once per unique tag."""
@@ -495,8 +1725,12 @@ class Overlay:
     def frame_clear_queue(self) -> None:
         """
         Clear queued render objects.
-        Removes all sprites scheduled for the next frame.
+        Removes all sprites scheduled for the next frame (inside a draw context: its staged instances).
         """
+        context = getattr(self._thread_binding, 'context', None)
+        if context is not None:
+            context.clear()
+            return
         with self.instances_lock:
             self.back_instances.clear()
 
@@ -514,23 +1748,225 @@ class Overlay:
         if which in ['front', 'both']:
             self.clear_front_buffer = True
 
-    def add_sprite_instance(self, sprite_key: Any, x: int, y: int) -> None:
-        """Add a sprite instance to the back buffer (in insertion order)."""
+    def set_clear_color(self, color: Tuple[int, int, int, int] = (0, 0, 0, 0)) -> None:
+        """Set the color buffers are cleared to (default: fully transparent).
+
+        A translucent clear color tints the whole screen without drawing anything: the buffers are
+        filled with it on clear, which costs nothing beyond the clear itself. Takes effect from the
+        next cleared frame.
+
+        Args:
+            color: RGBA color tuple
+        """
+        color = self._normalize_color(color)
+        with self.buf_lock:
+            self.clear_color = color
+            self._clear_value = _pack_color(color)
+
+    def add_sprite_instance(self, sprite_key: Any, x: int, y: int, retained: bool = False) -> Optional[InstanceHandle]:
+        """Add a sprite instance to the back buffer (in insertion order).
+
+        Args:
+            sprite_key: Key of a cached sprite
+            x: Left X coordinate
+            y: Top Y coordinate
+            retained: Keep the instance across frames instead of only the next one. Retained instances
+                survive frame_clear(), are drawn below immediate instances in creation order and are
+                changed through the returned handle. Frames with retained instances always start from
+                a cleared back buffer.
+
+        Returns:
+            InstanceHandle if retained, otherwise None
+        """
+        if retained:
+            return self.scene.add(sprite_key, x, y)
+        context = getattr(self._thread_binding, 'context', None)
+        if context is not None:
+            context.add_sprite_instance(sprite_key, x, y)
+            return None
         with self.instances_lock:
-            self.back_instances.append((sprite_key, int(x), int(y)))
+            self.back_instances.append(sprite_key, int(x), int(y))
+        return None
+
+    def add_sprite_instances(self, sprite_keys: Any, xs: Any, ys: Any, ids: Any = None) -> None:
+        """Add many sprite instances at once from NumPy arrays (in array order).
 
-    def signal_render(self) -> None:
-        """Swap instance lists and signal the render loop."""
-        # Perform swap and signal atomically relative to adding new instances
+        The positions are copied into the frame's instance array in one step, without per-instance
+        Python work, so large particle systems can be submitted with a single call.
+
+        Args:
+            sprite_keys: One sprite key for all instances, a list with one key per instance, or (with ids)
+                a list of distinct keys
+            xs: 1-D array of left X coordinates
+            ys: 1-D array of top Y coordinates (same length as xs)
+            ids: Optional integer array, ids[i] selects sprite_keys[ids[i]] for instance i
+
+        Raises:
+            ValueError: on mismatched lengths or ids outside sprite_keys
+        """
+        context = getattr(self._thread_binding, 'context', None)
+        if context is not None:
+            context.add_sprite_instances(sprite_keys, xs, ys, ids)
+            return
         with self.instances_lock:
-            self.front_instances, self.back_instances = self.back_instances, self.front_instances
-            self.render_event.set()
+            self.back_instances.extend(sprite_keys, xs, ys, ids)
+
+    def draw_context(self, name: str, order: int = 0) -> DrawContext:
+        """Return the draw context with this name, creating it on first use.
+
+        A draw context lets one producer thread submit instances without taking the overlay's
+        instances lock: `with overlay.draw_context(name):` routes that thread's draw_* calls into the
+        context and commits them as its frame on exit. The renderer draws the last committed frame of
+        every context after the overlay's own instances, in ascending order (then creation order),
+        until the context commits again.
+
+        Args:
+            name: Context name
+            order: Draw order among contexts (used when the context is created)
+        """
+        with self._contexts_lock:
+            context = self.draw_contexts.get(name)
+            if context is None:
+                self._context_counter += 1
+                context = DrawContext(name, order, self._context_counter, self._thread_binding)
+                self.draw_contexts[name] = context
+                self._contexts_ordered = sorted(self.draw_contexts.values(), key=lambda c: (c.order, c.index))
+            return context
+
+    def remove_draw_context(self, name: str) -> bool:
+        """Remove a draw context and its frame. Returns False if it does not exist."""
+        with self._contexts_lock:
+            if self.draw_contexts.pop(name, None) is None:
+                return False
+            self._contexts_ordered = sorted(self.draw_contexts.values(), key=lambda c: (c.order, c.index))
+            return True
+
+    def _context_instances(self) -> List[InstanceQueue]:
+        """Committed frames of all draw contexts, in draw order."""
+        return [context.published() for context in self._contexts_ordered]
+
+    def clear_retained(self) -> None:
+        """Remove all retained instances (their handles become dead)."""
+        self.scene.clear()
+
+    # ---------------- Layers ----------------
+    def create_layer(self, name: str, z: int = 0, static: bool = False) -> Layer:
+        """Create a named layer of retained instances.
+
+        Layers are drawn in z order (equal z: creation order); z < 0 below the overlay's own instances,
+        z >= 0 above them. A static layer is composited once into a cached surface and reused until one of
+        its instances, its attributes or one of its sprites changes, so per-frame cost only depends on the
+        dynamic content.
+
+        Args:
+            name: Unique layer name
+            z: Draw order
+            static: Cache the layer as a pre-composited surface
+
+        Returns:
+            Layer — add instances with layer.add_sprite_instance(key, x, y)
+
+        Raises:
+            ValueError: If a layer with this name already exists
+        """
+        with self._layers_lock:
+            if name in self.layers:
+                raise ValueError(f"Layer {name!r} already exists")
+            self._layer_counter += 1
+            layer = Layer(name, z=z, static=static, order=self._layer_counter)
+            self.layers[name] = layer
+        return layer
+
+    def get_layer(self, name: str) -> Optional[Layer]:
+        """Return the layer with this name, or None."""
+        with self._layers_lock:
+            return self.layers.get(name)
+
+    def remove_layer(self, name: str) -> bool:
+        """Remove a layer and its instances. Returns False if it does not exist."""
+        with self._layers_lock:
+            return self.layers.pop(name, None) is not None
+
+    def signal_render(self) -> int:
+        """Submit the queued instances as a frame and signal the render loop.
+
+        What happens to frames submitted faster than they are rendered depends on submit_policy
+        ('latest', 'queue' or 'block'; see get_submission_stats()).
+
+        Returns:
+            Sequence number of the frame, for wait_for_frame()
+        """
+        seq = self._submit_frame(signal=True)
         # If render thread is not running, provide throttled debug info
         t = time.time()
         if not (self.thread and self.thread.is_alive()):
             if t - self._last_signal_warn_time > 5.0:
                 logger.debug("signal_render() called while render thread is not running")
                 self._last_signal_warn_time = t
+        return seq
+
+    def wait_for_frame(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Wait until frame seq (from signal_render()) or a later one has been presented.
+
+        A coalesced frame counts as done once a later frame is presented.
+
+        Returns:
+            False on timeout
+        """
+        with self._frame_cond:
+            return self._frame_cond.wait_for(lambda: self._rendered_seq >= seq, timeout)
+
+    def get_submission_stats(self) -> Dict[str, Any]:
+        """
+        Frame submission counters.
+
+        Keys:
+            policy: current submit_policy
+            submitted: frames submitted with signal_render()
+            rendered: submitted frames that were presented
+            coalesced: frames dropped unrendered because a newer frame replaced them
+            pending: frames waiting for the render thread
+            last_seq / rendered_seq: sequence number of the last submitted / presented frame
+        """
+        with self._frame_cond:
+            return {
+                'policy': self.submit_policy,
+                'submitted': self._frames_submitted,
+                'rendered': self._frames_rendered,
+                'coalesced': self._frames_coalesced,
+                'pending': len(self._pending_frames),
+                'last_seq': self._submit_seq,
+                'rendered_seq': self._rendered_seq,
+            }
+
+    def set_target_fps(self, fps: Optional[float], spin_seconds: float = 0.002) -> None:
+        """Pace the render thread to at most fps frames per second (None: render on every signal).
+
+        Frames signalled faster than the target coalesce: the render thread waits for the next frame
+        slot and composites the latest submitted frame. Render times above the 1 / fps budget are
+        counted as overruns (get_pacing_stats()).
+
+        Args:
+            fps: Target frame rate, or None to disable pacing
+            spin_seconds: Busy-wait this long before each slot instead of sleeping (sleep overshoot)
+        """
+        self.pacer = FramePacer(fps, spin_seconds) if fps is not None else None
+
+    def next_frame_time(self) -> Optional[float]:
+        """time.perf_counter() time of the next frame slot, or None when pacing is off."""
+        pacer = self.pacer
+        return pacer.next_frame_time() if pacer is not None else None
+
+    def wait_next_frame(self) -> None:
+        """Block the calling (logic) thread until the next frame slot; returns at once when pacing is off."""
+        pacer = self.pacer
+        if pacer is not None:
+            pacer.wait_next_frame(self.stop_event)
+
+    def get_pacing_stats(self) -> Dict[str, Any]:
+        """Frame pacing counters (see FramePacer.stats()); empty when pacing is off."""
+        pacer = self.pacer
+        return pacer.stats() if pacer is not None else {}
 
     # ---------------- Sprite creation ----------------
     @staticmethod
@@ -592,7 +2028,7 @@ class Overlay:
             radius: int,
             color: Tuple[int, int, int, int] = (255, 255, 255, 255),
             thickness: int = 0
-    ) -> Any:
+    ) -> SpriteHandle:
         """Create or return a cached circle sprite.
 
         Args:
@@ -601,7 +2037,7 @@ class Overlay:
             thickness: Line thickness in pixels (0 = filled)
 
         Returns:
-            A sprite key that can be used with add_sprite_instance()
+            SpriteHandle that can be used with add_sprite_instance() (and anywhere else a sprite key is)
         """
         if int(radius) < 1:
             raise ValueError("radius must be >= 1")
@@ -610,9 +2046,14 @@ class Overlay:
         color = self._normalize_color(color)
         key = ('circle', radius, color, thickness)
         with self.sprite_lock:
-            if key in self.sprite_cache:
-                self.sprite_last_used[key] = time.time()
-                return key
+            handle = self.sprite_cache.touch(key, time.monotonic())
+        if handle is not None:
+            return handle
+        started = time.perf_counter()
+        if self.sprite_store is not None:
+            stored = self._store_load(key)
+            if stored is not None:
+                return self._cache_set(key, stored[0], 'circle', started, spans=stored[1])
 
         size = radius * 2 + 1
         img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
@@ -625,8 +2066,7 @@ class Overlay:
 
         arr = np.array(img, dtype=np.uint8)
         arr = self._premultiply_arr(arr)
-        self._cache_set(key, arr)
-        return key
+        return self._cache_set(key, arr, 'circle', started, persist=True)
 
     def create_rect_sprite(
             self,
@@ -634,7 +2074,7 @@ class Overlay:
             height: int,
             color: Tuple[int, int, int, int] = (255, 255, 255, 255),
             thickness: int = 0
-    ) -> Any:
+    ) -> SpriteHandle:
         """Create or return a cached rectangle sprite.
 
         Args:
@@ -644,7 +2084,7 @@ class Overlay:
             thickness: Line thickness in pixels (0 = filled)
 
         Returns:
-            A sprite key that can be used with add_sprite_instance()
+            SpriteHandle that can be used with add_sprite_instance() (and anywhere else a sprite key is)
         """
         if int(width) < 1 or int(height) < 1:
             raise ValueError("width and height must be >= 1")
@@ -653,9 +2093,14 @@ class Overlay:
         color = self._normalize_color(color)
         key = ('rect', width, height, color, thickness)
         with self.sprite_lock:
-            if key in self.sprite_cache:
-                self.sprite_last_used[key] = time.time()
-                return key
+            handle = self.sprite_cache.touch(key, time.monotonic())
+        if handle is not None:
+            return handle
+        started = time.perf_counter()
+        if self.sprite_store is not None:
+            stored = self._store_load(key)
+            if stored is not None:
+                return self._cache_set(key, stored[0], 'rect', started, spans=stored[1])
 
         img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img)
@@ -666,8 +2111,7 @@ class Overlay:
 
         arr = np.array(img, dtype=np.uint8)
         arr = self._premultiply_arr(arr)
-        self._cache_set(key, arr)
-        return key
+        return self._cache_set(key, arr, 'rect', started, persist=True)
 
     def create_line_sprite(
             self,
@@ -677,7 +2121,7 @@ class Overlay:
             y2: int,
             color: Tuple[int, int, int, int] = (255, 255, 255, 255),
             thickness: int = 1
-    ) -> Any:
+    ) -> SpriteHandle:
         """Create or return a cached line sprite.
 
         Args:
@@ -687,7 +2131,7 @@ class Overlay:
             thickness: Line thickness in pixels (must be >= 1)
 
         Returns:
-            A sprite key that can be used with add_sprite_instance()
+            SpriteHandle that can be used with add_sprite_instance() (and anywhere else a sprite key is)
         """
         if int(thickness) < 1:
             raise ValueError("thickness must be >= 1 for line sprites")
@@ -713,9 +2157,14 @@ class Overlay:
 
         key = ('line', w, h, color, thickness, sx, sy, ex, ey)
         with self.sprite_lock:
-            if key in self.sprite_cache:
-                self.sprite_last_used[key] = time.time()
-                return key
+            handle = self.sprite_cache.touch(key, time.monotonic())
+        if handle is not None:
+            return handle
+        started = time.perf_counter()
+        if self.sprite_store is not None:
+            stored = self._store_load(key)
+            if stored is not None:
+                return self._cache_set(key, stored[0], 'line', started, spans=stored[1])
 
         img = Image.new("RGBA", (w, h), (0, 0, 0, 0))
         draw = ImageDraw.Draw(img)
@@ -723,8 +2172,7 @@ class Overlay:
 
         arr = np.array(img, dtype=np.uint8)
         arr = self._premultiply_arr(arr)
-        self._cache_set(key, arr)
-        return key
+        return self._cache_set(key, arr, 'line', started, persist=True)
 
     def create_text_sprite(
             self,
@@ -739,9 +2187,9 @@ class Overlay:
             align: Literal['left', 'center', 'right'] = 'center',
             valign: Literal['top', 'middle', 'bottom'] = 'middle',
             font_path: Optional[str] = None,
-    ) -> Any:
+    ) -> SpriteHandle:
         """
-        Create (and cache) a text sprite. Returns the cache key.
+        Create (and cache) a text sprite. Returns its SpriteHandle.
 
         Args:
             text: Text string
@@ -754,7 +2202,7 @@ class Overlay:
             fit_text: Fit font size to fit inside box_size
             align: Horizontal alignment: left/center/right
             valign: Vertical alignment: top/middle/bottom
-            font_path: Path to ttf font (if None — use Arial/fallback)
+            font_path: Path to ttf font (if None or missing — the fallback chain, see set_font_fallbacks)
         """
         if float(font_size) < 1:
             raise ValueError("font_size must be >= 1")
@@ -769,17 +2217,16 @@ class Overlay:
         bg_color = self._normalize_color(bg_color)
         key = ("text", text, font_size, color, angle, highlight, bg_color, box_size, fit_text, align, valign, font_path)
         with self.sprite_lock:
-            if key in self.sprite_cache:
-                self.sprite_last_used[key] = time.time()
-                return key
+            handle = self.sprite_cache.touch(key, time.monotonic())
+        if handle is not None:
+            return handle
+        started = time.perf_counter()
+        if self.sprite_store is not None:
+            stored = self._store_load(key)
+            if stored is not None:
+                return self._cache_set(key, stored[0], 'text', started, spans=stored[1])
 
-        try:
-            if font_path:
-                font = ImageFont.truetype(font_path, font_size)
-            else:
-                font = ImageFont.truetype("arial.ttf", font_size)
-        except Exception:
-            font = ImageFont.load_default()
+        font = self.font_cache.get(font_path, font_size)
 
         # --- compute font/size and create image ---
         tmp = Image.new("RGBA", (10, 10), (0, 0, 0, 0))
@@ -795,13 +2242,7 @@ class Overlay:
             if fit_text and text_w > 0 and text_h > 0 and box_w > 0 and box_h > 0:
                 scale = min(box_w / text_w, box_h / text_h)
                 new_font_size = max(1, int(font_size * scale))
-                try:
-                    if font_path:
-                        final_font = ImageFont.truetype(font_path, new_font_size)
-                    else:
-                        final_font = ImageFont.truetype("arial.ttf", new_font_size)
-                except Exception:
-                    final_font = ImageFont.load_default()
+                final_font = self.font_cache.get(font_path, new_font_size)
                 bbox = dtmp.textbbox((0, 0), text, font=final_font)
                 text_w, text_h = bbox[2] - bbox[0], bbox[3] - bbox[1]
 
@@ -847,20 +2288,19 @@ class Overlay:
 
         arr = np.array(img, dtype=np.uint8)
         arr = self._premultiply_arr(arr)
-        self._cache_set(key, arr)
-        return key
+        return self._cache_set(key, arr, 'text', started, persist=True)
 
-    def create_sprite_from_numpy(self, array, sprite_key) -> Optional[Any]:
+    def create_sprite_from_numpy(self, array, sprite_key) -> Optional[SpriteHandle]:
         """
         Create a sprite directly from a numpy array.
         Useful for custom graphics, screenshots, generative images.
 
         Args:
             array: numpy array in RGBA format (height, width, 4)
-            sprite_key: Unique key for the sprite
+            sprite_key: Unique key for the sprite (storing the same key again replaces the sprite)
 
         Returns:
-            sprite_key or None on error
+            SpriteHandle (the sprite can also be referenced by sprite_key) or None on error
 
         Example:
             # Create a gradient
@@ -880,9 +2320,9 @@ class Overlay:
                 )
                 return None
 
+            started = time.perf_counter()
             processed_array = self._premultiply_arr(array.copy())
-            self._cache_set(sprite_key, processed_array)
-            return sprite_key
+            return self._cache_set(sprite_key, processed_array, 'numpy', started)
 
         except Exception as e:
             # Unexpected error: concise log without full traceback to avoid noise
@@ -901,26 +2341,122 @@ class Overlay:
         """
         with self.sprite_lock:
             self.sprite_cache.clear()
-            self.sprite_last_used.clear()
+
+    def set_sprite_cache_budget(self, max_bytes: Optional[int],
+                                on_evict: Optional[Callable[[Any, int], None]] = None) -> None:
+        """
+        Limit the memory of cached sprites (sum of ndarray.nbytes); None removes the limit (default).
+
+        With set_sprite_atlas(), the atlas pages count instead of the sprites stored in them, including their free
+        space; the atlas keeps at least one page (1 MB at the default page size), so budget several pages.
+
+        When a new sprite would exceed the budget, the least recently used sprites are evicted first:
+        sprites requested only once (one-off screenshots, changing labels) go before sprites created or
+        drawn again and again. A single sprite larger than the whole budget is still stored. TTL cleanup
+        keeps working alongside the budget.
+
+        Args:
+            max_bytes: Byte budget, or None for an unbounded cache
+            on_evict: Optional callback on_evict(key, nbytes) for each evicted sprite (called outside the
+                cache lock, so it may use the overlay)
+
+        Example:
+            overlay.set_sprite_cache_budget(256 * 1024 * 1024)  # 256 MB ceiling
+            print(overlay.sprite_cache.evictions, overlay.sprite_cache.bytes_used)
+        """
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0 or None")
+        with self.sprite_lock:
+            self.sprite_cache.max_bytes = None if max_bytes is None else int(max_bytes)
+            self.sprite_cache.on_evict = on_evict
+            self.sprite_cache.evict_to_budget()
+        self._notify_evicted()
+
+    def set_sprite_atlas(self, max_side: Optional[int] = 64, page_size: int = 512) -> None:
+        """
+        Store small sprites in shared texture atlas pages instead of one array each (off by default).
+
+        Sprites up to max_side x max_side pixels are copied into page_size x page_size BGRA pages (shelf packing).
+        The space of removed sprites is reused from the next rendered frame on, and pages left mostly empty by
+        TTL cleanup, eviction or removal are repacked then. Sprites already cached move into the new pages.
+        Compositing is unaffected: the renderer blits from its own packed pool either way.
+
+        The pages count against set_sprite_cache_budget() in place of the sprites they hold. Evicted atlas sprites
+        free page memory only when their page is repacked or emptied, so under a tight budget more sprites may be
+        evicted than the excess alone would need.
+
+        Args:
+            max_side: Largest sprite side stored in the atlas, or None to go back to one array per sprite
+            page_size: Side of an atlas page in pixels
+
+        Example:
+            overlay.set_sprite_atlas(64)  # thousands of markers and glyph-sized labels
+            print(overlay.get_cache_stats()['atlas'])  # pages, bytes, sprites, live_bytes, repacks
+        """
+        atlas = None if not max_side else SpriteAtlas(page_size, max_side)
+        with self.sprite_lock:
+            self.sprite_cache.set_atlas(atlas)
+            self.sprite_cache.evict_to_budget()
+        self._notify_evicted()
+
+    def set_sprite_store(self, directory: Optional[str], max_bytes: int = 256 * 1024 * 1024) -> None:
+        """
+        Persist rasterized circle, rect, line and text sprites in a directory and reuse them in later runs.
+
+        A create_* cache miss first looks the sprite up in the store (views of the memory-mapped data file, with
+        the sprite's opacity spans, so neither rasterization nor span analysis runs) and writes newly rasterized
+        sprites to it. Entries are keyed by the sprite's
+        parameters (plus the font file's path, size and modification time for text) and by the Pillow version,
+        so a changed font or Pillow upgrade re-rasterizes. Sprites from create_sprite_from_numpy() are not stored.
+        Only one process should use a directory at a time.
+
+        Args:
+            directory: Store directory (created if missing), or None to stop using the current store
+            max_bytes: Size limit of the data file; new sprites are not written beyond it, and a larger store
+                is started over when opened
+
+        Raises:
+            OSError: if the directory or its files cannot be created or opened
+
+        Example:
+            overlay.set_sprite_store(os.path.join(os.path.expanduser('~'), '.cache', 'my_hud_sprites'))
+            ...  # first run rasterizes and writes; later runs load the HUD without PIL
+            print(overlay.get_cache_stats()['store'])  # entries, bytes, loads, writes
+        """
+        store = None if directory is None else SpriteStore(directory, _RASTER_VERSION, max_bytes)
+        old, self.sprite_store = self.sprite_store, store
+        if old is not None:
+            old.close()
+
+    def set_font_fallbacks(self, fallbacks: Sequence[str]) -> None:
+        """
+        Set the fonts tried, in order, for text without a font_path or whose font_path cannot be loaded.
+
+        PIL's built-in default font ends the chain. Fonts are loaded once per (path, size) and kept in
+        font_cache; a file that fails to load is not tried again until the chain changes or
+        font_cache.clear() is called. Glyph text is redrawn with the new chain; text sprites already cached
+        keep their font: call sprite_clear_cache() to redraw them.
+
+        Args:
+            fallbacks: Font file names or paths, e.g. ('segoeui.ttf', 'arial.ttf', 'DejaVuSans.ttf')
+        """
+        self.font_cache.set_fallbacks(fallbacks)
+        self.glyph_cache.clear()
 
     def sprite_clear_expired(self, max_age: float = 5.0) -> int:
-        """Remove sprites older than max_age seconds (by last-used time). Returns number removed."""
-        now = time.time()
-        removed = 0
+        """Remove sprites unused for more than max_age seconds (monotonic clock). Returns number removed.
+
+        Only sprites that may have expired are visited (see sprites.SpriteCache.expire), not the whole cache.
+        """
         with self.sprite_lock:
-            for key, ts in list(self.sprite_last_used.items()):
-                if now - ts > max_age:
-                    self.sprite_last_used.pop(key, None)
-                    self.sprite_cache.pop(key, None)
-                    removed += 1
-        return removed
+            return self.sprite_cache.expire(time.monotonic() - max_age)[0]
 
     def sprite_remove(self, sprite_key: Any) -> bool:
         """
         Remove a specific sprite from the cache.
 
         Args:
-            sprite_key: The sprite key to remove
+            sprite_key: The sprite key or SpriteHandle to remove (the sprite's handles stop resolving)
 
         Returns:
             bool: True if the sprite was removed, False if not found
@@ -931,9 +2467,7 @@ class Overlay:
                 print("Sprite removed")
         """
         with self.sprite_lock:
-            if sprite_key in self.sprite_cache:
-                del self.sprite_cache[sprite_key]
-                self.sprite_last_used.pop(sprite_key, None)
+            if self.sprite_cache.remove(sprite_key):
                 return True
             logger.debug("sprite_remove: key=%r not found", sprite_key)
             return False
@@ -1003,6 +2537,107 @@ class Overlay:
         key = self.create_rect_sprite(width, height, color, thickness)
         self.add_sprite_instance(key, x, y)
 
+    def fill_rect(
+        self,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        color: Tuple[int, int, int, int] = (255, 255, 255, 255)
+    ) -> None:
+        """Fill a rectangle with a solid color without creating a sprite.
+
+        The renderer writes the color straight into the frame (opaque colors are copied, translucent ones
+        blended), so large or frequently changing fills such as dimming layers and tints allocate nothing.
+        Output is identical to draw_rect() with thickness=0.
+
+        Args:
+            x: Left X coordinate
+            y: Top Y coordinate
+            width: Rectangle width in pixels (must be >= 1)
+            height: Rectangle height in pixels (must be >= 1)
+            color: RGBA color tuple (default: white, fully opaque)
+
+        Raises:
+            ValueError: If coordinates are invalid or width/height < 1
+        """
+        if not isinstance(x, int) or not isinstance(y, int):
+            raise ValueError("x and y coordinates must be integers")
+        if not isinstance(width, int) or width < 1 or not isinstance(height, int) or height < 1:
+            raise ValueError("width and height must be positive integers")
+
+        color = self._normalize_color(color)
+        self.add_sprite_instance(_SolidFill(width, height, _pack_color(color)), x, y)
+
+    def fill_screen(self, color: Tuple[int, int, int, int]) -> None:
+        """Fill (tint) the whole overlay with a solid color; see fill_rect()."""
+        self.fill_rect(0, 0, self.width, self.height, color)
+
+    def draw_circle_aa(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        color: Tuple[int, int, int, int] = (255, 255, 255, 255),
+        thickness: float = 0
+    ) -> None:
+        """Draw an anti-aliased circle or ring rasterized directly into the frame.
+
+        Unlike draw_circle() no sprite is created: coverage is computed analytically by the compositor,
+        so animated radii and colors cost only the pixels they touch. Coordinates and sizes may be
+        fractional; the footprint matches draw_circle() for integer arguments.
+
+        Args:
+            x: Center X coordinate (pixel center)
+            y: Center Y coordinate (pixel center)
+            radius: Circle radius in pixels (must be > 0)
+            color: RGBA color tuple (default: white, fully opaque)
+            thickness: Ring width in pixels (0 = filled)
+
+        Raises:
+            ValueError: If radius <= 0 or thickness is negative
+        """
+        if not radius > 0:
+            raise ValueError("radius must be positive")
+        if not thickness >= 0:
+            raise ValueError("thickness must be non-negative")
+
+        color = self._normalize_color(color)
+        key, ox, oy = _AACircle.at(x + 0.5, y + 0.5, radius + 0.5, thickness, _pack_color(color))
+        self.add_sprite_instance(key, ox, oy)
+
+    def draw_line_aa(
+        self,
+        x1: float,
+        y1: float,
+        x2: float,
+        y2: float,
+        color: Tuple[int, int, int, int] = (255, 255, 255, 255),
+        thickness: float = 1
+    ) -> None:
+        """Draw an anti-aliased line with round caps rasterized directly into the frame.
+
+        Unlike draw_line() no sprite is created, which makes it the right choice for geometry that changes
+        every frame (needles, rotating barrels, graphs). Coordinates may be fractional.
+
+        Args:
+            x1: Start X coordinate
+            y1: Start Y coordinate
+            x2: End X coordinate
+            y2: End Y coordinate
+            color: RGBA color tuple (default: white, fully opaque)
+            thickness: Line thickness in pixels (must be > 0)
+
+        Raises:
+            ValueError: If thickness <= 0
+        """
+        if not thickness > 0:
+            raise ValueError("thickness must be positive")
+
+        color = self._normalize_color(color)
+        key, ox, oy = _AALine.at(x1 + 0.5, y1 + 0.5, x2 + 0.5, y2 + 0.5, thickness, _pack_color(color))
+        self.add_sprite_instance(key, ox, oy)
+
     def draw_line(
         self,
         x1: int,
@@ -1104,26 +2739,69 @@ class Overlay:
         # bx, by - base position (if box is set, x,y are bx,by; otherwise same)
         bx, by = x, y
 
-        # --- Offset depending on anchor ---
-        anchor_map = {
-            "lt": (0, 0),
-            "mt": (-w / 2, 0),
-            "rt": (-w, 0),
-            "lm": (0, -h / 2),
-            "mm": (-w / 2, -h / 2),
-            "rm": (-w, -h / 2),
-            "lb": (0, -h),
-            "mb": (-w / 2, -h),
-            "rb": (-w, -h),
-        }
-        if anchor not in anchor_map:
-            self._warn_once(("invalid_anchor", anchor), "Invalid anchor=%r; using default 'lt'", anchor)
-        dx, dy = anchor_map.get(anchor, (0, 0))
+        dx, dy = self._anchor_offset(anchor, w, h)
         final_x = int(bx + dx)
         final_y = int(by + dy)
 
         self.add_sprite_instance(key, final_x, final_y)
 
+    def draw_glyph_text(
+        self,
+        x: int,
+        y: int,
+        text: str,
+        color: Tuple[int, int, int, int] = (255, 255, 255, 255),
+        font_size: float = 16.0,
+        anchor: Literal['lt', 'mt', 'rt', 'lm', 'mm', 'rm', 'lb', 'mb', 'rb'] = 'lt',
+        font_path: Optional[str] = None,
+    ) -> None:
+        """Draw text composed from cached glyphs, for labels whose text changes often.
+
+        draw_text() rasterizes a sprite per distinct string, so a counter re-rasterizes whenever its value
+        changes. Here every glyph of the font and size is rasterized once (glyph_cache) and colored once per
+        color (sprite cache type 'glyph'); the string is then one instance per visible glyph, placed by the
+        glyph advances. Once its glyphs are cached, a new string creates no sprites.
+
+        Advances are summed without kerning or shaping: suited to digits, Latin labels and monospaced text.
+        The text block is as tall as the font's line height, so a label does not move when its glyphs change.
+        No angle, highlight or box layout; '\n' starts a new line.
+
+        Args:
+            x: Base X coordinate (see anchor)
+            y: Base Y coordinate (see anchor)
+            text: Text string to draw
+            color: Text color as RGBA tuple (default: white, fully opaque)
+            font_size: Font size in points (must be > 0)
+            anchor: Text anchor point relative to (x, y), as in draw_text()
+            font_path: Optional path to .ttf font file (see set_font_fallbacks)
+
+        Raises:
+            ValueError: If font_size is not positive
+
+        Example:
+            overlay.draw_glyph_text(20, 20, f"FPS: {overlay.get_render_fps()}", color=(0, 255, 0, 255))
+        """
+        if not isinstance(text, str):
+            text = str(text)
+        if not isinstance(font_size, (int, float)) or font_size <= 0:
+            raise ValueError("font_size must be a positive number")
+        color = self._normalize_color(color)
+        chars, glyphs, ids, xs, ys, w, h, generation = self.glyph_cache.layout(text, font_path, font_size)
+        if not chars:
+            return
+        # The generation keeps sprites colored from an earlier font (before set_font_fallbacks) out of this layout
+        keys = [('glyph', char, font_size, color, generation, font_path) for char in chars]
+        now = time.monotonic()
+        with self.sprite_lock:
+            handles = [self.sprite_cache.touch(key, now) for key in keys]
+        for i, handle in enumerate(handles):
+            if handle is None:
+                handles[i] = self._create_glyph_sprite(keys[i], glyphs[i].mask, color)
+        dx, dy = self._anchor_offset(anchor, w, h)
+        xs += int(x + dx)
+        ys += int(y + dy)
+        self.add_sprite_instances(handles, xs, ys, ids)
+
     # ---------------- Diagnostics and statistics ----------------
 
     def get_render_fps(self) -> int:
@@ -1135,6 +2813,23 @@ class Overlay:
         with self.object_count_lock:
             return self.object_count
 
+    def get_frame_stats(self) -> Dict[str, Any]:
+        """
+        Return statistics of the last rendered frame.
+
+        Keys:
+            mode: 'full' (whole buffer recomposited) or 'dirty' (only changed regions)
+            dirty_rects: number of recomposited regions (None in full mode)
+            dirty_pixels: number of recomposited pixels
+            cleared_pixels: number of pixels reset to the clear color (both buffers)
+            instances: number of instances composited into the frame
+            occluded_instances: instances skipped because a later opaque instance covers them
+            occluded_pixels: on-screen pixels of the skipped instances
+            static_rebuilds: static layer surfaces rebuilt for the frame
+        """
+        with self.frame_stats_lock:
+            return dict(self.frame_stats)
+
     def get_render_statistics(self) -> Tuple[str, List[Tuple[Any, Tuple[int, int, int, int]]]]:
         """
         Return (stats_text, detailed_items)
@@ -1145,13 +2840,18 @@ class Overlay:
             stats_summary = {}
             total_instances = 0
 
+            items = list(chain(self.scene.snapshot(), self.front_instances, *self._context_instances()))
             with self.sprite_lock:
-                cache_copy = self.sprite_cache.copy()
+                # sprite key (or handle) -> (original key, sprite) for each distinct key
+                sprites = {key: (self.sprite_cache.key_of(key), self.sprite_cache.get(key))
+                           for key in dict.fromkeys(map(itemgetter(0), items))}
 
-            for item in self.front_instances:
-                sprite_key, x, y = item
-                sprite_arr = cache_copy.get(sprite_key)
-                if sprite_arr is not None:
+            for sprite_key, x, y in items:
+                original_key, sprite_arr = sprites[sprite_key]
+                if isinstance(sprite_key, _DrawOp):
+                    x1, y1 = x, y
+                    x2, y2 = x + sprite_key[1], y + sprite_key[2]
+                elif sprite_arr is not None:
                     h, w = sprite_arr.shape[:2]
                     x1, y1 = x, y
                     x2, y2 = x + w, y + h
@@ -1162,7 +2862,7 @@ class Overlay:
 
                 detailed_items.append((sprite_key, (x1, y1, x2, y2)))
 
-                obj_type = sprite_key[0] if isinstance(sprite_key, tuple) else 'unknown'
+                obj_type = original_key[0] if isinstance(original_key, tuple) else 'unknown'
                 stats_summary.setdefault(obj_type, {'instances': 0})
                 stats_summary[obj_type]['instances'] += 1
                 total_instances += 1
@@ -1178,38 +2878,147 @@ class Overlay:
         Return information about a specific sprite.
 
         Args:
-            sprite_key: Sprite key
+            sprite_key: Sprite key or SpriteHandle
 
         Returns:
-            dict or None if the sprite is not found
+            dict or None if the sprite is not found ('key' is the original key, 'handle' its SpriteHandle)
 
         Example:
             info = overlay.get_sprite_info(text_key)
             if info:
                 print(f"Size: {info['width']}x{info['height']}")
         """
-        sprite = self._cache_get(sprite_key, update_ts=False)
-        if sprite is None:
-            return None
+        with self.sprite_lock:
+            sprite = self.sprite_cache.get(sprite_key)
+            if sprite is None:
+                return None
+            key = self.sprite_cache.key_of(sprite_key)
+            handle = self.sprite_cache.handle(sprite_key)
         return {
-            'key': sprite_key,
+            'key': key,
+            'handle': handle,
             'width': sprite.shape[1],
             'height': sprite.shape[0],
             'memory_bytes': sprite.nbytes,
-            'type': sprite_key[0] if isinstance(sprite_key, tuple) else 'unknown'
+            'type': key[0] if isinstance(key, tuple) else 'unknown'
         }
 
+    def get_cache_stats(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Return sprite cache statistics (counters accumulate since creation or the last reset).
+
+        Keys:
+            entries, bytes: cached sprites and their total ndarray.nbytes
+            memory_bytes: memory counted against max_bytes: bytes, with atlas pages (free space included) in place
+                of the sprites stored in them
+            peak_bytes: highest total bytes after a sprite was stored
+            max_bytes: byte budget (None: unbounded)
+            hits, misses: create_* calls answered from the cache / that had to rasterize
+            hit_rate: hits / (hits + misses), or None before the first create_* call
+            creations: sprites stored (create_* misses and create_sprite_from_numpy)
+            expirations: sprites removed by TTL cleanup
+            removals: sprites removed by sprite_remove() and sprite_clear_cache()
+            evictions, evicted_bytes: sprites removed by the byte budget
+            rasterize_seconds: time spent producing sprites (drawing, premultiplying, span analysis)
+            by_type: per sprite type ('circle', 'rect', 'line', 'text', 'glyph', 'numpy', plus other key prefixes):
+                entries, bytes, hits, misses, creations, rasterize_seconds
+            atlas: with set_sprite_atlas(): pages, bytes (page memory), sprites, live_bytes, repacks; else None
+            store: with set_sprite_store(): entries, bytes, loads, writes; else None
+            fonts: font cache (see set_font_fallbacks): entries, hits, misses, loads, failures, missing (paths)
+            glyphs: glyph cache of draw_glyph_text: faces, glyphs (masks held), rasterized
+
+        Args:
+            reset: Zero the counters after reading them (entries and bytes are kept)
+
+        Example:
+            stats = overlay.get_cache_stats(reset=True)  # once per second: churn of the last second
+            if stats['by_type']['text']['creations'] > 100:
+                print("labels are re-rasterized every frame")
+        """
+        with self.sprite_lock:
+            stats = self.sprite_cache.stats()
+            if reset:
+                self.sprite_cache.reset_stats()
+        for kind in ('circle', 'rect', 'line', 'text', 'glyph', 'numpy'):
+            stats['by_type'].setdefault(kind, TypeStats().as_dict())
+        stats['store'] = None if self.sprite_store is None else self.sprite_store.stats()
+        stats['fonts'] = self.font_cache.stats()
+        stats['glyphs'] = self.glyph_cache.stats()
+        if reset:
+            self.font_cache.reset_stats()
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else None
+        return stats
+
     # ---------------- Internal cache utilities ----------------
+    def _anchor_offset(self, anchor: str, w: int, h: int) -> Tuple[float, float]:
+        """Offset of a w x h text block's top-left corner from its anchor point."""
+        fractions = _TEXT_ANCHORS.get(anchor)
+        if fractions is None:
+            self._warn_once(("invalid_anchor", anchor), "Invalid anchor=%r; using default 'lt'", anchor)
+            return 0, 0
+        return -w * fractions[0], -h * fractions[1]
+
+    def _create_glyph_sprite(self, key: tuple, mask, color: Tuple[int, int, int, int]) -> SpriteHandle:
+        """Color a glyph mask (see draw_glyph_text) and cache it."""
+        started = time.perf_counter()
+        if self.sprite_store is not None:
+            stored = self._store_load(key)
+            if stored is not None:
+                return self._cache_set(key, stored[0], 'glyph', started, spans=stored[1])
+        arr = np.empty(mask.shape + (4,), dtype=np.uint8)
+        arr[..., :3] = color[:3]
+        arr[..., 3] = (mask.astype(np.uint16) * color[3] + 127) // 255
+        arr = self._premultiply_arr(arr)
+        return self._cache_set(key, arr, 'glyph', started, persist=True)
+
+    def _store_digest(self, key: tuple) -> str:
+        if key[0] not in ('text', 'glyph'):  # keys whose last item is a font_path
+            return spec_digest(key)
+        fallbacks = tuple(_font_identity(path) for path in self.font_cache.fallbacks)
+        return spec_digest((key, _font_identity(key[-1]), fallbacks))
+
+    def _store_load(self, key: tuple):
+        store = self.sprite_store
+        return None if store is None else store.get(self._store_digest(key))
+
+    def _store_save(self, key: tuple, arr, spans) -> None:
+        store = self.sprite_store
+        if store is not None:
+            store.put(self._store_digest(key), arr, spans)
+
     def _cache_get(self, key: Any, update_ts: bool = True):
         with self.sprite_lock:
-            arr = self.sprite_cache.get(key)
-            if arr is None:
-                return None
-            if update_ts:
-                self.sprite_last_used[key] = time.time()
-            return arr
+            if not update_ts:
+                return self.sprite_cache.get(key)
+            entry = self.sprite_cache.resolve(key, time.monotonic())
+            return None if entry is None else entry[0]
 
-    def _cache_set(self, key: Any, arr) -> None:
+    def _cache_set(self, key: Any, arr, kind: Optional[str] = None, started: Optional[float] = None,
+                   spans=None, persist: bool = False) -> SpriteHandle:
+        """
+        Store a sprite; started is the perf_counter() time its rasterization began (for get_cache_stats).
+        spans are computed unless given (loaded from the sprite store); persist also writes the sprite to the store.
+        """
+        if spans is None:
+            spans = _sprite_spans(arr)
+            if persist and self.sprite_store is not None:
+                self._store_save(key, arr, spans)
+        elapsed = 0.0 if started is None else time.perf_counter() - started
         with self.sprite_lock:
-            self.sprite_cache[key] = arr
-            self.sprite_last_used[key] = time.time()
+            handle = self.sprite_cache.put(key, arr, spans, time.monotonic(), kind, elapsed)
+        self._notify_evicted()
+        return handle
+
+    def _notify_evicted(self) -> None:
+        """Run the eviction callback for sprites evicted by the byte budget (outside sprite_lock)."""
+        callback = self.sprite_cache.on_evict
+        if callback is None:
+            return
+        with self.sprite_lock:
+            evicted = self.sprite_cache.take_evicted()
+        for key, nbytes in evicted:
+            try:
+                callback(key, nbytes)
+            except Exception as e:
+                logger.error("Sprite eviction callback failed for key=%r: %s", key, e)
@@ -0,0 +1,122 @@
+"""
+Cache of loaded PIL fonts.
+
+ImageFont.truetype() opens and parses the font file on every call, and a bare name like "arial.ttf" is first looked
+up in the system font directories. create_text_sprite needs a font on every sprite cache miss (twice with
+fit_text), which for labels whose text changes every frame means every frame. A FontCache keeps the fonts it loaded
+in a bounded LRU keyed by (path, size), and remembers the paths that failed to load so that a missing font costs
+one failed lookup per cache, not one per sprite.
+
+A font is resolved through a chain: the requested path, then the fallbacks in order, then PIL's built-in default
+font. The LRU stores the font the chain ended with, so a hit never probes the file system.
+"""
+
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from PIL import ImageFont
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FALLBACKS = ('arial.ttf',)
+
+
+class FontCache:
+    """
+    Bounded LRU of loaded fonts with negative caching of font files that could not be opened.
+
+    Args:
+        max_entries: Fonts kept (one per (path, size)); the least recently used one is dropped beyond this
+        fallbacks: Font files tried, in order, when the requested one is missing or not given
+
+    Attributes:
+        hits, misses: get() calls answered from the cache / that had to resolve a font
+        loads: Fonts loaded (ImageFont.truetype() calls that succeeded, plus the built-in default font)
+        failures: Font files that could not be loaded
+    """
+
+    def __init__(self, max_entries: int = 64, fallbacks: Sequence[str] = DEFAULT_FALLBACKS):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = int(max_entries)
+        self.fallbacks: Tuple[str, ...] = tuple(fallbacks)
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.failures = 0
+        self._lock = Lock()
+        self._fonts: 'OrderedDict[Tuple[Optional[str], Any], Any]' = OrderedDict()
+        self._missing: Dict[str, str] = {}  # path -> error message of its failed load
+        self._default = None  # ImageFont.load_default(), loaded once
+
+    def get(self, path: Optional[str], size) -> Any:
+        """Font for a path (None: fallbacks only) and size, loading it on a miss."""
+        key = (path, size)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return font
+            self.misses += 1
+            font = self._resolve(path, size)
+            self._fonts[key] = font
+            while len(self._fonts) > self.max_entries:
+                self._fonts.popitem(last=False)
+            return font
+
+    def set_fallbacks(self, fallbacks: Sequence[str]) -> None:
+        """Replace the fallback chain; cached fonts are dropped, missing paths are retried."""
+        with self._lock:
+            self.fallbacks = tuple(fallbacks)
+            self._fonts.clear()
+            self._missing.clear()
+
+    def clear(self) -> None:
+        """Drop cached fonts and forget missing paths (e.g. after installing a font)."""
+        with self._lock:
+            self._fonts.clear()
+            self._missing.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """entries, hits, misses, loads, failures, missing (font paths remembered as missing)."""
+        with self._lock:
+            return {'entries': len(self._fonts), 'hits': self.hits, 'misses': self.misses, 'loads': self.loads,
+                    'failures': self.failures, 'missing': sorted(self._missing)}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.loads = self.failures = 0
+
+    def __len__(self) -> int:
+        return len(self._fonts)
+
+    def __repr__(self) -> str:
+        return f"FontCache(max_entries={self.max_entries}, fallbacks={self.fallbacks!r}, entries={len(self._fonts)})"
+
+    # ---- internals ----
+    def _resolve(self, path: Optional[str], size) -> Any:
+        """First font of the chain that loads (called under the lock)."""
+        for candidate in ((path,) if path else ()) + self.fallbacks:
+            if candidate in self._missing:
+                continue
+            try:
+                font = ImageFont.truetype(candidate, size)
+            except OSError as e:  # missing or unreadable file: skip it for every size from now on
+                self.failures += 1
+                self._missing[candidate] = str(e)
+                log = logger.warning if candidate == path else logger.info
+                log("Font %r could not be loaded (%s); using the next font of the fallback chain", candidate, e)
+                continue
+            except Exception as e:  # e.g. a size this font cannot render: only this size falls back
+                self.failures += 1
+                logger.debug("Font %r at size %r could not be loaded: %s", candidate, size, e)
+                continue
+            self.loads += 1
+            return font
+        if self._default is None:
+            self._default = ImageFont.load_default()
+            self.loads += 1
+        return self._default
@@ -0,0 +1,162 @@
+"""
+Glyph cache for text drawn one glyph per instance.
+
+A text sprite is rasterized per distinct string, so a label whose number changes every frame (FPS counters,
+timers, "Objects: N") costs a PIL layout, a rasterization, a premultiply and a new cache entry per value. A
+GlyphCache instead rasterizes each glyph of a face (font path and size) once, as an alpha mask with its bounding
+box and advance, and lays strings out from those: a string becomes one instance per visible glyph, positioned by
+summed advances. Overlay.draw_glyph_text turns the masks into colored glyph sprites (one per glyph and color, in
+the sprite cache) and enqueues the instances.
+
+The layout is deliberately simple: advances are summed without kerning or shaping, so it suits digits, Latin
+labels and monospaced text, not scripts that need complex shaping. Lines are broken at '\\n' and spaced like
+ImageDraw.multiline_text.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+LINE_SPACING = 4  # pixels between lines, as ImageDraw.multiline_text
+
+
+class Glyph:
+    """Alpha mask of one glyph (None for blank glyphs) with its offset from the pen position and its advance."""
+
+    __slots__ = ('mask', 'x0', 'y0', 'advance')
+
+    def __init__(self, mask: Optional[np.ndarray], x0: int, y0: int, advance: float):
+        self.mask = mask
+        self.x0 = x0
+        self.y0 = y0
+        self.advance = advance
+
+
+class GlyphFace:
+    """Glyphs of one font at one size, rasterized on first use."""
+
+    def __init__(self, font: Any):
+        self.font = font
+        try:
+            ascent, descent = font.getmetrics()
+        except AttributeError:  # bitmap ImageFont
+            bbox = font.getbbox("Ay")
+            ascent, descent = bbox[3], 0
+        self.line_height = ascent + descent
+        self.glyphs: Dict[str, Glyph] = {}
+
+    def glyph(self, char: str) -> Glyph:
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.glyphs[char] = self._rasterize(char)
+        return glyph
+
+    def _rasterize(self, char: str) -> Glyph:
+        # Coordinates are relative to the pen at the top (ascender line) of the line, PIL's default 'la' anchor
+        x0, y0, x1, y1 = (int(v) for v in self.font.getbbox(char))
+        advance = float(self.font.getlength(char))
+        if x1 <= x0 or y1 <= y0:
+            return Glyph(None, 0, 0, advance)
+        img = Image.new("L", (x1 - x0, y1 - y0), 0)
+        ImageDraw.Draw(img).text((-x0, -y0), char, font=self.font, fill=255)
+        mask = np.array(img, dtype=np.uint8)
+        return Glyph(mask if mask.any() else None, x0, y0, advance)
+
+
+class GlyphCache:
+    """
+    Bounded LRU of glyph faces.
+
+    Args:
+        load_font: Callable (path, size) -> PIL font, e.g. FontCache.get
+        max_faces: Faces kept; the least recently used one (and its glyphs) is dropped beyond this
+
+    Attributes:
+        rasterized: Glyph masks rasterized so far
+        generation: Bumped by clear(); sprites made from the masks of one generation must not be reused in another
+    """
+
+    def __init__(self, load_font: Callable[[Optional[str], Any], Any], max_faces: int = 16):
+        if max_faces < 1:
+            raise ValueError("max_faces must be >= 1")
+        self.load_font = load_font
+        self.max_faces = int(max_faces)
+        self.rasterized = 0
+        self.generation = 0
+        self._lock = Lock()
+        self._faces: 'OrderedDict[Tuple[Optional[str], Any], GlyphFace]' = OrderedDict()
+
+    def layout(self, text: str, font_path: Optional[str], size) -> Tuple[List[str], List[Glyph], np.ndarray,
+                                                                           np.ndarray, np.ndarray, int, int, int]:
+        """
+        Lay out a string.
+
+        Returns:
+            (chars, glyphs, ids, xs, ys, width, height, generation): the distinct visible glyphs of the string and
+            their Glyph objects, then per instance the index into chars and the top-left position relative to the
+            text's top-left corner; width and height of the text block; the generation the glyphs belong to
+        """
+        with self._lock:
+            face = self._face(font_path, size)
+            chars: List[str] = []
+            glyphs: List[Glyph] = []
+            index: Dict[str, int] = {}
+            ids: List[int] = []
+            xs: List[int] = []
+            ys: List[int] = []
+            width = 0.0
+            top = 0
+            lines = text.split('\n')
+            for line in lines:
+                pen = 0.0
+                for char in line:
+                    glyph = face.glyphs.get(char)
+                    if glyph is None:
+                        glyph = face.glyph(char)
+                        self.rasterized += glyph.mask is not None
+                    if glyph.mask is not None:
+                        i = index.get(char)
+                        if i is None:
+                            i = index[char] = len(chars)
+                            chars.append(char)
+                            glyphs.append(glyph)
+                        ids.append(i)
+                        xs.append(int(round(pen)) + glyph.x0)
+                        ys.append(top + glyph.y0)
+                    pen += glyph.advance
+                width = max(width, pen)
+                top += face.line_height + LINE_SPACING
+            height = len(lines) * face.line_height + (len(lines) - 1) * LINE_SPACING
+            generation = self.generation
+        return (chars, glyphs, np.array(ids, dtype=np.int64), np.array(xs, dtype=np.int64),
+                np.array(ys, dtype=np.int64), int(np.ceil(width)), height, generation)
+
+    def clear(self) -> None:
+        """Drop every face (e.g. after the font fallback chain changed) and start a new generation."""
+        with self._lock:
+            self._faces.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """faces, glyphs (masks held), rasterized."""
+        with self._lock:
+            return {'faces': len(self._faces), 'glyphs': sum(len(face.glyphs) for face in self._faces.values()),
+                    'rasterized': self.rasterized}
+
+    def __repr__(self) -> str:
+        return f"GlyphCache(max_faces={self.max_faces}, faces={len(self._faces)})"
+
+    # ---- internals ----
+    def _face(self, font_path: Optional[str], size) -> GlyphFace:
+        key = (font_path, size)
+        face = self._faces.get(key)
+        if face is None:
+            face = self._faces[key] = GlyphFace(self.load_font(font_path, size))
+            while len(self._faces) > self.max_faces:
+                self._faces.popitem(last=False)
+        else:
+            self._faces.move_to_end(key)
+        return face
@@ -0,0 +1,134 @@
+"""
+Instance storage for Overlay frames.
+
+An InstanceQueue keeps a frame's sprite instances in a growable NumPy structured array
+(key index, x, y) plus a table of the distinct sprite keys. Bulk submissions
+(Overlay.add_sprite_instances) are copied into the array in one step; single add_sprite_instance()
+calls are buffered as tuples and moved into the array when the frame is read. Queues are cleared
+and refilled instead of reallocated, so a steady scene reuses the same storage every frame.
+"""
+
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+INSTANCE_DTYPE = np.dtype([('key', np.int32), ('x', np.int32), ('y', np.int32)])
+
+
+class InstanceQueue:
+    """
+    Ordered sprite instances of one frame.
+
+    Attributes:
+        keys: Distinct sprite keys of the frame; the 'key' field of data indexes this list
+        data: Structured array (INSTANCE_DTYPE) with at least len(self) rows; only the first
+            rows are valid after flush()
+    """
+
+    __slots__ = ('keys', 'data', '_size', '_key_ids', '_tail')
+
+    def __init__(self, capacity: int = 0):
+        self.keys: List[Any] = []
+        self.data = np.empty(capacity, dtype=INSTANCE_DTYPE)
+        self._size = 0
+        self._key_ids: Dict[Any, int] = {}
+        self._tail: List[Tuple[Any, int, int]] = []  # single appends not yet moved into data
+
+    def _key_id(self, key: Any) -> int:
+        kid = self._key_ids.get(key)
+        if kid is None:
+            kid = self._key_ids[key] = len(self.keys)
+            self.keys.append(key)
+        return kid
+
+    def _reserve(self, count: int) -> np.ndarray:
+        """Grow data for count more rows and return the view they go into."""
+        start, end = self._size, self._size + count
+        if end > len(self.data):
+            grown = np.empty(max(end, 2 * len(self.data), 256), dtype=INSTANCE_DTYPE)
+            grown[:start] = self.data[:start]
+            self.data = grown
+        self._size = end
+        return self.data[start:end]
+
+    def append(self, key: Any, x: int, y: int) -> None:
+        """Add one instance."""
+        self._tail.append((key, x, y))
+
+    def extend(self, keys: Any, xs: Any, ys: Any, ids: Any = None) -> None:
+        """
+        Add instances from arrays (see Overlay.add_sprite_instances for the accepted keys/ids forms).
+
+        Raises:
+            ValueError: on mismatched lengths or ids outside the keys palette
+        """
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        n = len(xs)
+        if xs.ndim != 1 or ys.shape != xs.shape:
+            raise ValueError("xs and ys must be 1-D arrays of the same length")
+        if ids is not None:
+            ids = np.asarray(ids)
+            if ids.shape != xs.shape:
+                raise ValueError("ids must have the same length as xs")
+            if n and (ids.min() < 0 or ids.max() >= len(keys)):
+                raise ValueError("ids must index into keys")
+            remap = np.fromiter(map(self._key_id, keys), dtype=np.int32, count=len(keys))
+            key_ids = remap[ids]
+        elif isinstance(keys, (list, np.ndarray)):
+            if len(keys) != n:
+                raise ValueError("keys must have one sprite key per instance")
+            key_ids = np.fromiter(map(self._key_id, keys), dtype=np.int32, count=n)
+        else:
+            key_ids = self._key_id(keys)  # one sprite key for all instances
+        self.flush()
+        rows = self._reserve(n)
+        rows['key'] = key_ids
+        rows['x'] = xs
+        rows['y'] = ys
+
+    def flush(self) -> None:
+        """Move buffered single appends into data."""
+        tail = self._tail
+        if not tail:
+            return
+        n = len(tail)
+        rows = self._reserve(n)
+        rows['key'] = np.fromiter((self._key_id(item[0]) for item in tail), dtype=np.int32, count=n)
+        rows['x'] = np.fromiter((item[1] for item in tail), dtype=np.int32, count=n)
+        rows['y'] = np.fromiter((item[2] for item in tail), dtype=np.int32, count=n)
+        self._tail = []
+
+    def rows(self) -> np.ndarray:
+        """Valid rows of data (a view; flushes first)."""
+        self.flush()
+        return self.data[:self._size]
+
+    def copy(self) -> "InstanceQueue":
+        """Compact copy of the current instances (one array copy)."""
+        rows = self.rows()
+        out = InstanceQueue(0)
+        out.data = rows.copy()
+        out._size = len(rows)
+        out.keys = list(self.keys)
+        out._key_ids = dict(self._key_ids)
+        return out
+
+    def clear(self) -> None:
+        """Remove all instances, keeping the allocated storage."""
+        self._size = 0
+        self.keys = []
+        self._key_ids = {}
+        self._tail = []
+
+    def __len__(self) -> int:
+        return self._size + len(self._tail)
+
+    def __iter__(self) -> Iterator[Tuple[Any, int, int]]:
+        keys = self.keys
+        for kid, x, y in self.rows().tolist():
+            yield keys[kid], x, y
+
+    def __repr__(self) -> str:
+        return f"InstanceQueue(instances={len(self)}, keys={len(self.keys)})"
+
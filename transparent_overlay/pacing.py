@@ -0,0 +1,124 @@
+"""
+Frame pacing for Overlay.
+
+FramePacer divides time into fixed slots of 1 / target_fps seconds on a monotonic clock
+(time.perf_counter). The render thread composites at most one frame per slot, and frames
+signalled within a slot coalesce into one. A producer thread can wait for the next slot
+instead of keeping its own timer. Waits sleep while the deadline is far and spin for the
+last spin_seconds, because plain sleeps overshoot by a scheduler tick on most systems.
+"""
+
+import math
+import time
+from threading import Event, Lock
+from typing import Any, Dict, Optional
+
+
+class FramePacer:
+    """
+    Fixed-rate frame slots with frame-budget accounting.
+
+    Args:
+        target_fps: Frame slots per second (> 0)
+        spin_seconds: Busy-wait this long before a deadline instead of sleeping (default: 2 ms)
+
+    Example:
+        overlay.set_target_fps(60)
+        while running:
+            overlay.frame_clear()
+            ...  # draw
+            overlay.signal_render()
+            overlay.wait_next_frame()  # sleeps until the next frame slot
+    """
+
+    def __init__(self, target_fps: float, spin_seconds: float = 0.002):
+        if not target_fps > 0:
+            raise ValueError("target_fps must be positive")
+        self.target_fps = float(target_fps)
+        self.period = 1.0 / self.target_fps  # frame budget in seconds
+        self.spin_seconds = max(0.0, float(spin_seconds))
+        self._origin = time.perf_counter()
+        self._lock = Lock()
+        self._last_slot = -1
+        self.frames = 0
+        self.overruns = 0  # frames whose render time exceeded the budget
+        self.last_frame_time = 0.0
+        self.max_frame_time = 0.0
+        self._total_frame_time = 0.0
+
+    def slot_index(self, t: Optional[float] = None) -> int:
+        """Index of the slot containing perf_counter() time t (default: now)."""
+        t = time.perf_counter() if t is None else t
+        return math.floor((t - self._origin) / self.period)
+
+    def slot_time(self, index: int) -> float:
+        """perf_counter() time at which slot index starts."""
+        return self._origin + index * self.period
+
+    def next_frame_time(self) -> float:
+        """perf_counter() time of the next slot boundary."""
+        return self.slot_time(self.slot_index() + 1)
+
+    def sleep_until(self, deadline: float, event: Optional[Event] = None) -> bool:
+        """
+        Wait until perf_counter() reaches deadline: sleep, then spin for the last spin_seconds.
+        Returns False early if event gets set while sleeping.
+        """
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return True
+            if remaining > self.spin_seconds:
+                timeout = remaining - self.spin_seconds
+                if event is not None:
+                    if event.wait(timeout):
+                        return False
+                else:
+                    time.sleep(timeout)
+            elif event is not None and event.is_set():
+                return False
+
+    def wait_next_frame(self, event: Optional[Event] = None) -> float:
+        """Wait for the next slot boundary (producer side). Returns its perf_counter() time."""
+        deadline = self.next_frame_time()
+        self.sleep_until(deadline, event)
+        return deadline
+
+    def begin_frame(self, event: Optional[Event] = None) -> bool:
+        """
+        Render side: wait until a slot that has no frame yet begins and claim it. Renders immediately
+        when the current slot is still free. Returns False if event got set while waiting.
+        """
+        with self._lock:
+            slot = max(self.slot_index(), self._last_slot + 1)
+        if not self.sleep_until(self.slot_time(slot), event):
+            return False
+        with self._lock:
+            self._last_slot = slot
+        return True
+
+    def end_frame(self, duration: float) -> None:
+        """Record the render time of a frame (seconds) against the budget."""
+        with self._lock:
+            self.frames += 1
+            self.last_frame_time = duration
+            self.max_frame_time = max(self.max_frame_time, duration)
+            self._total_frame_time += duration
+            if duration > self.period:
+                self.overruns += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Pacing counters: target_fps, budget_ms, frames, overruns, last/avg/max frame time in ms."""
+        with self._lock:
+            return {
+                'target_fps': self.target_fps,
+                'budget_ms': self.period * 1000,
+                'frames': self.frames,
+                'overruns': self.overruns,
+                'last_frame_ms': self.last_frame_time * 1000,
+                'avg_frame_ms': self._total_frame_time / self.frames * 1000 if self.frames else 0.0,
+                'max_frame_ms': self.max_frame_time * 1000,
+            }
+
+    def __repr__(self) -> str:
+        return f"FramePacer(target_fps={self.target_fps:g}, frames={self.frames}, overruns={self.overruns})"
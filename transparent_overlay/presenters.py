@@ -0,0 +1,263 @@
+"""
+Presentation backends for Overlay.
+
+A presenter owns the two BGRA frame buffers the compositor draws into and publishes the finished
+front buffer somewhere: a layered Win32 window (Win32Presenter) or nowhere at all (HeadlessPresenter,
+for tests, benchmarks and CI machines without a display).
+"""
+
+import sys
+import logging
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+WIN32_AVAILABLE = False
+if sys.platform == 'win32':
+    try:
+        from ctypes import Structure, POINTER, pointer, byref, sizeof, windll, c_uint, c_int, c_ushort, c_ubyte, c_void_p
+        from ctypes.wintypes import POINT, SIZE, BYTE, DWORD, RECT
+        from win32api import GetModuleHandle, GetSystemMetrics
+        import win32con
+        import win32gui
+
+        WIN32_AVAILABLE = True
+    except ImportError as e:
+        logger.debug("Win32 presenter unavailable: %s", e)
+
+Rect = Tuple[int, int, int, int]
+
+
+class Presenter:
+    """
+    Base class for presentation backends.
+
+    Lifecycle (all calls are made from the thread that renders):
+        open(x, y, width, height) -> (front_buf, back_buf)
+        present(front_buf, dirty_rects)  — once per rendered frame, after the buffer swap
+        close()
+    """
+
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        """Return (width, height) of the target screen, or None if there is no screen."""
+        return None
+
+    def open(self, x: int, y: int, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Allocate resources and return two (height, width, 4) uint8 BGRA buffers."""
+        raise NotImplementedError
+
+    def present(self, buf: np.ndarray, dirty_rects: Optional[Sequence[Rect]] = None) -> None:
+        """Publish buf (one of the buffers returned by open()). dirty_rects=None means the whole frame."""
+        raise NotImplementedError
+
+    def request_close(self) -> None:
+        """Hint from another thread that the overlay is stopping. Optional."""
+
+    def close(self) -> None:
+        """Release everything allocated by open(). Must be safe to call more than once."""
+
+
+class HeadlessPresenter(Presenter):
+    """
+    Off-screen presenter: buffers are plain NumPy arrays and present() only records the frame.
+
+    Args:
+        screen_size: Optional (width, height) used as the default overlay size.
+    """
+
+    def __init__(self, screen_size: Optional[Tuple[int, int]] = None):
+        self._screen_size = screen_size
+        self.frames_presented = 0
+        self.last_frame: Optional[np.ndarray] = None
+        self.last_dirty_rects: Optional[Sequence[Rect]] = None
+
+    def screen_size(self) -> Optional[Tuple[int, int]]:
+        return self._screen_size
+
+    def open(self, x: int, y: int, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        return (np.zeros((height, width, 4), dtype=np.uint8),
+                np.zeros((height, width, 4), dtype=np.uint8))
+
+    def present(self, buf: np.ndarray, dirty_rects: Optional[Sequence[Rect]] = None) -> None:
+        self.last_frame = buf
+        self.last_dirty_rects = dirty_rects
+        self.frames_presented += 1
+
+    def close(self) -> None:
+        self.last_frame = None
+
+
+if WIN32_AVAILABLE:
+    class BLENDFUNCTION(Structure):
+        _fields_ = [
+            ("BlendOp", BYTE),
+            ("BlendFlags", BYTE),
+            ("SourceConstantAlpha", BYTE),
+            ("AlphaFormat", BYTE)
+        ]
+
+
+    class UPDATELAYEREDWINDOWINFO(Structure):
+        _fields_ = [
+            ("cbSize", DWORD),
+            ("hdcDst", c_void_p),
+            ("pptDst", POINTER(POINT)),
+            ("psize", POINTER(SIZE)),
+            ("hdcSrc", c_void_p),
+            ("pptSrc", POINTER(POINT)),
+            ("crKey", DWORD),
+            ("pblend", POINTER(BLENDFUNCTION)),
+            ("dwFlags", DWORD),
+            ("prcDirty", POINTER(RECT)),
+        ]
+
+
+    class Win32Presenter(Presenter):
+        """Layered top-most click-through window updated with UpdateLayeredWindow."""
+
+        def __init__(self):
+            self.hInstance = GetModuleHandle()
+            self.className = 'TransparentGraphicsWindow'
+            self.hWindow = None
+            self.hdc_screen = None
+            self.hdc_mem = None
+            self.bitmap_front = None
+            self.bitmap_back = None
+            self.old_bmp = None
+            self.ppvBits_front = None
+            self.ppvBits_back = None
+            self._bitmaps = {}
+            self._x = self._y = self._w = self._h = 0
+            self._register_window_class()
+
+        def screen_size(self) -> Optional[Tuple[int, int]]:
+            return GetSystemMetrics(win32con.SM_CXSCREEN), GetSystemMetrics(win32con.SM_CYSCREEN)
+
+        def _register_window_class(self) -> None:
+            """Register window class for the transparent overlay."""
+            wndClass = win32gui.WNDCLASS()
+            wndClass.style = win32con.CS_HREDRAW | win32con.CS_VREDRAW
+            wndClass.lpfnWndProc = self._wnd_proc
+            wndClass.hInstance = self.hInstance
+            wndClass.hCursor = win32gui.LoadCursor(None, win32con.IDC_ARROW)
+            wndClass.hbrBackground = win32gui.GetStockObject(win32con.BLACK_BRUSH)
+            wndClass.lpszClassName = self.className
+            try:
+                win32gui.RegisterClass(wndClass)
+            except win32gui.error:
+                pass
+
+        def _wnd_proc(self, hWnd: int, msg: int, wParam: int, lParam: int) -> int:
+            """Window message procedure."""
+            if msg == win32con.WM_DESTROY:
+                win32gui.PostQuitMessage(0)
+                return 0
+            return win32gui.DefWindowProc(hWnd, msg, wParam, lParam)
+
+        def _create_dib(self, bmi, width: int, height: int):
+            """Create a DIB section and map it as a (height, width, 4) uint8 array."""
+            ppv = c_void_p()
+            bitmap = windll.gdi32.CreateDIBSection(
+                self.hdc_mem, byref(bmi), win32con.DIB_RGB_COLORS, byref(ppv), None, 0
+            )
+            if not bitmap or not ppv.value:
+                raise RuntimeError("Failed to create DIB section")
+            buf = np.ctypeslib.as_array((c_ubyte * (width * height * 4)).from_address(ppv.value))
+            return bitmap, ppv, buf.reshape((height, width, 4))
+
+        def open(self, x: int, y: int, width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+            self._x, self._y, self._w, self._h = x, y, width, height
+            self.hWindow = win32gui.CreateWindowEx(
+                win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT |
+                win32con.WS_EX_TOPMOST | win32con.WS_EX_NOACTIVATE,
+                self.className,
+                "",
+                win32con.WS_POPUP,
+                x, y, width, height,
+                None, None, self.hInstance, None
+            )
+            win32gui.ShowWindow(self.hWindow, win32con.SW_SHOW)
+
+            self.hdc_screen = win32gui.GetDC(0)
+            self.hdc_mem = win32gui.CreateCompatibleDC(self.hdc_screen)
+            if not self.hdc_mem:
+                raise RuntimeError("Failed to create memory DC")
+
+            class BITMAPINFOHEADER(Structure):
+                _fields_ = [
+                    ("biSize", c_uint), ("biWidth", c_int), ("biHeight", c_int),
+                    ("biPlanes", c_ushort), ("biBitCount", c_ushort),
+                    ("biCompression", c_uint), ("biSizeImage", c_uint),
+                    ("biXPelsPerMeter", c_int), ("biYPelsPerMeter", c_int),
+                    ("biClrUsed", c_uint), ("biClrImportant", c_uint)
+                ]
+
+            class BITMAPINFO(Structure):
+                _fields_ = [("bmiHeader", BITMAPINFOHEADER), ("bmiColors", c_uint * 3)]
+
+            bmi = BITMAPINFO()
+            bmi.bmiHeader.biSize = sizeof(BITMAPINFOHEADER)
+            bmi.bmiHeader.biWidth = width
+            bmi.bmiHeader.biHeight = -height
+            bmi.bmiHeader.biPlanes = 1
+            bmi.bmiHeader.biBitCount = 32
+            bmi.bmiHeader.biCompression = win32con.BI_RGB
+
+            self.bitmap_front, self.ppvBits_front, front_buf = self._create_dib(bmi, width, height)
+            self.bitmap_back, self.ppvBits_back, back_buf = self._create_dib(bmi, width, height)
+            # Buffers are swapped by the renderer; map each array back to its bitmap
+            self._bitmaps = {id(front_buf): self.bitmap_front, id(back_buf): self.bitmap_back}
+
+            self.old_bmp = win32gui.SelectObject(self.hdc_mem, self.bitmap_front)
+            return front_buf, back_buf
+
+        def present(self, buf: np.ndarray, dirty_rects: Optional[Sequence[Rect]] = None) -> None:
+            win32gui.SelectObject(self.hdc_mem, self._bitmaps[id(buf)])
+            if dirty_rects is not None and len(dirty_rects) == 0:
+                return  # Nothing changed since the previous frame
+            pt_src, pt_dst, size = POINT(0, 0), POINT(self._x, self._y), SIZE(self._w, self._h)
+            blend = BLENDFUNCTION(0x00, 0, 255, 0x01)
+            if dirty_rects:
+                # Partial update: the window keeps its bits outside the dirty bounding box
+                dirty = RECT(min(r[0] for r in dirty_rects), min(r[1] for r in dirty_rects),
+                             max(r[2] for r in dirty_rects), max(r[3] for r in dirty_rects))
+                info = UPDATELAYEREDWINDOWINFO(
+                    sizeof(UPDATELAYEREDWINDOWINFO), self.hdc_screen, pointer(pt_dst), pointer(size),
+                    self.hdc_mem, pointer(pt_src), 0, pointer(blend), 0x02, pointer(dirty)
+                )
+                if windll.user32.UpdateLayeredWindowIndirect(self.hWindow, byref(info)):
+                    windll.gdi32.GdiFlush()
+                    return
+            windll.user32.UpdateLayeredWindow(
+                self.hWindow, self.hdc_screen, byref(pt_dst), byref(size),
+                self.hdc_mem, byref(pt_src), 0, byref(blend), 0x02
+            )
+            windll.gdi32.GdiFlush()
+
+        def request_close(self) -> None:
+            if self.hWindow:
+                try:
+                    win32gui.PostMessage(self.hWindow, win32con.WM_DESTROY, 0, 0)
+                except Exception:
+                    pass
+
+        def close(self) -> None:
+            if self.hdc_mem is None:
+                return
+            try:
+                win32gui.SelectObject(self.hdc_mem, self.old_bmp)
+                win32gui.DeleteDC(self.hdc_mem)
+                windll.gdi32.DeleteObject(self.bitmap_front)
+                windll.gdi32.DeleteObject(self.bitmap_back)
+                win32gui.ReleaseDC(0, self.hdc_screen)
+                win32gui.DestroyWindow(self.hWindow)
+                logger.info("Overlay window destroyed and resources released")
+            except Exception:
+                pass
+            finally:
+                self.hdc_mem = None
+                self.hWindow = None
+                self._bitmaps = {}
@@ -0,0 +1,227 @@
+"""
+Retained-mode scene for Overlay.
+
+Instances added with add_sprite_instance(..., retained=True) live here across frames instead of being
+re-issued after every frame_clear(). The logic thread only touches the handles that change; the renderer
+reads a cached snapshot that is rebuilt only when the scene version moves.
+
+Named layers (Overlay.create_layer) group retained instances with a z-order; a static layer is composited
+once into a cached surface that the renderer reuses until the layer changes.
+"""
+
+import logging
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+
+class InstanceHandle:
+    """
+    Handle of a retained sprite instance, returned by Overlay.add_sprite_instance(..., retained=True).
+
+    The instance is drawn every frame until remove() is called. Changes take effect on the next
+    rendered frame (signal_render() / render_frame_sync()).
+
+    Example:
+        cursor = overlay.add_sprite_instance(key, 10, 10, retained=True)
+        cursor.move(20, 15)
+        cursor.hide()
+        cursor.remove()
+    """
+
+    __slots__ = ('_scene', '_id')
+
+    def __init__(self, scene: "RetainedScene", ident: int):
+        self._scene = scene
+        self._id = ident
+
+    @property
+    def alive(self) -> bool:
+        """False once the instance was removed."""
+        return self._scene.contains(self._id)
+
+    @property
+    def key(self) -> Any:
+        return self._scene.get(self._id)[0]
+
+    @property
+    def position(self) -> Tuple[int, int]:
+        item = self._scene.get(self._id)
+        return item[1], item[2]
+
+    @property
+    def visible(self) -> bool:
+        return self._scene.get(self._id)[3]
+
+    def move(self, x: int, y: int) -> None:
+        """Move the instance to (x, y)."""
+        self._scene.update(self._id, x=int(x), y=int(y))
+
+    def set_key(self, sprite_key: Any) -> None:
+        """Draw a different sprite (or draw op) at the same position."""
+        self._scene.update(self._id, key=sprite_key)
+
+    def hide(self) -> None:
+        self._scene.update(self._id, visible=False)
+
+    def show(self) -> None:
+        self._scene.update(self._id, visible=True)
+
+    def remove(self) -> bool:
+        """Remove the instance from the scene. Returns False if it was already removed."""
+        return self._scene.remove(self._id)
+
+    def __repr__(self) -> str:
+        item = self._scene.peek(self._id)
+        if item is None:
+            return f"InstanceHandle(id={self._id}, removed)"
+        key, x, y, visible = item
+        return f"InstanceHandle(id={self._id}, key={key!r}, x={x}, y={y}, visible={visible})"
+
+
+class RetainedScene:
+    """Thread-safe store of retained instances, kept in insertion order (later instances draw on top)."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self._items: Dict[int, list] = {}  # id -> [key, x, y, visible]
+        self._next_id = 0
+        self.version = 0  # bumped on every change
+        self._snapshot: List[Tuple[Any, int, int]] = []
+        self._snapshot_version = 0
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._items)
+
+    def add(self, sprite_key: Any, x: int, y: int) -> InstanceHandle:
+        with self.lock:
+            ident = self._next_id
+            self._next_id += 1
+            self._items[ident] = [sprite_key, int(x), int(y), True]
+            self.version += 1
+        return InstanceHandle(self, ident)
+
+    def contains(self, ident: int) -> bool:
+        with self.lock:
+            return ident in self._items
+
+    def peek(self, ident: int) -> Optional[tuple]:
+        with self.lock:
+            item = self._items.get(ident)
+            return tuple(item) if item is not None else None
+
+    def get(self, ident: int) -> tuple:
+        item = self.peek(ident)
+        if item is None:
+            raise ValueError("instance handle was removed")
+        return item
+
+    def update(self, ident: int, key: Any = None, x: Optional[int] = None, y: Optional[int] = None,
+               visible: Optional[bool] = None) -> None:
+        with self.lock:
+            item = self._items.get(ident)
+            if item is None:
+                raise ValueError("instance handle was removed")
+            new = [item[0] if key is None else key,
+                   item[1] if x is None else x,
+                   item[2] if y is None else y,
+                   item[3] if visible is None else visible]
+            if new != item:
+                self._items[ident] = new
+                self.version += 1
+
+    def remove(self, ident: int) -> bool:
+        with self.lock:
+            if self._items.pop(ident, None) is None:
+                logger.debug("RetainedScene.remove: handle id=%d already removed", ident)
+                return False
+            self.version += 1
+            return True
+
+    def clear(self) -> None:
+        with self.lock:
+            if self._items:
+                self._items.clear()
+                self.version += 1
+
+    def snapshot(self) -> List[Tuple[Any, int, int]]:
+        """Visible instances as (sprite_key, x, y) in draw order; rebuilt only after a change."""
+        with self.lock:
+            if self._snapshot_version != self.version:
+                self._snapshot = [(key, x, y) for key, x, y, visible in self._items.values() if visible]
+                self._snapshot_version = self.version
+            return self._snapshot
+
+
+class Layer:
+    """
+    Named group of retained instances, created with Overlay.create_layer().
+
+    Attributes:
+        name: Layer name
+        z: Draw order. Layers with z < 0 are drawn below the overlay's own instances, z >= 0 above;
+            equal z keeps creation order.
+        static: Composite the layer once into a cached surface and reuse it until something in the
+            layer changes. Best for content that changes rarely (panels, labels).
+        visible: Hidden layers are skipped entirely.
+    """
+
+    def __init__(self, name: str, z: int = 0, static: bool = False, order: int = 0):
+        self.name = name
+        self._z = int(z)
+        self._static = bool(static)
+        self._visible = True
+        self.order = order
+        self._attr_version = 0
+        self.scene = RetainedScene()
+
+    def _set(self, attr: str, value) -> None:
+        if getattr(self, attr) != value:
+            setattr(self, attr, value)
+            self._attr_version += 1
+
+    @property
+    def z(self) -> int:
+        return self._z
+
+    @z.setter
+    def z(self, value: int) -> None:
+        self._set('_z', int(value))
+
+    @property
+    def static(self) -> bool:
+        return self._static
+
+    @static.setter
+    def static(self, value: bool) -> None:
+        self._set('_static', bool(value))
+
+    @property
+    def visible(self) -> bool:
+        return self._visible
+
+    @visible.setter
+    def visible(self, value: bool) -> None:
+        self._set('_visible', bool(value))
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """Changes whenever the layer's attributes or instances change."""
+        return self._attr_version, self.scene.version
+
+    def add_sprite_instance(self, sprite_key: Any, x: int, y: int) -> InstanceHandle:
+        """Add a retained instance to this layer (drawn above earlier instances of the layer)."""
+        return self.scene.add(sprite_key, x, y)
+
+    def clear(self) -> None:
+        """Remove all instances of the layer."""
+        self.scene.clear()
+
+    def __len__(self) -> int:
+        return len(self.scene)
+
+    def __repr__(self) -> str:
+        return f"Layer(name={self.name!r}, z={self._z}, static={self._static}, instances={len(self)})"
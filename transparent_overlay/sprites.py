@@ -0,0 +1,557 @@
+"""
+Sprite storage for Overlay.
+
+Every cached sprite lives in a slot of a SpriteCache and is identified by an interned SpriteHandle:
+an int made of the slot index and the slot's generation. create_* calls hash their descriptive key
+(e.g. ('text', ...) with a dozen fields) once to find the handle; everything after that — instance
+queues, frame packing, sprite lookups — works on the handle and reads the slot's entries by index.
+A removed sprite frees its slot and bumps the generation, so stale handles stop resolving instead of
+aliasing the next sprite stored in that slot.
+
+With max_bytes set, the cache keeps the memory of its sprites under that budget by evicting in
+segmented-LRU order: new sprites enter a probation segment and move to a protected segment when they
+are requested again (a create_* cache hit), and victims are taken from probation first. A burst of one-off
+sprites (a new screenshot every frame) therefore evicts other one-off sprites, not the HUD drawn every frame.
+
+TTL expiry uses a min-heap of (last-used time, slot, generation) with lazy invalidation: using a
+sprite only overwrites its timestamp, and an outdated heap entry is re-queued with the current time
+when it reaches the top. Expiring therefore visits only sprites that may have expired, and can be
+cut into bounded slices. Entries of removed and evicted sprites stay in the heap until they surface; once
+they outnumber the live sprites, put() rebuilds the heap from the live ones, so its size follows the cache
+size rather than the churn. Timestamps come from the caller (Overlay passes time.monotonic()).
+
+With an atlas (atlas.SpriteAtlas), small sprites are copied into shared BGRA pages and the slot keeps a view
+of their rectangle. Space of removed sprites is reused (and mostly empty pages repacked) only in reclaim().
+The budget then counts the atlas pages in place of the views into them (memory_bytes()), free page space
+included. Evicting an atlas sprite frees page memory only once its page is repacked or emptied, so eviction
+removes sprites until their bytes cover the excess and leaves the pages to reclaim().
+
+Every slot also records its sprite type ('circle', 'text', 'numpy', ...), and the cache keeps per-type entry and
+byte totals plus counters of lookups, creations, expirations, removals and evictions (stats()), so cache churn can
+be told apart from rendering cost.
+
+Not thread-safe on its own: Overlay guards it with sprite_lock.
+"""
+
+import heapq
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .atlas import SpriteAtlas
+
+SLOT_BITS = 24
+GENERATION_BITS = 24
+_SLOT_MASK = (1 << SLOT_BITS) - 1
+_GENERATION_MASK = (1 << GENERATION_BITS) - 1
+_HANDLE_TAG = 1 << (SLOT_BITS + GENERATION_BITS)  # keeps handles apart from small integer keys
+_EXPIRY_SLACK = 64  # stale expiry heap entries tolerated beyond one per live sprite before a rebuild
+
+
+class SpriteHandle(int):
+    """
+    Integer handle of a cached sprite, returned by the create_* methods.
+
+    Accepted everywhere a sprite key is. Hashing and comparing it costs as much as for any int,
+    unlike the tuple keys it stands for. A handle stays valid until its sprite is removed (sprite_remove,
+    TTL cleanup, sprite_clear_cache); creating the sprite again returns a new handle.
+    """
+
+    __slots__ = ()
+
+    @property
+    def slot(self) -> int:
+        return self & _SLOT_MASK
+
+    @property
+    def generation(self) -> int:
+        return (self >> SLOT_BITS) & _GENERATION_MASK
+
+    def __repr__(self) -> str:
+        return f"SpriteHandle(slot={self.slot}, generation={self.generation})"
+
+
+def sprite_type(key: Any) -> str:
+    """Type of a sprite key: the leading string of a tuple key ('circle', 'text', ...), otherwise 'other'."""
+    if isinstance(key, tuple) and key and isinstance(key[0], str):
+        return key[0]
+    return 'other'
+
+
+class TypeStats:
+    """Counters of one sprite type (see SpriteCache.stats)."""
+
+    __slots__ = ('entries', 'bytes', 'hits', 'misses', 'creations', 'rasterize_seconds')
+
+    def __init__(self):
+        self.entries = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.creations = 0
+        self.rasterize_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SpriteCache(MutableMapping):
+    """
+    Sprites (premultiplied BGRA arrays) by key or handle, with per-slot last-used time, version and spans.
+
+    As a mapping it behaves like the former key -> array dict: iteration yields the original keys,
+    while lookups accept keys and handles alike. The version of a sprite changes on every store, so
+    renderers can tell a re-created sprite from the one they already copied.
+
+    Attributes:
+        max_bytes: Byte budget for memory_bytes() (None: unbounded). With an atlas it also covers the atlas
+            pages, of which the atlas always keeps at least one, so choose a budget of several pages
+        protected_ratio: Share of max_bytes the protected (used more than once) segment may keep
+        on_evict: Called as on_evict(key, nbytes) for each sprite evicted by the budget. The cache only
+            queues the calls; its owner runs them with take_evicted() outside its lock.
+        bytes_used: Total nbytes of the stored sprites (atlas sprites: of their rectangles)
+        hits, misses: Lookups through touch() that found / did not find the sprite
+        evictions, evicted_bytes: Sprites (and their bytes) removed to stay within max_bytes
+        creations: Sprites stored with put() (new or replacing one)
+        expirations, removals: Sprites removed by expire() / by remove() and clear()
+        peak_bytes: Highest bytes_used after a store
+        atlas: SpriteAtlas for small sprites, or None (every sprite is kept as the array it was stored as)
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, atlas: Optional[SpriteAtlas] = None):
+        self._handles: Dict[Any, SpriteHandle] = {}  # key -> handle of its live slot
+        self._keys: List[Any] = []  # per slot: key (None when free)
+        self._sprites: List[Any] = []  # per slot: array (None when free)
+        self._spans: List[Any] = []  # per slot: opacity spans or None (computed by the renderer)
+        self._versions: List[int] = []
+        self._last_used: List[float] = []
+        self._generations: List[int] = []
+        self._free: List[int] = []
+        self._version_counter = 0
+
+        self.max_bytes = max_bytes
+        self.protected_ratio = 0.8
+        self.on_evict: Optional[Callable[[Any, int], None]] = None
+        self.bytes_used = 0
+        self._nbytes: List[int] = []
+        self._probation: "OrderedDict[int, None]" = OrderedDict()  # slots in LRU -> MRU order
+        self._protected: "OrderedDict[int, None]" = OrderedDict()
+        self._protected_bytes = 0
+        self._evicted: List[Tuple[Any, int]] = []
+        self._expiry: List[Tuple[float, int, int]] = []  # min-heap of (last-used time when queued, slot, generation)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.creations = 0
+        self.expirations = 0
+        self.removals = 0
+        self.peak_bytes = 0
+        self._kinds: List[str] = []  # per slot: sprite type
+        self.atlas = atlas
+        self._atlas_ids: List[int] = []  # per slot: atlas allocation id, or -1
+        self._atlas_bytes = 0  # part of bytes_used held in atlas pages
+        self._types: Dict[str, TypeStats] = {}
+
+    # ---- slots ----
+    def slot_of(self, key: Any) -> int:
+        """Slot of a live sprite given its key or handle, or -1."""
+        if type(key) is SpriteHandle:
+            slot = key & _SLOT_MASK
+            if (slot < len(self._sprites) and self._sprites[slot] is not None
+                    and self._generations[slot] == (key >> SLOT_BITS) & _GENERATION_MASK):
+                return slot
+            return -1
+        handle = self._handles.get(key)
+        return -1 if handle is None else handle & _SLOT_MASK
+
+    def handle(self, key: Any) -> Optional[SpriteHandle]:
+        """Handle of a live sprite given its key or handle, or None."""
+        if type(key) is SpriteHandle:
+            return key if self.slot_of(key) >= 0 else None
+        return self._handles.get(key)
+
+    def _handle(self, slot: int) -> SpriteHandle:
+        return SpriteHandle(_HANDLE_TAG | (self._generations[slot] << SLOT_BITS) | slot)
+
+    def key_of(self, key: Any) -> Any:
+        """Original key of a handle (keys are returned unchanged; stale handles too)."""
+        slot = self.slot_of(key) if type(key) is SpriteHandle else -1
+        return key if slot < 0 else self._keys[slot]
+
+    def next_version(self) -> int:
+        self._version_counter += 1
+        return self._version_counter
+
+    def _type(self, kind: str) -> TypeStats:
+        stats = self._types.get(kind)
+        if stats is None:
+            stats = self._types[kind] = TypeStats()
+        return stats
+
+    def put(self, key: Any, sprite, spans=None, now: float = 0.0, kind: Optional[str] = None,
+            rasterize_seconds: float = 0.0) -> SpriteHandle:
+        """
+        Store a sprite under key (a new version if it exists) and return its handle.
+
+        kind is the sprite type counted in stats() (default: sprite_type(key)); rasterize_seconds is the
+        time the caller spent producing the sprite.
+        """
+        if type(key) is SpriteHandle:
+            slot = self.slot_of(key)
+            if slot < 0:
+                raise KeyError(key)
+            handle = key
+        else:
+            handle = self._handles.get(key)
+            if handle is not None:
+                slot = handle & _SLOT_MASK
+            elif self._free:
+                slot = self._free.pop()
+                self._keys[slot] = key
+            else:
+                slot = len(self._sprites)
+                self._keys.append(key)
+                self._sprites.append(None)
+                self._spans.append(None)
+                self._versions.append(0)
+                self._last_used.append(0.0)
+                self._generations.append(0)
+                self._nbytes.append(0)
+                self._kinds.append('')
+                self._atlas_ids.append(-1)
+            if handle is None:
+                self._handles[key] = handle = self._handle(slot)
+        atlas = self.atlas
+        if self._atlas_ids[slot] >= 0:
+            atlas.free(self._atlas_ids[slot])
+            self._atlas_ids[slot] = -1
+            self._atlas_bytes -= self._nbytes[slot]
+        nbytes = int(getattr(sprite, 'nbytes', 0))
+        if atlas is not None and atlas.fits(sprite):
+            self._atlas_ids[slot], sprite = atlas.store(sprite, slot)
+            self._atlas_bytes += nbytes
+        if self._sprites[slot] is None:
+            self._probation[slot] = None
+            heapq.heappush(self._expiry, (now, slot, self._generations[slot]))
+            if len(self._expiry) > 2 * len(self._handles) + _EXPIRY_SLACK:
+                self._rebuild_expiry()
+        else:
+            self._charge(slot, -self._nbytes[slot])
+            self._types[self._kinds[slot]].entries -= 1
+            self._nbytes[slot] = 0
+            self._use(slot)
+        if kind is None:
+            kind = sprite_type(self._keys[slot])
+        stats = self._type(kind)
+        stats.entries += 1
+        stats.creations += 1
+        stats.rasterize_seconds += rasterize_seconds
+        self.creations += 1
+        self._kinds[slot] = kind
+        self._nbytes[slot] = nbytes
+        self._charge(slot, nbytes)
+        self._sprites[slot] = sprite
+        self._spans[slot] = spans
+        self._versions[slot] = self.next_version()
+        self._last_used[slot] = now
+        self.evict_to_budget(keep=slot)
+        if self.bytes_used > self.peak_bytes:
+            self.peak_bytes = self.bytes_used
+        return handle
+
+    def touch(self, key: Any, now: float) -> Optional[SpriteHandle]:
+        """Refresh the last-used time of a live sprite and return its handle (None if missing)."""
+        handle = self.handle(key)
+        if handle is None:
+            self.misses += 1
+            self._type(sprite_type(key)).misses += 1
+            return None
+        self.hits += 1
+        slot = handle & _SLOT_MASK
+        self._types[self._kinds[slot]].hits += 1
+        self._last_used[slot] = now
+        self._use(slot)
+        return handle
+
+    def resolve(self, key: Any, now: float) -> Optional[Tuple[Any, int, Any]]:
+        """(sprite, version, spans) of a live sprite, refreshing its last-used time; None if missing."""
+        slot = self.slot_of(key)
+        if slot < 0:
+            return None
+        self._last_used[slot] = now
+        self._refresh(slot)
+        return self._sprites[slot], self._versions[slot], self._spans[slot]
+
+    def resolve_many(self, keys: List[Any], now: float) -> List[Optional[Tuple[Any, int, Any]]]:
+        """resolve() for a list of keys and handles (one call per frame instead of one per key)."""
+        sprites, versions, spans, generations, last_used = (self._sprites, self._versions, self._spans,
+                                                            self._generations, self._last_used)
+        handles = self._handles
+        protected, probation = self._protected, self._probation
+        count = len(sprites)
+        out: List[Optional[Tuple[Any, int, Any]]] = []
+        for key in keys:
+            if type(key) is SpriteHandle:
+                slot = key & _SLOT_MASK
+                if (slot >= count or sprites[slot] is None
+                        or generations[slot] != (key >> SLOT_BITS) & _GENERATION_MASK):
+                    out.append(None)
+                    continue
+            else:
+                handle = handles.get(key)
+                if handle is None:
+                    out.append(None)
+                    continue
+                slot = handle & _SLOT_MASK
+            last_used[slot] = now
+            (protected if slot in protected else probation).move_to_end(slot)  # inlined _refresh()
+            out.append((sprites[slot], versions[slot], spans[slot]))
+        return out
+
+    def version(self, key: Any) -> Optional[int]:
+        slot = self.slot_of(key)
+        return None if slot < 0 else self._versions[slot]
+
+    def last_used(self, key: Any) -> Optional[float]:
+        slot = self.slot_of(key)
+        return None if slot < 0 else self._last_used[slot]
+
+    def remove(self, key: Any) -> bool:
+        """Remove a sprite by key or handle; its handles stop resolving. Returns False if missing."""
+        slot = self.slot_of(key)
+        if slot < 0:
+            return False
+        self._release(slot)
+        self.removals += 1
+        return True
+
+    # ---- segmented LRU ----
+    def _charge(self, slot: int, nbytes: int) -> None:
+        self.bytes_used += nbytes
+        self._types[self._kinds[slot]].bytes += nbytes
+        if slot in self._protected:
+            self._protected_bytes += nbytes
+
+    def _refresh(self, slot: int) -> None:
+        """Mark a slot most recently used within its segment (the renderer drawing it)."""
+        if slot in self._protected:
+            self._protected.move_to_end(slot)
+        else:
+            self._probation.move_to_end(slot)
+
+    def _use(self, slot: int) -> None:
+        """Mark a slot most recently used and promote it to protected (the sprite was requested again)."""
+        protected = self._protected
+        if slot in protected:
+            protected.move_to_end(slot)
+            return
+        del self._probation[slot]
+        protected[slot] = None
+        self._protected_bytes += self._nbytes[slot]
+        if self.max_bytes is None:
+            return
+        limit = self.max_bytes * self.protected_ratio
+        while self._protected_bytes > limit and len(protected) > 1:
+            demoted, _ = protected.popitem(last=False)  # back to probation as its most recent entry
+            self._protected_bytes -= self._nbytes[demoted]
+            self._probation[demoted] = None
+
+    def memory_bytes(self) -> int:
+        """Memory held for the sprites (what max_bytes limits): bytes_used, with atlas pages instead of their views."""
+        pages = 0 if self.atlas is None else self.atlas.page_bytes
+        return self.bytes_used - self._atlas_bytes + pages
+
+    def evict_to_budget(self, keep: int = -1) -> int:
+        """
+        Evict least recently used sprites (probation first) until the bytes of the evicted sprites cover the
+        excess of memory_bytes() over max_bytes. Returns the count.
+        """
+        if self.max_bytes is None:
+            return 0
+        evicted = 0
+        excess = self.memory_bytes() - self.max_bytes
+        while excess > 0:
+            victim = next((slot for slot in self._probation if slot != keep), None)
+            if victim is None:
+                victim = next((slot for slot in self._protected if slot != keep), None)
+            if victim is None:
+                break  # only the sprite being stored is left; it is kept even if larger than the budget
+            nbytes = self._nbytes[victim]
+            if self.on_evict is not None:
+                self._evicted.append((self._keys[victim], nbytes))
+            self._release(victim)
+            excess -= nbytes
+            self.evictions += 1
+            self.evicted_bytes += nbytes
+            evicted += 1
+        return evicted
+
+    def take_evicted(self) -> List[Tuple[Any, int]]:
+        """Return and forget the (key, nbytes) of sprites evicted since the last call (for on_evict)."""
+        evicted, self._evicted = self._evicted, []
+        return evicted
+
+    def _release(self, slot: int) -> None:
+        if slot in self._protected:
+            del self._protected[slot]
+            self._protected_bytes -= self._nbytes[slot]
+        else:
+            del self._probation[slot]
+        stats = self._types[self._kinds[slot]]
+        stats.entries -= 1
+        stats.bytes -= self._nbytes[slot]
+        self.bytes_used -= self._nbytes[slot]
+        if self._atlas_ids[slot] >= 0:
+            self.atlas.free(self._atlas_ids[slot])
+            self._atlas_ids[slot] = -1
+            self._atlas_bytes -= self._nbytes[slot]
+        self._nbytes[slot] = 0
+        del self._handles[self._keys[slot]]
+        self._keys[slot] = None
+        self._sprites[slot] = None
+        self._spans[slot] = None
+        self._generations[slot] = (self._generations[slot] + 1) & _GENERATION_MASK
+        self._free.append(slot)
+
+    def _rebuild_expiry(self) -> None:
+        """Replace the expiry heap with one entry per live sprite (drops entries of removed and evicted ones)."""
+        last_used, generations = self._last_used, self._generations
+        slots = [handle & _SLOT_MASK for handle in self._handles.values()]
+        self._expiry = [(last_used[slot], slot, generations[slot]) for slot in slots]
+        heapq.heapify(self._expiry)
+
+    def expire(self, cutoff: float, limit: Optional[int] = None) -> Tuple[int, bool]:
+        """
+        Remove sprites last used before cutoff, oldest first.
+
+        Args:
+            cutoff: Timestamp (same clock as the one passed to put/touch/resolve)
+            limit: Process at most this many heap entries (None: until done)
+
+        Returns:
+            (removed, done) — done is False if the limit stopped the pass before it reached cutoff
+        """
+        heap = self._expiry
+        generations, sprites, last_used = self._generations, self._sprites, self._last_used
+        removed = steps = 0
+        while heap and heap[0][0] < cutoff:
+            if limit is not None and steps >= limit:
+                self.expirations += removed
+                return removed, False
+            steps += 1
+            queued, slot, generation = heap[0]
+            if generations[slot] != generation or sprites[slot] is None:
+                heapq.heappop(heap)  # sprite already removed or evicted
+            elif last_used[slot] > queued:
+                heapq.heapreplace(heap, (last_used[slot], slot, generation))  # used since: requeue
+            else:
+                heapq.heappop(heap)
+                self._release(slot)
+                removed += 1
+        self.expirations += removed
+        return removed, True
+
+    # ---- mapping protocol (keys and handles in, keys out) ----
+    def __getitem__(self, key: Any):
+        slot = self.slot_of(key)
+        if slot < 0:
+            raise KeyError(key)
+        return self._sprites[slot]
+
+    def __setitem__(self, key: Any, sprite) -> None:
+        self.put(key, sprite)
+
+    def __delitem__(self, key: Any) -> None:
+        if not self.remove(key):
+            raise KeyError(key)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.slot_of(key) >= 0
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._handles))
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def clear(self) -> None:
+        self.removals += len(self._handles)
+        for handle in list(self._handles.values()):
+            self._release(handle & _SLOT_MASK)
+        self._expiry = []
+        if self.atlas is not None:
+            self.atlas.clear()
+
+    def set_atlas(self, atlas: Optional[SpriteAtlas]) -> None:
+        """
+        Switch the atlas (None: plain arrays) and move the stored sprites accordingly: small ones into the new
+        atlas, ones from the previous atlas that do not fit into arrays of their own. Versions are kept, and
+        arrays handed out before stay valid for readers that still hold them.
+        """
+        old, self.atlas = self.atlas, atlas
+        for slot, pixels in enumerate(self._sprites):
+            if pixels is None:
+                continue
+            in_atlas = self._atlas_ids[slot] >= 0
+            if atlas is not None and atlas.fits(pixels):
+                self._atlas_ids[slot], self._sprites[slot] = atlas.store(pixels, slot)
+                self._atlas_bytes += 0 if in_atlas else self._nbytes[slot]
+            elif in_atlas:
+                self._atlas_ids[slot] = -1
+                self._sprites[slot] = pixels.copy()
+                self._atlas_bytes -= self._nbytes[slot]
+        if old is not None:
+            old.clear()
+
+    def reclaim(self) -> None:
+        """
+        Let the atlas reuse the space of sprites removed since the last call, repacking mostly empty pages.
+
+        Call it when no array returned by a lookup before the removals is still being read (Overlay: when the
+        renderer starts a frame). Moved sprites keep their pixels and version; only their view changes.
+        """
+        if self.atlas is None:
+            return
+        for slot, alloc, view in self.atlas.reclaim():
+            self._atlas_ids[slot] = alloc
+            self._sprites[slot] = view
+
+    # ---- statistics ----
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the cache counters.
+
+        Returns:
+            dict with entries, bytes, memory_bytes, peak_bytes, max_bytes, hits, misses, creations, expirations,
+            removals, evictions, evicted_bytes, rasterize_seconds, by_type: {type: TypeStats.as_dict()} and atlas
+        """
+        return {
+            'entries': len(self._handles),
+            'bytes': self.bytes_used,
+            'memory_bytes': self.memory_bytes(),
+            'peak_bytes': self.peak_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'creations': self.creations,
+            'expirations': self.expirations,
+            'removals': self.removals,
+            'evictions': self.evictions,
+            'evicted_bytes': self.evicted_bytes,
+            'rasterize_seconds': sum(stats.rasterize_seconds for stats in self._types.values()),
+            'by_type': {kind: stats.as_dict() for kind, stats in self._types.items()},
+            'atlas': None if self.atlas is None else self.atlas.stats(),
+        }
+
+    def reset_stats(self) -> None:
+        """Zero the counters (entries and bytes stay; peak_bytes restarts from bytes_used)."""
+        self.hits = self.misses = self.creations = self.expirations = self.removals = 0
+        self.evictions = self.evicted_bytes = 0
+        self.peak_bytes = self.bytes_used
+        for stats in self._types.values():
+            stats.hits = stats.misses = stats.creations = 0
+            stats.rasterize_seconds = 0.0
+
+    def __repr__(self) -> str:
+        return f"SpriteCache(sprites={len(self)}, bytes_used={self.bytes_used}, max_bytes={self.max_bytes})"
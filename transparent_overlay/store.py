@@ -0,0 +1,230 @@
+"""
+Persistent on-disk store of rasterized sprites.
+
+A SpriteStore keeps premultiplied BGRA sprites and their opacity spans in a directory, so that a later process can
+skip PIL rasterization and span analysis for sprites it has drawn before. Sprites are found by a digest of their
+creation spec (the create_* cache key, plus the font file's identity for text) and live in one append-only data
+file, memory-mapped copy-on-write when the store opens. A warm load is therefore a set of views into the mapping,
+without a copy or a file read; the file itself is never written through the mapping.
+
+The data file is described by an index of JSON lines: a header with the format version, then one line per sprite
+with its digest, offset, size, span count and the raster version it was produced with (Overlay's covers the
+Pillow version and the span format).
+Lines with another raster version, torn trailing lines and entries past the end of the data file are ignored;
+when ignored data outweighs live data or keeps the data file over max_bytes, the store is compacted on open.
+A store with an unknown format, or whose live sprites exceed max_bytes, is reset.
+
+One process should write a store at a time; the store has its own lock for the threads of that process.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+DATA_FILE = 'sprites.bin'
+INDEX_FILE = 'index.jsonl'
+_ALIGN = 64  # sprite offsets in the data file are multiples of this
+
+
+def _layout(h: int, w: int, n: int) -> Tuple[int, int, int]:
+    """Offsets of an entry's rowoffs and runs from its start, and its size: pixels, int64 rowoffs, int32 runs."""
+    rows_at = -(-h * w * 4 // 8) * 8
+    runs_at = rows_at + (h + 1) * 8
+    return rows_at, runs_at, runs_at + n * 12
+
+
+def spec_digest(spec: Any) -> str:
+    """Stable digest of a sprite spec made of str/int/float/bool/None/tuple values (repr-based, unlike hash())."""
+    return hashlib.blake2b(repr(spec).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SpriteStore:
+    """
+    Directory of rasterized sprites shared across runs.
+
+    Args:
+        directory: Store directory (created if missing)
+        raster_version: Entries written with another raster version are treated as missing
+        max_bytes: New sprites are not written once the data file reaches this size
+
+    Attributes:
+        loads, writes: Sprites served from / written to the store by this process
+    """
+
+    def __init__(self, directory: str, raster_version: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.raster_version = str(raster_version)
+        self.max_bytes = int(max_bytes)
+        self.loads = 0
+        self.writes = 0
+        self._lock = Lock()
+        self._entries: Dict[str, Tuple[int, int, int, int]] = {}  # digest -> (offset, height, width, runs)
+        self._map: Optional[np.ndarray] = None  # copy-on-write mapping of the data file
+        self._size = 0  # bytes in the data file
+        os.makedirs(directory, exist_ok=True)
+        self._data_path = os.path.join(directory, DATA_FILE)
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        self._open()
+
+    def get(self, digest: str) -> Optional[Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray]]]:
+        """(sprite (h, w, 4), (rowoffs (h+1,), runs (n, 3))) views of a stored sprite, or None."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            offset, h, w, n = entry
+            rows_at, runs_at, end = _layout(h, w, n)
+            if self._map is None or offset + end > self._map.shape[0]:
+                self._remap()  # written by this process after the store was mapped
+            self.loads += 1
+            data = self._map[offset:offset + end]
+            return (data[:h * w * 4].reshape(h, w, 4),
+                    (data[rows_at:runs_at].view(np.int64), data[runs_at:end].view(np.int32).reshape(n, 3)))
+
+    def put(self, digest: str, sprite, spans) -> bool:
+        """
+        Append a (h, w, 4) uint8 sprite and its (rowoffs, runs) spans unless the sprite is stored already or the
+        store is full. Returns True if written.
+        """
+        h, w = sprite.shape[:2]
+        rowoffs, runs = spans
+        n = runs.shape[0]
+        rows_at, runs_at, nbytes = _layout(h, w, n)
+        with self._lock:
+            if digest in self._entries or self._data is None:
+                return False
+            offset = -(-self._size // _ALIGN) * _ALIGN
+            if offset + nbytes > self.max_bytes:
+                return False
+            try:
+                self._data.write(b'\0' * (offset - self._size))
+                self._data.write(np.ascontiguousarray(sprite, dtype=np.uint8).tobytes())
+                self._data.write(b'\0' * (rows_at - h * w * 4))
+                self._data.write(np.ascontiguousarray(rowoffs, dtype=np.int64).tobytes())
+                self._data.write(np.ascontiguousarray(runs, dtype=np.int32).tobytes())
+                self._data.flush()
+                self._index.write(json.dumps({'k': digest, 'o': offset, 'h': h, 'w': w, 'n': n,
+                                              'v': self.raster_version}) + '\n')
+                self._index.flush()
+            except OSError as e:
+                logger.warning("Sprite store %s is not writable any more: %s", self.directory, e)
+                self._close_files()
+                return False
+            self._size = offset + nbytes
+            self._entries[digest] = (offset, h, w, n)
+            self.writes += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """entries, bytes (data file size), loads, writes."""
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size, 'loads': self.loads, 'writes': self.writes}
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_files()
+            self._map = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"SpriteStore(directory={self.directory!r}, entries={len(self._entries)}, bytes={self._size})"
+
+    # ---- internals ----
+    def _open(self) -> None:
+        entries, ignored = self._read_index()
+        live = 0 if entries is None else sum(_layout(h, w, n)[2] for _, h, w, n in entries.values())
+        reset = entries is None or live > self.max_bytes  # unknown format or over the limit: start over
+        if reset:
+            entries = {}
+        data_size = os.path.getsize(self._data_path) if os.path.exists(self._data_path) else 0
+        # Also compact when stale data alone keeps the file over max_bytes, or put() could never write again
+        if reset or ignored > live or data_size > self.max_bytes:
+            try:
+                entries = self._compact(entries)
+            except OSError as e:  # e.g. another process has the data file mapped (Windows)
+                logger.warning("Could not compact sprite store %s: %s", self.directory, e)
+        self._entries = entries
+        self._size = os.path.getsize(self._data_path) if os.path.exists(self._data_path) else 0
+        self._data = open(self._data_path, 'ab')
+        self._index = open(self._index_path, 'a', encoding='utf-8')
+        if self._index.tell() == 0:
+            self._index.write(json.dumps({'format': FORMAT_VERSION}) + '\n')
+        else:
+            with open(self._index_path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._index.write('\n')  # end a torn line so that the next entry starts on its own line
+        self._index.flush()
+        self._remap()
+
+    def _read_index(self):
+        """(digest -> entry or None for an unusable store, bytes of ignored entries)."""
+        if not os.path.exists(self._index_path):
+            return {}, 0
+        data_size = os.path.getsize(self._data_path) if os.path.exists(self._data_path) else 0
+        entries: Dict[str, Tuple[int, int, int, int]] = {}
+        ignored = 0
+        with open(self._index_path, 'r', encoding='utf-8') as f:
+            try:
+                header = json.loads(f.readline() or '{}')
+            except ValueError:
+                header = {}
+            if header.get('format') != FORMAT_VERSION:
+                logger.info("Sprite store %s has format %r; resetting it", self.directory, header.get('format'))
+                return None, 0
+            for line in f:
+                try:
+                    item = json.loads(line)
+                    digest, offset, h, w, n = item['k'], int(item['o']), int(item['h']), int(item['w']), int(item['n'])
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn line of an interrupted write
+                nbytes = _layout(h, w, n)[2]
+                if item.get('v') != self.raster_version or offset + nbytes > data_size:
+                    ignored += nbytes
+                    continue
+                entries[digest] = (offset, h, w, n)
+        return entries, ignored
+
+    def _compact(self, entries: Dict[str, Tuple[int, int, int, int]]) -> Dict[str, Tuple[int, int, int, int]]:
+        """Rewrite the data file and index with the given entries only."""
+        kept: Dict[str, Tuple[int, int, int, int]] = {}
+        tmp_data, tmp_index = self._data_path + '.tmp', self._index_path + '.tmp'
+        old = (np.memmap(self._data_path, dtype=np.uint8, mode='r')
+               if entries and os.path.getsize(self._data_path) else None)
+        with open(tmp_data, 'wb') as data, open(tmp_index, 'w', encoding='utf-8') as index:
+            index.write(json.dumps({'format': FORMAT_VERSION}) + '\n')
+            size = 0
+            for digest, (offset, h, w, n) in entries.items():
+                nbytes = _layout(h, w, n)[2]
+                start = -(-size // _ALIGN) * _ALIGN
+                data.write(b'\0' * (start - size))
+                data.write(old[offset:offset + nbytes].tobytes())
+                index.write(json.dumps({'k': digest, 'o': start, 'h': h, 'w': w, 'n': n,
+                                        'v': self.raster_version}) + '\n')
+                kept[digest] = (start, h, w, n)
+                size = start + nbytes
+        del old  # release the mapping before replacing the file (required on Windows)
+        os.replace(tmp_data, self._data_path)
+        os.replace(tmp_index, self._index_path)
+        return kept
+
+    def _remap(self) -> None:
+        # Copy-on-write rather than read-only: pages stay shared with the file, but the views are ordinary
+        # writeable arrays, which the compositor's jitted kernels are already specialized for
+        self._map = (np.memmap(self._data_path, dtype=np.uint8, mode='c') if self._size else None)
+
+    def _close_files(self) -> None:
+        for f in (getattr(self, '_data', None), getattr(self, '_index', None)):
+            if f is not None:
+                f.close()
+        self._data = self._index = None